@@ -0,0 +1,80 @@
+"""
+Benchmark Fixtures
+Seeded league tables and FBRef-shaped HTML for the benchmark suite
+"""
+
+import sys
+import html
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from synthetic import generate_league_table
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+FBREF_FIXTURE = FIXTURES_DIR / "fbref_premier_league.html"
+
+# Column order and data-stat names of FBRef's league table
+FBREF_STATS = [
+    ('rank', 'Position'), ('team', 'Team'), ('games', 'Matches'), ('wins', None),
+    ('ties', None), ('losses', None), ('goals_for', 'Goals_For'),
+    ('goals_against', 'Goals_Against'), ('goal_diff', None), ('points', 'Actual_Points'),
+    ('points_avg', None), ('xg_for', 'xG_For'), ('xg_against', 'xG_Against'),
+]
+
+
+def raw_league_table(n_teams: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate a raw table with n_teams team-seasons in the scraper's schema
+
+    Args:
+        n_teams: Number of team rows (split into 20-team leagues above 20)
+        seed: Random seed (the same seed always gives the same table)
+
+    Returns:
+        DataFrame from the synthetic league generator
+    """
+    return generate_league_table(n_teams, seed=seed)
+
+
+def fbref_html(df: pd.DataFrame) -> str:
+    """
+    Render a raw league table as an FBRef-shaped stats page
+
+    Args:
+        df: DataFrame in the scraper's schema
+
+    Returns:
+        HTML page containing a results..._overall table with data-stat cells
+    """
+    header = ''.join(f'<th data-stat="{stat}">{stat}</th>' for stat, _ in FBREF_STATS)
+    rows = []
+    for record in df.to_dict('records'):
+        cells = []
+        for stat, column in FBREF_STATS:
+            value = '' if column is None else html.escape(str(record[column]))
+            tag = 'th scope="row"' if stat == 'rank' else 'td'
+            cells.append(f'<{tag} data-stat="{stat}">{value}</{tag.split()[0]}>')
+        rows.append(f"<tr>{''.join(cells)}</tr>")
+
+    return (
+        '<html><body><table id="results2025-202691_overall">'
+        '<caption>Premier League Table</caption>'
+        f'<thead><tr>{header}</tr></thead>'
+        f"<tbody>{''.join(rows)}</tbody>"
+        '</table></body></html>'
+    )
+
+
+def main():
+    """Regenerate the saved FBRef fixture from data/raw_data.csv"""
+    df = pd.read_csv(Path(__file__).parent.parent / "data" / "raw_data.csv")
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    FBREF_FIXTURE.write_text(fbref_html(df))
+    print(f"Saved {len(df)}-team fixture to {FBREF_FIXTURE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Gate
+Runs a benchmark profile and fails when a stage is slower than the committed
+baseline by more than the allowed threshold
+"""
+
+import sys
+import json
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from run_benchmarks import STARTUP_COMMANDS, BenchmarkContext, run_benchmark, environment
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+# Profile name -> benchmark name -> sizes. Each case takes at most a couple
+# of seconds, so enough repeats for a stable median fit in a CI job. The
+# committed baseline is recorded with 'full', which covers 'quick'.
+PROFILES = {
+    'quick': {
+        'calculate_season_xpts': [1000],
+        'analyze_performance': [10000],
+        'parse_league_table': [20, 1000],
+        'chart:league_table': [20],
+        'chart:risk_distribution': [20],
+        'startup:calc': [20],
+        'startup:report': [20],
+    },
+    'full': {
+        'calculate_match_probabilities': [1000],
+        'calculate_season_xpts': [20, 1000],
+        'analyze_performance': [1000, 10000],
+        'parse_league_table': [20, 1000],
+        'chart:actual_vs_expected': [20],
+        'chart:variance_by_team': [20],
+        'chart:league_table': [20],
+        'chart:risk_distribution': [20],
+        'generate_report': [20],
+        **{f'startup:{command}': [20] for command in STARTUP_COMMANDS},
+    },
+}
+
+
+def bootstrap_ratio_ci(baseline: list, current: list, confidence: float = 0.95,
+                       resamples: int = 2000, seed: int = 0) -> tuple:
+    """
+    Confidence interval for the ratio of current to baseline median time
+
+    Args:
+        baseline: Baseline timings
+        current: Current timings
+        confidence: Two-sided confidence level
+        resamples: Bootstrap resamples
+        seed: Random seed, so the gate's verdict is reproducible for given timings
+
+    Returns:
+        Tuple of (ratio of medians, lower bound, upper bound)
+    """
+    rng = np.random.default_rng(seed)
+    baseline = np.asarray(baseline)
+    current = np.asarray(current)
+
+    baseline_medians = np.median(rng.choice(baseline, (resamples, len(baseline))), axis=1)
+    current_medians = np.median(rng.choice(current, (resamples, len(current))), axis=1)
+    ratios = current_medians / baseline_medians
+
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(ratios, [alpha, 1 - alpha])
+    return float(np.median(current) / np.median(baseline)), float(lower), float(upper)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10,
+            confidence: float = 0.95) -> list:
+    """
+    Compare benchmark results against the baseline
+
+    A case regresses only when the whole confidence interval of the slowdown
+    lies above the threshold, so a single noisy run cannot fail the gate. It
+    counts as an improvement when the whole interval lies below 1 - threshold.
+
+    Args:
+        baseline: Baseline suite results
+        current: Current suite results
+        threshold: Allowed slowdown (0.10 = 10%)
+        confidence: Confidence level of the interval
+
+    Returns:
+        List of comparison rows
+    """
+    baseline_results = {(r['benchmark'], r['size']): r for r in baseline['results'] if 'times' in r}
+    rows = []
+
+    for result in current['results']:
+        if 'times' not in result:
+            continue
+        key = (result['benchmark'], result['size'])
+        row = {'benchmark': key[0], 'size': key[1], 'current': result['median']}
+
+        if key not in baseline_results:
+            row.update({'status': 'new'})
+        else:
+            base = baseline_results[key]
+            ratio, lower, upper = bootstrap_ratio_ci(base['times'], result['times'], confidence)
+            if lower > 1 + threshold:
+                status = 'SLOWER'
+            elif upper < 1 - threshold:
+                status = 'faster'
+            else:
+                status = 'ok'
+            row.update({'baseline': base['median'], 'ratio': ratio,
+                        'ci': (lower, upper), 'status': status})
+        rows.append(row)
+
+    return rows
+
+
+def format_report(rows: list, threshold: float, confidence: float) -> str:
+    """
+    Render comparison rows as a readable table
+
+    Args:
+        rows: Output of compare()
+        threshold: Allowed slowdown
+        confidence: Confidence level of the interval
+
+    Returns:
+        Multi-line report
+    """
+    lines = [
+        f"{'benchmark':32} {'size':>7} {'baseline':>10} {'current':>10} {'change':>8}  "
+        f"{int(confidence * 100)}% CI            status",
+        '-' * 96,
+    ]
+    for row in rows:
+        if row['status'] == 'new':
+            lines.append(f"{row['benchmark']:32} {row['size']:>7} {'-':>10} {row['current']:>9.4f}s "
+                         f"{'-':>8}  {'-':18} new (not in baseline)")
+            continue
+        lower, upper = row['ci']
+        lines.append(
+            f"{row['benchmark']:32} {row['size']:>7} {row['baseline']:>9.4f}s {row['current']:>9.4f}s "
+            f"{(row['ratio'] - 1) * 100:>+7.1f}%  [{(lower - 1) * 100:+6.1f}%, {(upper - 1) * 100:+6.1f}%]  "
+            f"{row['status']}"
+        )
+
+    regressions = [row for row in rows if row['status'] == 'SLOWER']
+    lines.append('-' * 96)
+    if regressions:
+        lines.append(f"FAIL: {len(regressions)} case(s) slower than the allowed {threshold:.0%}")
+    else:
+        lines.append(f"PASS: no case slower than the allowed {threshold:.0%}")
+
+    return '\n'.join(lines)
+
+
+def run_profile(profile: str, repeat: int, seed: int = 42) -> dict:
+    """
+    Run every case of a profile
+
+    Args:
+        profile: Key of PROFILES
+        repeat: Timed repetitions per case
+        seed: Base random seed
+
+    Returns:
+        Suite results in run_benchmarks' format
+    """
+    workdir = Path(tempfile.mkdtemp(prefix='xpts-gate-'))
+    results = []
+    try:
+        ctx = BenchmarkContext(seed, workdir)
+        for name, sizes in PROFILES[profile].items():
+            for size in sizes:
+                record = run_benchmark(ctx, name, size, repeat)
+                results.append(record)
+                print(f"  {name:32} {size:>7}  median {record['median']:.4f}s", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'environment': environment(),
+        'parameters': {'profile': profile, 'repeat': repeat, 'seed': seed},
+        'results': results,
+    }
+
+
+def main():
+    """Run the regression gate"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fail when benchmarks regress against the baseline')
+    parser.add_argument('--profile', choices=list(PROFILES), default='quick', help='Benchmark profile')
+    parser.add_argument('--repeat', type=int, default=7, help='Timed repetitions per case')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed slowdown (0.10 = 10%%)')
+    parser.add_argument('--confidence', type=float, default=0.95, help='Confidence level')
+    parser.add_argument('--baseline', default=str(BASELINE_FILE), help='Baseline JSON')
+    parser.add_argument('--results', help='Compare this saved results JSON instead of running the profile')
+    parser.add_argument('--update-baseline', action='store_true', help='Save this run as the new baseline')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    if args.results:
+        with open(args.results) as f:
+            current = json.load(f)
+    else:
+        print(f"Running '{args.profile}' profile ({args.repeat} repeats)...", file=sys.stderr)
+        current = run_profile(args.profile, args.repeat)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        # Merge, so updating from one profile keeps the other profile's cases
+        if baseline_path.exists():
+            with open(baseline_path) as f:
+                previous = json.load(f)
+            updated = {(r['benchmark'], r['size']) for r in current['results']}
+            current['results'] = [r for r in previous['results']
+                                  if (r['benchmark'], r['size']) not in updated] + current['results']
+        with open(baseline_path, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline first", file=sys.stderr)
+        sys.exit(2)
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    for key in ('machine', 'cpu_count', 'python'):
+        if baseline['environment'].get(key) != current['environment'].get(key):
+            print(f"WARNING: baseline {key} is {baseline['environment'].get(key)}, "
+                  f"this run is {current['environment'].get(key)}; timings may not be comparable",
+                  file=sys.stderr)
+
+    rows = compare(baseline, current, args.threshold, args.confidence)
+    print(f"\nBaseline {baseline['environment'].get('commit')} vs current "
+          f"{current['environment'].get('commit')}\n")
+    print(format_report(rows, args.threshold, args.confidence))
+
+    if any(row['status'] == 'SLOWER' for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
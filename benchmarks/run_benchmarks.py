@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Suite
+Times every pipeline stage on seeded synthetic leagues from 20 teams up to
+100k team-seasons and stores the results as JSON
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+import matplotlib
+matplotlib.use('Agg')
+
+from calculator import ExpectedPointsCalculator, match_probabilities
+from analyzer import PerformanceAnalyzer
+from scraper import PremierLeagueScraper
+from visualizer import PerformanceVisualizer, CHART_METHODS
+from reporter import PerformanceReportGenerator
+from fixtures import FBREF_FIXTURE, raw_league_table, fbref_html
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [20, 1000, 10000, 100000]
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# main.py subcommands whose import cost is benchmarked (each command should
+# import only what it needs)
+STARTUP_COMMANDS = ['calc', 'analyze', 'charts', 'report']
+
+
+class BenchmarkContext:
+    """Seeded inputs shared by the benchmarks, built once per size"""
+
+    def __init__(self, seed: int, workdir: Path):
+        """
+        Initialize context
+
+        Args:
+            seed: Base random seed
+            workdir: Scratch directory for outputs
+        """
+        self.seed = seed
+        self.workdir = workdir
+        self.calculator = ExpectedPointsCalculator(str(workdir))
+        self.analyzer = PerformanceAnalyzer(str(workdir))
+        self.scraper = PremierLeagueScraper(str(workdir))
+        self.visualizer = PerformanceVisualizer(str(workdir), str(workdir / "charts"),
+                                                in_memory=True, save_to_disk=False)
+        self.reporter = PerformanceReportGenerator(str(workdir), str(workdir / "charts"),
+                                                   str(workdir / "reports"))
+        self._raw = {}
+        self._xpts = {}
+        self._analysis = {}
+        self._html = {}
+        self._charts = None
+        self._command_dir = None
+
+    def raw(self, size: int) -> pd.DataFrame:
+        if size not in self._raw:
+            self._raw[size] = raw_league_table(size, seed=self.seed + size)
+        return self._raw[size]
+
+    def xpts(self, size: int) -> pd.DataFrame:
+        if size not in self._xpts:
+            self._xpts[size] = self.calculator.calculate_season_xpts(self.raw(size))
+        return self._xpts[size]
+
+    def analysis(self, size: int) -> pd.DataFrame:
+        if size not in self._analysis:
+            self._analysis[size] = self.analyzer.analyze_performance(self.xpts(size).copy())
+        return self._analysis[size]
+
+    def html(self, size: int) -> bytes:
+        if size not in self._html:
+            if size == 20:
+                # The saved page from a real season layout
+                self._html[size] = FBREF_FIXTURE.read_bytes()
+            else:
+                self._html[size] = fbref_html(self.raw(size)).encode('utf-8')
+        return self._html[size]
+
+    def charts(self) -> dict:
+        """Charts for the report benchmark (always the 20-team league)"""
+        if self._charts is None:
+            self._charts = self.visualizer.generate_charts(self.analysis(20))
+        return self._charts
+
+    def command_dir(self) -> Path:
+        """Working directory with the 20-team league's data files for main.py subcommands"""
+        if self._command_dir is None:
+            self._command_dir = self.workdir / "cli"
+            data_dir = self._command_dir / "data"
+            data_dir.mkdir(parents=True)
+            self.raw(20).to_csv(data_dir / "raw_data.csv", index=False)
+            self.xpts(20).to_csv(data_dir / "xpts_data.csv", index=False)
+            self.analysis(20).to_csv(data_dir / "risk_analysis.csv", index=False)
+        return self._command_dir
+
+
+def _match_probabilities_setup(ctx: BenchmarkContext, size: int):
+    rng = np.random.default_rng(ctx.seed + size)
+    pairs = rng.uniform(0.2, 3.5, size=(size, 2))
+    match_probabilities.cache_clear()
+    return pairs
+
+
+def _season_xpts_setup(ctx: BenchmarkContext, size: int) -> pd.DataFrame:
+    # Every timed run starts cold, so the Poisson work is measured rather than cache hits
+    match_probabilities.cache_clear()
+    return ctx.raw(size)
+
+
+def _match_probabilities_run(ctx: BenchmarkContext, pairs):
+    for xg_home, xg_away in pairs:
+        ctx.calculator.calculate_match_probabilities(xg_home, xg_away)
+
+
+def _startup_run(ctx: BenchmarkContext, command: str) -> float:
+    """Run a main.py subcommand on the 20-team league and return the seconds spent importing"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', str(ROOT / 'main.py'), command],
+                               cwd=ctx.command_dir(), check=True, capture_output=True, text=True)
+    # Lines read 'import time: <self us> | <cumulative us> | <module>'; the self times add up to the total
+    self_us = [line.split('|')[0].rsplit(':', 1)[1] for line in completed.stderr.splitlines()
+               if line.startswith('import time:') and 'self [us]' not in line]
+    return sum(int(value) for value in self_us) / 1e6
+
+
+def _report_run(ctx: BenchmarkContext, df):
+    for buffer in ctx.charts().values():
+        buffer.seek(0)
+    ctx.reporter.generate_report(df, ctx.charts(), output_file="benchmark_report.pdf")
+
+
+# name -> (setup(ctx, size) returning the input, run(ctx, input), largest size to run);
+# run's wall time is recorded unless it returns its own measurement in seconds
+BENCHMARKS = {
+    'calculate_match_probabilities': (_match_probabilities_setup, _match_probabilities_run, 100000),
+    'calculate_season_xpts': (_season_xpts_setup,
+                              lambda ctx, df: ctx.calculator.calculate_season_xpts(df), 100000),
+    'analyze_performance': (lambda ctx, size: ctx.xpts(size).copy(),
+                            lambda ctx, df: ctx.analyzer.analyze_performance(df), 100000),
+    'parse_league_table': (lambda ctx, size: ctx.html(size),
+                           lambda ctx, page: ctx.scraper.parse_league_table(page), 10000),
+    **{
+        f'chart:{chart_name}': (
+            lambda ctx, size: ctx.analysis(size),
+            lambda ctx, df, method_name=method_name: getattr(ctx.visualizer, method_name)(df),
+            1000,
+        )
+        for chart_name, method_name in CHART_METHODS.items()
+    },
+    'generate_report': (lambda ctx, size: ctx.analysis(size), _report_run, 1000),
+    **{
+        f'startup:{command}': (lambda ctx, size, command=command: command, _startup_run, 20)
+        for command in STARTUP_COMMANDS
+    },
+}
+
+
+def run_benchmark(ctx: BenchmarkContext, name: str, size: int, repeat: int, warmup: int = 1) -> dict:
+    """
+    Time one benchmark at one size
+
+    Args:
+        ctx: Shared benchmark inputs
+        name: Benchmark name (key of BENCHMARKS)
+        size: Number of team rows
+        repeat: Number of timed repetitions
+        warmup: Untimed runs first (fill caches, fault in lazily loaded code)
+
+    Returns:
+        Result record with raw timings and summary statistics
+    """
+    setup, run, max_size = BENCHMARKS[name]
+    record = {'benchmark': name, 'size': size}
+    if size > max_size:
+        record['skipped'] = f"capped at {max_size} rows"
+        return record
+
+    for _ in range(warmup):
+        run(ctx, setup(ctx, size))
+
+    times = []
+    for _ in range(repeat):
+        data = setup(ctx, size)
+        gc.collect()
+        start = time.perf_counter()
+        measured = run(ctx, data)
+        elapsed = time.perf_counter() - start
+        # Cases timing part of a subprocess return their own measurement
+        times.append(measured if isinstance(measured, float) else elapsed)
+
+    median = statistics.median(times)
+    record.update({
+        'repeat': repeat,
+        'warmup': warmup,
+        'times': [round(t, 6) for t in times],
+        'min': round(min(times), 6),
+        'median': round(median, 6),
+        'mean': round(statistics.mean(times), 6),
+        'stdev': round(statistics.stdev(times), 6) if len(times) > 1 else 0.0,
+        'us_per_row': round(median / size * 1e6, 3),
+    })
+    return record
+
+
+def environment() -> dict:
+    """Describe the machine and code version the results came from"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def run_suite(sizes: list = None, repeat: int = 3, only: list = None, seed: int = 42,
+              warmup: int = 1) -> dict:
+    """
+    Run every selected benchmark at every size
+
+    Args:
+        sizes: Team-row counts to benchmark
+        repeat: Timed repetitions per benchmark and size
+        only: Benchmark names (or name prefixes such as 'chart') to run
+        seed: Base random seed
+        warmup: Untimed runs before each benchmark
+
+    Returns:
+        Dictionary with environment metadata, parameters and result records
+    """
+    sizes = sizes or DEFAULT_SIZES
+    names = [name for name in BENCHMARKS
+             if not only or any(name == o or name.startswith(f"{o}:") for o in only)]
+
+    workdir = Path(tempfile.mkdtemp(prefix='xpts-bench-'))
+    results = []
+    try:
+        ctx = BenchmarkContext(seed, workdir)
+        for name in names:
+            for size in sizes:
+                record = run_benchmark(ctx, name, size, repeat, warmup)
+                results.append(record)
+                if 'skipped' in record:
+                    print(f"{name:36} {size:>7}  skipped ({record['skipped']})")
+                else:
+                    print(f"{name:36} {size:>7}  median {record['median']:9.4f}s  "
+                          f"({record['us_per_row']:.1f} µs/row)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'environment': environment(),
+        'parameters': {'sizes': sizes, 'repeat': repeat, 'warmup': warmup, 'seed': seed,
+                       'benchmarks': names},
+        'results': results,
+    }
+
+
+def main():
+    """Run the benchmark suite and save the results"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline stage at scale')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Team-row counts')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per benchmark')
+    parser.add_argument('--only', nargs='+', help=f'Benchmarks to run: {", ".join(BENCHMARKS)} (or "chart")')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before each benchmark')
+    parser.add_argument('--seed', type=int, default=42, help='Base random seed')
+    parser.add_argument('--output', help='Results JSON path (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    # Per-team INFO logging would be timed along with the work
+    logging.disable(logging.INFO)
+
+    suite = run_suite(args.sizes, args.repeat, args.only, args.seed, args.warmup)
+
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"{suite['environment']['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(suite, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,112 +4,378 @@ Football Predictive Performance Regression Model - Main Runner
 Orchestrates the complete analysis pipeline
 """
 
+import time
+
+# Measured before any other import so startup cost covers the whole process
+PROCESS_START = time.perf_counter()
+
 import sys
 import logging
+import argparse
+import threading
 from pathlib import Path
 from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from scraper import PremierLeagueScraper
-from calculator import ExpectedPointsCalculator
-from analyzer import PerformanceAnalyzer
-from visualizer import PerformanceVisualizer
-from reporter import PerformanceReportGenerator
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('analysis.log'),
-        logging.StreamHandler()
-    ]
-)
+# Only lightweight modules are imported here; pipeline components (and with
+# them requests, bs4, scipy, matplotlib and reportlab) load on first use
+from scheduler import StageScheduler
+from instrumentation import tracer, span
+from logging_setup import configure_logging, log_sampling_summary
+
 logger = logging.getLogger(__name__)
 
+# Subcommand -> pipeline stages it runs (None runs every stage)
+COMMANDS = {
+    'scrape': ['scrape'],
+    'calc': ['calculate'],
+    'analyze': ['analyze', 'persist', 'history', 'summary'],
+    'charts': ['charts'],
+    'report': ['json', 'report'],
+    'all': None,
+}
+
 
 class FootballAnalysisPipeline:
     """Main pipeline orchestrator for football performance analysis"""
 
-    def __init__(self):
-        """Initialize pipeline components"""
-        self.scraper = PremierLeagueScraper()
-        self.calculator = ExpectedPointsCalculator()
-        self.analyzer = PerformanceAnalyzer()
-        self.visualizer = PerformanceVisualizer()
-        self.reporter = PerformanceReportGenerator()
+    def __init__(self, database_path: str = None, parallel_charts: bool = False,
+                 in_memory_charts: bool = False, pdf_profile: str = None,
+                 batch_reports: bool = False, pdf: bool = False):
+        """
+        Initialize pipeline components
 
-    def run(self, skip_scraping: bool = False):
+        Args:
+            database_path: Optional SQLite database to load results into
+            parallel_charts: Render charts concurrently in worker processes
+            in_memory_charts: Pass charts to the reporter as in-memory buffers without writing PNGs
+            pdf_profile: Image profile for embedded charts (None keeps full-resolution images)
+            batch_reports: Also generate per-team and per-league reports in parallel
+            pdf: Build the PDF report in addition to the HTML and JSON reports
+        """
+        self.database_path = database_path
+        self.parallel_charts = parallel_charts
+        self.in_memory_charts = in_memory_charts
+        self.pdf_profile = pdf_profile
+        self.batch_reports = batch_reports
+        self.report_formats = ('html', 'json', 'pdf') if pdf else ('html', 'json')
+        self._components = {}
+        self._components_lock = threading.RLock()
+
+    def _component(self, name: str, factory):
+        """
+        Create a pipeline component on first use
+
+        Stages run on worker threads, so creation is locked to keep one
+        instance per component.
+
+        Args:
+            name: Component name
+            factory: Callable importing the component's module and creating it
+
+        Returns:
+            The shared component instance
+        """
+        with self._components_lock:
+            if name not in self._components:
+                with span(f'load:{name}', 'startup'):
+                    self._components[name] = factory()
+            return self._components[name]
+
+    @property
+    def scraper(self):
+        def factory():
+            from scraper import PremierLeagueScraper
+            return PremierLeagueScraper()
+        return self._component('scraper', factory)
+
+    @property
+    def calculator(self):
+        def factory():
+            from calculator import ExpectedPointsCalculator
+            return ExpectedPointsCalculator()
+        return self._component('calculator', factory)
+
+    @property
+    def analyzer(self):
+        def factory():
+            from analyzer import PerformanceAnalyzer
+            return PerformanceAnalyzer()
+        return self._component('analyzer', factory)
+
+    @property
+    def visualizer(self):
+        def factory():
+            from visualizer import PerformanceVisualizer
+            return PerformanceVisualizer(in_memory=self.in_memory_charts, save_to_disk=not self.in_memory_charts)
+        return self._component('visualizer', factory)
+
+    @property
+    def reporter(self):
+        def factory():
+            from reporter import PerformanceReportGenerator
+            return PerformanceReportGenerator(image_profile=self.pdf_profile)
+        return self._component('reporter', factory)
+
+    @property
+    def history(self):
+        def factory():
+            from history import SnapshotStore
+            return SnapshotStore()
+        return self._component('history', factory)
+
+    @property
+    def database(self):
+        if not self.database_path:
+            return None
+
+        def factory():
+            from database import AnalysisDatabase
+            return AnalysisDatabase(self.database_path)
+        return self._component('database', factory)
+
+    def build_scheduler(self, max_workers: int = 4, profiler=None) -> StageScheduler:
+        """
+        Declare the pipeline as a stage DAG
+
+        Stages whose upstream stage was not part of the run load that
+        stage's persisted output instead.
+
+        Args:
+            max_workers: Maximum number of stages running at once
+            profiler: Optional StageProfiler wrapping each stage
+
+        Returns:
+            StageScheduler with every pipeline stage registered
+        """
+        scheduler = StageScheduler(max_workers=max_workers, profiler=profiler)
+        scheduler.add_stage('scrape', self._scrape, description="Scraping Premier League data")
+        scheduler.add_stage('calculate', self._calculate, depends_on=('scrape',),
+                            description="Calculating expected points (xPTS)")
+        scheduler.add_stage('analyze', self._analyze, depends_on=('calculate',),
+                            description="Performing statistical analysis")
+        scheduler.add_stage('persist', self._persist, depends_on=('analyze',),
+                            description="Saving risk analysis (CSV/Parquet)")
+        scheduler.add_stage('history', self._record_history, depends_on=('analyze',),
+                            description="Recording snapshot history")
+        scheduler.add_stage('json', self._export_json, depends_on=('analyze',),
+                            description="Exporting JSON report")
+        scheduler.add_stage('charts', self._charts, depends_on=('analyze',),
+                            description="Generating visualizations")
+        # Team cards read the snapshot history, so only batch reports wait for it
+        report_deps = ('analyze', 'charts', 'history') if self.batch_reports else ('analyze', 'charts')
+        scheduler.add_stage('report', self._report, depends_on=report_deps,
+                            description="Generating reports")
+        scheduler.add_stage('summary', self._summary, depends_on=('analyze',),
+                            description="Printing analysis summary")
+        return scheduler
+
+    def _analysis(self, results: dict) -> 'pd.DataFrame':
+        """Get the analysis DataFrame from this run or from risk_analysis.csv"""
+        if 'analyze' in results:
+            return results['analyze'][0]
+
+        # Read directly rather than through the analyzer, which would load scipy
+        from schema import read_csv
+
+        input_path = Path('data') / 'risk_analysis.csv'
+        if not input_path.exists():
+            raise FileNotFoundError(f"Risk analysis file not found: {input_path}")
+        return read_csv(input_path)
+
+    def _scrape(self, results: dict) -> 'pd.DataFrame':
+        df_raw = self.scraper.run()
+        logger.info(f"✓ Successfully scraped data for {len(df_raw)} teams")
+        return df_raw
+
+    def _calculate(self, results: dict) -> 'pd.DataFrame':
+        df_xpts = self.calculator.run()
+        logger.info(f"✓ Calculated xPTS for {len(df_xpts)} teams")
+        return df_xpts
+
+    def _analyze(self, results: dict) -> tuple:
+        from validation import validate_stage
+
+        if 'calculate' in results:
+            df_xpts = results['calculate'].copy()
+        else:
+            df_xpts = self.analyzer.load_xpts_data()
+        df_analysis = self.analyzer.analyze_performance(df_xpts)
+        validate_stage(df_analysis, 'risk')
+        candidates = self.analyzer.identify_regression_candidates(df_analysis)
+        logger.info(f"✓ Analyzed {len(df_analysis)} teams")
+        logger.info(f"  - High risk teams: {len(candidates['high_risk']) + len(candidates['critical_risk'])}")
+        logger.info(f"  - Overperforming: {len(candidates['overperforming'])}")
+        logger.info(f"  - Underperforming: {len(candidates['underperforming'])}")
+        return df_analysis, candidates
+
+    def _persist(self, results: dict) -> None:
+        df_analysis = self._analysis(results)
+        self.analyzer.save_data(df_analysis)
+        try:
+            parquet_path = self.analyzer.data_dir / 'risk_analysis.parquet'
+            df_analysis.to_parquet(parquet_path, index=False)
+            logger.info(f"Risk analysis saved to {parquet_path}")
+        except ImportError:
+            logger.info("No Parquet engine installed (pyarrow/fastparquet), skipping Parquet output")
+
+    def _record_history(self, results: dict) -> None:
+        df_analysis = self._analysis(results)
+        changed = self.history.append(df_analysis)
+        logger.info(f"  - Snapshot history: {changed} teams changed since last run")
+        if self.database is not None:
+            self.database.load_results(df_analysis)
+            logger.info(f"  - Loaded results into {self.database.db_path}")
+
+    def _export_json(self, results: dict) -> dict:
+        return self.reporter.export(self._analysis(results), formats=('json',))
+
+    def _charts(self, results: dict) -> dict:
+        charts = self.visualizer.generate_charts(self._analysis(results), parallel=self.parallel_charts)
+        logger.info(f"✓ Generated {len(charts)} charts")
+        for chart_name in charts.keys():
+            logger.info(f"  - {chart_name}")
+        return charts
+
+    def _report(self, results: dict) -> dict:
+        from reporter import HTML_CHART_SECTIONS
+
+        df_analysis = self._analysis(results)
+        charts = results.get('charts') or {
+            chart_name: str(self.reporter.charts_dir / f"{chart_name}.png")
+            for chart_name, _ in HTML_CHART_SECTIONS
+        }
+        formats = tuple(f for f in self.report_formats if f != 'json')
+        reports = self.reporter.export(df_analysis, charts=charts, formats=formats)
+        for report_format, report_path in reports.items():
+            logger.info(f"✓ {report_format.upper()} report saved to: {report_path}")
+        if self.batch_reports:
+            from team_cards import TeamCardRenderer
+
+            renderer = TeamCardRenderer(in_memory=self.in_memory_charts,
+                                        save_to_disk=not self.in_memory_charts)
+            team_cards = renderer.render_all(df_analysis, history_store=self.history)
+            renderer.close()
+            league_charts = None
+            if 'League' in df_analysis.columns:
+                from visualizer import PerformanceVisualizer
+
+                # Each league report gets charts of its own teams, kept off disk so
+                # they do not replace the whole-table charts
+                league_visualizer = PerformanceVisualizer(in_memory=True, save_to_disk=False)
+                league_charts = {
+                    league: league_visualizer.generate_charts(league_df)
+                    for league, league_df in df_analysis.groupby('League', sort=False)
+                }
+            batch = self.reporter.generate_batch_reports(df_analysis, team_charts=team_cards,
+                                                         league_charts=league_charts, charts=charts)
+            logger.info(f"✓ Generated {len(batch['teams'])} team and {len(batch['leagues'])} league reports")
+        return reports
+
+    def _summary(self, results: dict) -> None:
+        if 'analyze' in results:
+            df_analysis, candidates = results['analyze']
+        else:
+            df_analysis = self._analysis(results)
+            candidates = self.analyzer.identify_regression_candidates(df_analysis)
+        self._print_summary(df_analysis, candidates)
+
+    def run(self, skip_scraping: bool = False, only: list = None, start: str = None,
+            until: str = None, max_workers: int = 4, trace_file: str = None,
+            profile: list = None, profile_dir: str = "output/profiles",
+            profile_memory: bool = False, metrics_file: str = None) -> dict:
         """
         Run the complete analysis pipeline
 
         Args:
             skip_scraping: If True, skip scraping and use existing data
+            only: Run exactly these stages
+            start: Run this stage and everything downstream of it
+            until: Run this stage and everything upstream of it
+            max_workers: Maximum number of stages running at once
+            trace_file: Write a Chrome trace (plus '<stem>.summary.json') to this path
+            profile: Profile these stages with cProfile ([] or ['all'] for every
+                stage, None to disable profiling)
+            profile_dir: Directory for the per-stage profile files
+            profile_memory: Also write per-stage top allocations (tracemalloc)
+            metrics_file: Write Prometheus textfile metrics for the run to this path
+
+        Returns:
+            Dictionary mapping stage name to its result
         """
         start_time = datetime.now()
+        started = time.time()
         logger.info("=" * 70)
         logger.info("STARTING FOOTBALL PERFORMANCE ANALYSIS PIPELINE")
         logger.info("=" * 70)
 
+        logger.info(f"Startup (imports and argument parsing): {time.perf_counter() - PROCESS_START:.3f}s")
+
+        profiler = None
+        if profile is not None:
+            from profiling import StageProfiler
+
+            profiler = StageProfiler(profile_dir, stages=profile, memory=profile_memory)
+            logger.info(f"Profiling {', '.join(profile) or 'all'} stages into {profile_dir}")
+
+        scheduler = self.build_scheduler(max_workers=max_workers, profiler=profiler)
+        tracer.reset()
+
         try:
-            # Step 1: Scrape data
-            if not skip_scraping:
-                logger.info("\n[1/6] SCRAPING PREMIER LEAGUE DATA")
-                logger.info("-" * 70)
-                df_raw = self.scraper.run()
-                logger.info(f"✓ Successfully scraped data for {len(df_raw)} teams")
-            else:
-                logger.info("\n[1/6] SKIPPING SCRAPING (using existing data)")
-                logger.info("-" * 70)
-
-            # Step 2: Calculate xPTS
-            logger.info("\n[2/6] CALCULATING EXPECTED POINTS (xPTS)")
-            logger.info("-" * 70)
-            df_xpts = self.calculator.run()
-            logger.info(f"✓ Calculated xPTS for {len(df_xpts)} teams")
-
-            # Step 3: Analyze performance
-            logger.info("\n[3/6] PERFORMING STATISTICAL ANALYSIS")
-            logger.info("-" * 70)
-            df_analysis, candidates = self.analyzer.run()
-            logger.info(f"✓ Analyzed {len(df_analysis)} teams")
-            logger.info(f"  - High risk teams: {len(candidates['high_risk']) + len(candidates['critical_risk'])}")
-            logger.info(f"  - Overperforming: {len(candidates['overperforming'])}")
-            logger.info(f"  - Underperforming: {len(candidates['underperforming'])}")
-
-            # Step 4: Generate visualizations
-            logger.info("\n[4/6] GENERATING VISUALIZATIONS")
-            logger.info("-" * 70)
-            charts = self.visualizer.run()
-            logger.info(f"✓ Generated {len(charts)} charts")
-            for chart_name in charts.keys():
-                logger.info(f"  - {chart_name}")
-
-            # Step 5: Generate PDF report
-            logger.info("\n[5/6] GENERATING PDF REPORT")
-            logger.info("-" * 70)
-            report_path = self.reporter.run(charts=charts)
-            logger.info(f"✓ Report saved to: {report_path}")
-
-            # Step 6: Print summary
-            logger.info("\n[6/6] ANALYSIS SUMMARY")
-            logger.info("-" * 70)
-            self._print_summary(df_analysis, candidates)
+            stages = scheduler.select(
+                only=only, start=start, until=until,
+                exclude=['scrape'] if skip_scraping else None
+            )
+            if skip_scraping:
+                logger.info("SKIPPING SCRAPING (using existing data)")
+            logger.info(f"Stages: {', '.join(stages)} ({max_workers} workers)")
+
+            results = scheduler.run(stages)
 
             # Completion
             elapsed_time = (datetime.now() - start_time).total_seconds()
             logger.info("\n" + "=" * 70)
+            scheduler.log_report()
+            logger.info("Span measurements:")
+            tracer.log_summary()
+            if trace_file:
+                tracer.export(trace_file)
+            if metrics_file:
+                self._write_metrics(metrics_file, scheduler, True, started)
+            log_sampling_summary()
             logger.info(f"PIPELINE COMPLETED SUCCESSFULLY in {elapsed_time:.2f} seconds")
             logger.info("=" * 70)
 
+            return results
+
         except Exception as e:
             logger.error(f"\n{'=' * 70}")
             logger.error(f"PIPELINE FAILED: {str(e)}")
             logger.error(f"{'=' * 70}")
+            if trace_file:
+                tracer.export(trace_file)
+            if metrics_file:
+                self._write_metrics(metrics_file, scheduler, False, started)
             raise
 
+    def _write_metrics(self, metrics_file: str, scheduler: StageScheduler, success: bool,
+                       started: float) -> None:
+        """
+        Write the run's Prometheus textfile metrics
+
+        Args:
+            metrics_file: Output path
+            scheduler: Scheduler that ran the stages
+            success: Whether the run completed
+            started: Run start as a Unix timestamp
+        """
+        from metrics import pipeline_metrics
+
+        path = pipeline_metrics(tracer, scheduler.timings, success, started).write(metrics_file)
+        logger.info(f"Metrics saved to {path}")
+
     def _print_summary(self, df_analysis, candidates):
         """
         Print analysis summary to console
@@ -183,23 +449,255 @@ class FootballAnalysisPipeline:
         print("\n" + "=" * 70)
 
 
+def add_common_arguments(parser, suppress_defaults: bool = False) -> None:
+    """
+    Add the pipeline options shared by every subcommand
+
+    Args:
+        parser: Parser or subparser to extend
+        suppress_defaults: Leave unset options out of the namespace, so a
+            subcommand does not overwrite options given before it
+    """
+    def default(value):
+        return argparse.SUPPRESS if suppress_defaults else value
+
+    parser.add_argument(
+        '--skip-scraping',
+        action='store_true',
+        default=default(False),
+        help='Skip data scraping and use existing raw_data.csv'
+    )
+    parser.add_argument(
+        '--only',
+        nargs='+',
+        metavar='STAGE',
+        default=default(None),
+        help='Run only these stages (scrape, calculate, analyze, persist, history, json, charts, report, summary)'
+    )
+    parser.add_argument(
+        '--from',
+        dest='start',
+        metavar='STAGE',
+        default=default(None),
+        help='Run this stage and everything downstream of it'
+    )
+    parser.add_argument(
+        '--until',
+        metavar='STAGE',
+        default=default(None),
+        help='Run this stage and everything upstream of it'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=default(4),
+        help='Maximum number of stages running at once (default: 4)'
+    )
+    parser.add_argument(
+        '--trace',
+        metavar='PATH',
+        default=default(None),
+        help='Write a Chrome/Perfetto trace of stage timings and memory to PATH (plus a .summary.json)'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        metavar='PATH',
+        default=default(None),
+        help='Write Prometheus textfile metrics for the run to PATH (e.g. for the node exporter)'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='*',
+        metavar='STAGE',
+        default=default(None),
+        help='Profile these stages (all when none given) with cProfile; writes .pstats and '
+             'flamegraph .collapsed files per stage'
+    )
+    parser.add_argument(
+        '--profile-dir',
+        metavar='DIR',
+        default=default('output/profiles'),
+        help='Directory for profile files (default: output/profiles)'
+    )
+    parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        default=default(False),
+        help='With --profile, also write the top allocations of each stage (tracemalloc)'
+    )
+    parser.add_argument(
+        '--database',
+        metavar='PATH',
+        default=default(None),
+        help='Also load analysis results into a SQLite database at PATH'
+    )
+    parser.add_argument(
+        '--parallel-charts',
+        action='store_true',
+        default=default(False),
+        help='Render charts concurrently in worker processes'
+    )
+    parser.add_argument(
+        '--in-memory-charts',
+        action='store_true',
+        default=default(False),
+        help='Hand charts to the report in memory instead of writing PNG files'
+    )
+    parser.add_argument(
+        '--pdf-profile',
+        metavar='PROFILE',
+        default=default(None),
+        help='Downsample and recompress report charts (print, email or screen)'
+    )
+    parser.add_argument(
+        '--pdf',
+        action='store_true',
+        default=default(False),
+        help='Also build the PDF report (HTML and JSON reports are always written)'
+    )
+    parser.add_argument(
+        '--batch-reports',
+        action='store_true',
+        default=default(False),
+        help='Also generate per-team and per-league PDF reports in parallel'
+    )
+
+
 def main():
     """Main entry point"""
-    import argparse
-
     parser = argparse.ArgumentParser(
         description='Football Predictive Performance Regression Model'
     )
+    add_common_arguments(parser)
     parser.add_argument(
-        '--skip-scraping',
-        action='store_true',
-        help='Skip data scraping and use existing raw_data.csv'
+        '--log-format',
+        choices=['text', 'json'],
+        default='text',
+        help='Write log records as plain text or as one JSON object per line'
+    )
+    parser.add_argument(
+        '--log-team-lines',
+        type=int,
+        default=20,
+        metavar='N',
+        help='Keep the first N per-team log lines per module and count the rest (-1 keeps all)'
     )
+
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    command_help = {
+        'scrape': 'Scrape the league table into data/raw_data.csv',
+        'calc': 'Calculate xPTS from data/raw_data.csv',
+        'analyze': 'Run the statistical analysis and record history',
+        'charts': 'Render charts from data/risk_analysis.csv',
+        'report': 'Write HTML/JSON (and optionally PDF) reports',
+        'all': 'Run the full pipeline (default)',
+    }
+    for command, help_text in command_help.items():
+        add_common_arguments(subparsers.add_parser(command, help=help_text), suppress_defaults=True)
+
+    watch_parser = subparsers.add_parser('watch', help='Recompute leagues as raw data lands in data/incoming')
+    watch_parser.add_argument('--incoming', help='Directory to watch (default: data/incoming)')
+    watch_parser.add_argument('--output', default='output/live', help='Directory to publish to')
+    watch_parser.add_argument('--interval', type=float, default=1.0, help='Seconds between scans')
+    watch_parser.add_argument('--polls', type=int, help='Stop after this many scans')
+
+    stream_parser = subparsers.add_parser('stream', help='Scrape several leagues and analyze each as it arrives')
+    stream_parser.add_argument('--leagues', nargs='+', metavar='LEAGUE',
+                               help='Leagues to scrape (default: Premier League, La Liga, Serie A, Bundesliga, Ligue 1)')
+    stream_parser.add_argument('--input', help='Stream leagues from this raw data CSV instead of scraping')
+    stream_parser.add_argument('--queue-size', type=int, default=2, help='Leagues buffered between steps')
+
+    update_parser = subparsers.add_parser('update', help='Recompute xPTS and risk only for teams whose raw rows changed')
+    update_parser.add_argument('--input', default='raw_data.csv', help='Raw data CSV in data/')
+    update_parser.add_argument('--changes', default='changes.json', help='Change set JSON to write in data/')
+
+    serve_parser = subparsers.add_parser('serve', help='Serve league, team and xPTS results over HTTP')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    serve_parser.add_argument('--port', type=int, default=8000, help='Port to bind')
+    serve_parser.add_argument('--file', default='risk_analysis.csv', help='Analysis CSV in data/ to serve')
+
     args = parser.parse_args()
+    command = args.command or 'all'
+
+    configure_logging(
+        log_file='analysis.log',
+        json_format=args.log_format == 'json',
+        team_sample_first=None if args.log_team_lines < 0 else args.log_team_lines
+    )
+
+    if command == 'serve':
+        from server import serve
+
+        serve(args.host, args.port, filename=args.file)
+        return
+
+    if command == 'stream':
+        from scraper import PremierLeagueScraper, LEAGUES
+        from streaming import StreamingPipeline, file_source
+
+        # Checked here rather than with choices= so parsing does not import the scraper
+        unknown = [league for league in args.leagues or [] if league not in LEAGUES]
+        if unknown:
+            stream_parser.error(f"unknown league(s): {', '.join(unknown)} "
+                                f"(choose from {', '.join(LEAGUES)})")
+
+        source = file_source(args.input) if args.input else PremierLeagueScraper().iter_leagues(args.leagues)
+        StreamingPipeline(queue_size=args.queue_size).run(source)
+        return
+
+    if command == 'update':
+        from incremental import IncrementalPipeline
+
+        changes = IncrementalPipeline().run(args.input, args.changes)
+        logger.info(f"Recomputed {changes['recomputed']} of {changes['rows']} teams, "
+                    f"{len(changes['teams'])} with changed results")
+        return
+
+    if command == 'watch':
+        from daemon import WatchDaemon
+
+        daemon = WatchDaemon(incoming_dir=args.incoming, output_dir=args.output,
+                             poll_interval=args.interval)
+        daemon.run(max_polls=args.polls)
+        return
+
+    if args.pdf_profile is not None:
+        from reporter import IMAGE_PROFILES
+
+        # Checked here rather than with choices= so parsing does not import the reporter
+        if args.pdf_profile not in IMAGE_PROFILES:
+            parser.error(f"argument --pdf-profile: invalid choice: '{args.pdf_profile}' "
+                         f"(choose from {', '.join(IMAGE_PROFILES)})")
+
+    # A subcommand's stages narrowed further by --only
+    only = COMMANDS[command] or args.only
+    if COMMANDS[command] and args.only:
+        only = [stage for stage in COMMANDS[command] if stage in args.only]
+        if not only:
+            parser.error(f"--only {' '.join(args.only)} selects none of the '{command}' stages "
+                         f"({', '.join(COMMANDS[command])})")
 
     # Run pipeline
-    pipeline = FootballAnalysisPipeline()
-    pipeline.run(skip_scraping=args.skip_scraping)
+    pipeline = FootballAnalysisPipeline(
+        database_path=args.database,
+        parallel_charts=args.parallel_charts,
+        in_memory_charts=args.in_memory_charts,
+        pdf_profile=args.pdf_profile,
+        batch_reports=args.batch_reports,
+        pdf=args.pdf
+    )
+    pipeline.run(
+        skip_scraping=args.skip_scraping and command == 'all',
+        only=only,
+        start=args.start,
+        until=args.until,
+        max_workers=args.workers,
+        trace_file=args.trace,
+        profile=args.profile,
+        profile_dir=args.profile_dir,
+        profile_memory=args.profile_memory,
+        metrics_file=args.metrics_file
+    )
 
 
 if __name__ == "__main__":
@@ -10,11 +10,11 @@ from scipy import stats
 import logging
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from chunked import DEFAULT_CHUNKSIZE, RunningStats, CSVAppender, iter_csv_chunks
+from logging_setup import configure_logging
+from schema import apply_schema, exact, read_csv, to_csv
+from validation import validate_stage
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,12 +30,14 @@ class PerformanceAnalyzer:
         """
         self.data_dir = Path(data_dir)
 
-    def calculate_z_scores(self, df: pd.DataFrame) -> pd.DataFrame:
+    def calculate_z_scores(self, df: pd.DataFrame, variance_stats=None) -> pd.DataFrame:
         """
         Calculate z-scores for variance to measure statistical significance
 
         Args:
             df: DataFrame with xPTS and variance data
+            variance_stats: RunningStats of Variance over the whole dataset, when
+                df is one chunk of it (defaults to df's own mean and std)
 
         Returns:
             DataFrame with z-scores added
@@ -43,8 +45,12 @@ class PerformanceAnalyzer:
         logger.info("Calculating z-scores for variance...")
 
         # Calculate z-score for variance
-        mean_variance = df['Variance'].mean()
-        std_variance = df['Variance'].std()
+        if variance_stats is None:
+            mean_variance = df['Variance'].mean()
+            std_variance = df['Variance'].std()
+        else:
+            mean_variance = variance_stats.mean
+            std_variance = variance_stats.std
 
         df['Z_Score'] = (df['Variance'] - mean_variance) / std_variance
 
@@ -169,20 +175,25 @@ class PerformanceAnalyzer:
 
         return round(regression_prob, 3)
 
-    def analyze_performance(self, df: pd.DataFrame) -> pd.DataFrame:
+    def analyze_performance(self, df: pd.DataFrame, variance_stats=None) -> pd.DataFrame:
         """
         Perform complete performance analysis
 
         Args:
             df: DataFrame with xPTS data
+            variance_stats: RunningStats of Variance over the whole dataset, when
+                df is one chunk of it
 
         Returns:
-            DataFrame with complete analysis
+            DataFrame with complete analysis, in the compact schema
         """
         logger.info("Starting performance analysis...")
 
+        # Statistics and scores are computed on the exact float64 variance
+        df['Variance'] = exact(df['Variance'])
+
         # Calculate z-scores
-        df = self.calculate_z_scores(df)
+        df = self.calculate_z_scores(df, variance_stats)
 
         # Calculate risk scores
         df['Risk_Score'] = df['Variance'].apply(self.calculate_risk_score)
@@ -201,7 +212,7 @@ class PerformanceAnalyzer:
 
         logger.info("Performance analysis completed")
 
-        return df
+        return apply_schema(df)
 
     def load_xpts_data(self, filename: str = "xpts_data.csv") -> pd.DataFrame:
         """
@@ -218,7 +229,7 @@ class PerformanceAnalyzer:
         if not input_path.exists():
             raise FileNotFoundError(f"xPTS data file not found: {input_path}")
 
-        df = pd.read_csv(input_path)
+        df = read_csv(input_path)
         logger.info(f"Loaded xPTS data from {input_path}")
 
         return df
@@ -232,7 +243,7 @@ class PerformanceAnalyzer:
             filename: Output filename
         """
         output_path = self.data_dir / filename
-        df.to_csv(output_path, index=False)
+        to_csv(df, output_path)
         logger.info(f"Risk analysis saved to {output_path}")
 
     def run(self, input_file: str = "xpts_data.csv", output_file: str = "risk_analysis.csv") -> tuple:
@@ -248,11 +259,13 @@ class PerformanceAnalyzer:
         """
         logger.info("Starting risk analysis...")
 
-        # Load xPTS data
+        # Load and validate xPTS data
         df = self.load_xpts_data(input_file)
+        validate_stage(df, 'xpts')
 
         # Perform analysis
         analyzed_df = self.analyze_performance(df)
+        validate_stage(analyzed_df, 'risk')
 
         # Identify regression candidates
         candidates = self.identify_regression_candidates(analyzed_df)
@@ -264,35 +277,90 @@ class PerformanceAnalyzer:
 
         return analyzed_df, candidates
 
+    def run_chunked(self, input_file: str = "xpts_data.csv", output_file: str = "risk_analysis.csv",
+                    chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+        """
+        Run the analysis over an xPTS file of any size in bounded memory
+
+        Z-scores need the mean and standard deviation of the whole file, so a
+        first pass streams the Variance column into RunningStats and a second
+        pass analyzes each chunk against those totals and appends it to the
+        output. The result equals run() on the whole file.
 
-def main():
-    """Main function for testing the analyzer"""
-    analyzer = PerformanceAnalyzer()
+        Args:
+            input_file: Input CSV file with xPTS data
+            output_file: Output CSV file for risk analysis
+            chunksize: Rows per chunk
+
+        Returns:
+            Dictionary with the row count and the Variance mean and std
+        """
+        input_path = self.data_dir / input_file
+        if not input_path.exists():
+            raise FileNotFoundError(f"xPTS data file not found: {input_path}")
 
-    try:
-        df, candidates = analyzer.run()
+        variance_stats = RunningStats()
+        for chunk in iter_csv_chunks(input_path, chunksize, usecols=['Variance']):
+            variance_stats.update(chunk['Variance'])
+        logger.info(f"Pass 1: Variance over {variance_stats.count:,} rows "
+                    f"(mean={variance_stats.mean:.2f}, std={variance_stats.std:.2f})")
 
-        print("\n=== Risk Analysis Summary ===")
-        print("\nTop 5 Teams by Risk Score:")
-        print(df.nlargest(5, 'Risk_Score')[
-            ['Team', 'Actual_Points', 'xPTS', 'Variance', 'Risk_Score', 'Risk_Category', 'Regression_Probability']
-        ])
+        output = CSVAppender(self.data_dir / output_file)
+        for chunk in iter_csv_chunks(input_path, chunksize):
+            # Chunks cut across league-seasons, so only per-row checks apply
+            validate_stage(chunk, 'xpts', partial=True, quiet=True)
+            output.write(self.analyze_performance(chunk, variance_stats))
+        logger.info(f"Pass 2: risk analysis for {output.rows:,} rows saved to {output.path}")
 
-        print("\n\nOverperforming Teams (Variance > +3):")
-        if len(candidates['overperforming']) > 0:
-            print(candidates['overperforming'][['Team', 'Variance', 'Risk_Score', 'Regression_Probability']])
-        else:
-            print("None")
+        return {'rows': output.rows, 'variance_mean': variance_stats.mean, 'variance_std': variance_stats.std}
 
-        print("\n\nUnderperforming Teams (Variance < -3):")
-        if len(candidates['underperforming']) > 0:
-            print(candidates['underperforming'][['Team', 'Variance', 'Risk_Score']])
-        else:
-            print("None")
 
-    except FileNotFoundError as e:
-        logger.error(f"Error: {e}")
-        logger.info("Please run the scraper and calculator first.")
+def main():
+    """Main function for testing the analyzer"""
+    import argparse
+    from profiling import add_profile_arguments, profile_from_args
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Run the statistical risk analysis')
+    parser.add_argument('--chunksize', type=int,
+                        help='Stream xpts_data.csv in chunks of this many rows (for archives too large for memory)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args, 'analyze'):
+        analyzer = PerformanceAnalyzer()
+
+        try:
+            if args.chunksize:
+                summary = analyzer.run_chunked(chunksize=args.chunksize)
+                print(f"\nAnalyzed {summary['rows']:,} teams in chunks of {args.chunksize:,} rows "
+                      f"(Variance mean={summary['variance_mean']:.2f}, std={summary['variance_std']:.2f})")
+                return
+
+            df, candidates = analyzer.run()
+
+            print("\n=== Risk Analysis Summary ===")
+            print("\nTop 5 Teams by Risk Score:")
+            print(df.nlargest(5, 'Risk_Score')[
+                ['Team', 'Actual_Points', 'xPTS', 'Variance', 'Risk_Score', 'Risk_Category', 'Regression_Probability']
+            ])
+
+            print("\n\nOverperforming Teams (Variance > +3):")
+            if len(candidates['overperforming']) > 0:
+                print(candidates['overperforming'][['Team', 'Variance', 'Risk_Score', 'Regression_Probability']])
+            else:
+                print("None")
+
+            print("\n\nUnderperforming Teams (Variance < -3):")
+            if len(candidates['underperforming']) > 0:
+                print(candidates['underperforming'][['Team', 'Variance', 'Risk_Score']])
+            else:
+                print("None")
+
+        except FileNotFoundError as e:
+            logger.error(f"Error: {e}")
+            logger.info("Please run the scraper and calculator first.")
 
 
 if __name__ == "__main__":
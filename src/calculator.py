@@ -7,15 +7,47 @@ import pandas as pd
 import numpy as np
 from scipy.stats import poisson
 import logging
+from functools import lru_cache
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from chunked import (DEFAULT_CHUNKSIZE, CSVAppender, batch_partitions, iter_csv_chunks, iter_partitions,
+                     partition_columns)
+from instrumentation import span
+from logging_setup import configure_logging
+from schema import apply_schema, exact, read_csv, to_csv
+from validation import validate_stage
+
 logger = logging.getLogger(__name__)
 
+MAX_GOALS = 10  # Reasonable upper limit for goal calculations
+
+
+@lru_cache(maxsize=4096)
+def match_probabilities(xg_home: float, xg_away: float) -> tuple:
+    """
+    Calculate win/draw/loss probabilities from the Poisson scoreline grid
+
+    Cached because a long-running process (see daemon.py) sees the same
+    per-match xG averages again for every team whose data did not change.
+
+    Args:
+        xg_home: Expected goals for home team
+        xg_away: Expected goals for away team
+
+    Returns:
+        Tuple of (p_home_win, p_draw, p_away_win)
+    """
+    goals = np.arange(MAX_GOALS + 1)
+
+    # Probability of every exact scoreline: rows are home goals, columns away goals
+    grid = np.outer(poisson.pmf(goals, xg_home), poisson.pmf(goals, xg_away))
+
+    p_home_win = float(np.tril(grid, -1).sum())
+    p_draw = float(np.trace(grid))
+    p_away_win = float(np.triu(grid, 1).sum())
+
+    return p_home_win, p_draw, p_away_win
+
 
 class ExpectedPointsCalculator:
     """Calculator for Expected Points (xPTS) using Poisson distribution"""
@@ -40,25 +72,7 @@ class ExpectedPointsCalculator:
         Returns:
             dict with p_home_win, p_draw, p_away_win
         """
-        max_goals = 10  # Reasonable upper limit for goal calculations
-
-        # Calculate probability for each scoreline
-        p_home_win = 0
-        p_draw = 0
-        p_away_win = 0
-
-        for home_goals in range(max_goals + 1):
-            for away_goals in range(max_goals + 1):
-                # Probability of this exact scoreline
-                p_score = (poisson.pmf(home_goals, xg_home) *
-                          poisson.pmf(away_goals, xg_away))
-
-                if home_goals > away_goals:
-                    p_home_win += p_score
-                elif home_goals == away_goals:
-                    p_draw += p_score
-                else:
-                    p_away_win += p_score
+        p_home_win, p_draw, p_away_win = match_probabilities(float(xg_home), float(xg_away))
 
         return {
             'p_home_win': p_home_win,
@@ -94,6 +108,10 @@ class ExpectedPointsCalculator:
         For simplicity, we assume teams play half their games at home and half away.
         We calculate xPTS based on their average xG per match.
 
+        League and Season columns (e.g. from synthetic.py or a multi-league
+        scrape) are passed through, and expected positions are ranked within
+        each league-season.
+
         Args:
             df: DataFrame with raw team data
 
@@ -102,8 +120,12 @@ class ExpectedPointsCalculator:
         """
         logger.info("Calculating expected points for all teams...")
 
+        group_cols = [col for col in ('League', 'Season') if col in df.columns]
         results = []
 
+        # Compact float32 inputs are widened so the Poisson inputs are exact
+        df = df.assign(xG_For=exact(df['xG_For']), xG_Against=exact(df['xG_Against']))
+
         for _, row in df.iterrows():
             team = row['Team']
             matches = row['Matches']
@@ -130,6 +152,7 @@ class ExpectedPointsCalculator:
             variance = row['Actual_Points'] - total_xpts
 
             results.append({
+                **{col: row[col] for col in group_cols},
                 'Team': team,
                 'Matches': matches,
                 'Actual_Points': row['Actual_Points'],
@@ -142,16 +165,25 @@ class ExpectedPointsCalculator:
                 'Position_Actual': row['Position']
             })
 
-            logger.info(f"{team}: Actual={row['Actual_Points']}, xPTS={round(total_xpts, 2)}, Variance={round(variance, 2)}")
+            # Lazy %-formatting: sampled-out per-team lines are never formatted
+            logger.info("%s: Actual=%s, xPTS=%s, Variance=%s", team, row['Actual_Points'],
+                        round(total_xpts, 2), round(variance, 2), extra={'team': team})
 
-        result_df = pd.DataFrame(results)
+        result_df = apply_schema(pd.DataFrame(results))
 
-        # Calculate expected position based on xPTS
-        result_df = result_df.sort_values('xPTS', ascending=False).reset_index(drop=True)
-        result_df['Position_Expected'] = range(1, len(result_df) + 1)
+        if group_cols:
+            # Expected position within each league-season, ties in table order
+            result_df['Position_Expected'] = result_df.groupby(group_cols, sort=False)['xPTS'].rank(
+                method='first', ascending=False
+            ).astype('int16')
+            result_df = result_df.sort_values(group_cols + ['Position_Actual']).reset_index(drop=True)
+        else:
+            # Calculate expected position based on xPTS, ties in table order
+            result_df = result_df.sort_values('xPTS', ascending=False, kind='stable').reset_index(drop=True)
+            result_df['Position_Expected'] = np.arange(1, len(result_df) + 1, dtype='int16')
 
-        # Re-sort by actual position
-        result_df = result_df.sort_values('Position_Actual').reset_index(drop=True)
+            # Re-sort by actual position
+            result_df = result_df.sort_values('Position_Actual').reset_index(drop=True)
 
         logger.info(f"Calculated xPTS for {len(result_df)} teams")
 
@@ -172,7 +204,7 @@ class ExpectedPointsCalculator:
         if not input_path.exists():
             raise FileNotFoundError(f"Raw data file not found: {input_path}")
 
-        df = pd.read_csv(input_path)
+        df = read_csv(input_path)
         logger.info(f"Loaded data from {input_path}")
 
         return df
@@ -186,7 +218,7 @@ class ExpectedPointsCalculator:
             filename: Output filename
         """
         output_path = self.data_dir / filename
-        df.to_csv(output_path, index=False)
+        to_csv(df, output_path)
         logger.info(f"xPTS data saved to {output_path}")
 
     def run(self, input_file: str = "raw_data.csv", output_file: str = "xpts_data.csv") -> pd.DataFrame:
@@ -202,11 +234,14 @@ class ExpectedPointsCalculator:
         """
         logger.info("Starting xPTS calculation...")
 
-        # Load raw data
+        # Load and validate raw data
         df = self.load_raw_data(input_file)
+        validate_stage(df, 'raw')
 
         # Calculate xPTS
-        result_df = self.calculate_season_xpts(df)
+        with span('xpts', 'calculate', rows=len(df)):
+            result_df = self.calculate_season_xpts(df)
+        validate_stage(result_df, 'xpts')
 
         # Save results
         self.save_data(result_df, output_file)
@@ -215,24 +250,83 @@ class ExpectedPointsCalculator:
 
         return result_df
 
+    def run_chunked(self, input_file: str = "raw_data.csv", output_file: str = "xpts_data.csv",
+                    chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+        """
+        Run the xPTS calculation over a raw data file of any size in bounded memory
+
+        The input is read in chunks and regrouped into league-season
+        partitions (expected positions are ranked within each), and every
+        partition is appended to the output as soon as it is computed. The
+        input must keep each league-season's rows together, as the pipeline
+        and synthetic.py write them. Partitions are validated in batches of
+        about chunksize rows.
+
+        Args:
+            input_file: Input CSV file with raw data
+            output_file: Output CSV file for xPTS data
+            chunksize: Rows per chunk
+
+        Returns:
+            Number of rows written
+        """
+        input_path = self.data_dir / input_file
+        if not input_path.exists():
+            raise FileNotFoundError(f"Raw data file not found: {input_path}")
+
+        output = CSVAppender(self.data_dir / output_file)
+        keys = partition_columns(input_path)
+        partitions = 0
+
+        with span('xpts', 'calculate') as xpts_span:
+            partition_iter = iter_partitions(iter_csv_chunks(input_path, chunksize), keys)
+            for batch in batch_partitions(partition_iter, chunksize):
+                # Batches hold whole league-seasons, so the table checks apply
+                validate_stage(pd.concat([df for _, df in batch], ignore_index=True), 'raw', quiet=True)
+                for _, partition in batch:
+                    output.write(self.calculate_season_xpts(partition))
+                    partitions += 1
+            xpts_span.rows = output.rows
+
+        logger.info(f"xPTS for {output.rows:,} rows in {partitions:,} partitions saved to {output.path}")
+
+        return output.rows
+
 
 def main():
     """Main function for testing the calculator"""
-    calculator = ExpectedPointsCalculator()
-
-    # Test with sample data if raw_data.csv doesn't exist
-    try:
-        df = calculator.run()
-        print("\n=== xPTS Calculation Results ===")
-        print(df[['Team', 'Actual_Points', 'xPTS', 'Variance', 'Position_Actual', 'Position_Expected']].head(10))
-        print(f"\nProcessed {len(df)} teams")
-    except FileNotFoundError:
-        logger.warning("No raw data found. Please run the scraper first.")
-
-        # Test the Poisson calculation with sample values
-        calc = ExpectedPointsCalculator()
-        xpts = calc.calculate_xpts(1.5, 1.2, is_home=True)
-        print(f"\nSample calculation: xG_for=1.5, xG_against=1.2 (home) -> xPTS={xpts}")
+    import argparse
+    from profiling import add_profile_arguments, profile_from_args
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Calculate expected points (xPTS)')
+    parser.add_argument('--chunksize', type=int,
+                        help='Stream raw_data.csv in chunks of this many rows (for archives too large for memory)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args, 'calculate'):
+        calculator = ExpectedPointsCalculator()
+
+        # Test with sample data if raw_data.csv doesn't exist
+        try:
+            if args.chunksize:
+                rows = calculator.run_chunked(chunksize=args.chunksize)
+                print(f"\nProcessed {rows:,} teams in chunks of {args.chunksize:,} rows")
+                return
+
+            df = calculator.run()
+            print("\n=== xPTS Calculation Results ===")
+            print(df[['Team', 'Actual_Points', 'xPTS', 'Variance', 'Position_Actual', 'Position_Expected']].head(10))
+            print(f"\nProcessed {len(df)} teams")
+        except FileNotFoundError:
+            logger.warning("No raw data found. Please run the scraper first.")
+
+            # Test the Poisson calculation with sample values
+            calc = ExpectedPointsCalculator()
+            xpts = calc.calculate_xpts(1.5, 1.2, is_home=True)
+            print(f"\nSample calculation: xG_for=1.5, xG_against=1.2 (home) -> xPTS={xpts}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,381 @@
+"""
+Chunked Processing Module
+Bounded-memory ingestion of large league, match and shot archives: CSVs are
+read in chunks, split into league-season partitions and reduced with
+mergeable partial aggregates
+"""
+
+import math
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Columns identifying a league-season partition
+PARTITION_COLUMNS = ('League', 'Season')
+
+
+class RunningStats:
+    """
+    Streaming count, mean and variance (Welford / Chan et al.)
+
+    Batches are folded in with the parallel merge formula, so statistics
+    built chunk by chunk (or on separate workers and merged) equal the ones
+    computed over the whole column at once.
+    """
+
+    def __init__(self):
+        """Initialize empty statistics"""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _combine(self, count: int, mean: float, m2: float) -> None:
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def update(self, values) -> None:
+        """
+        Fold a batch of values in (NaNs are skipped, as pandas does)
+
+        Args:
+            values: Array-like of numbers
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other: 'RunningStats') -> None:
+        """
+        Fold another set of statistics in
+
+        Args:
+            other: Statistics over a disjoint set of values
+        """
+        self._combine(other.count, other.mean, other.m2)
+
+    def remove(self, values) -> None:
+        """
+        Take a batch of previously added values back out (the merge formula inverted)
+
+        Lets statistics over a table be patched when a few rows change:
+        remove the old values, then update() with the new ones.
+
+        Args:
+            values: Array-like of numbers that were folded in earlier
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        count = len(values)
+        if count == 0:
+            return
+        if count >= self.count:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+
+        mean = values.mean()
+        m2 = float(((values - mean) ** 2).sum())
+        rest = self.count - count
+        rest_mean = (self.count * self.mean - count * mean) / rest
+        delta = mean - rest_mean
+        self.m2 = max(0.0, self.m2 - m2 - delta ** 2 * rest * count / self.count)
+        self.mean = rest_mean
+        self.count = rest
+
+    def to_dict(self) -> dict:
+        """Get the statistics as a JSON-serialisable dict"""
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RunningStats':
+        """
+        Restore statistics saved with to_dict()
+
+        Args:
+            data: Dict with count, mean and m2
+
+        Returns:
+            RunningStats instance
+        """
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = int(data['count']), float(data['mean']), float(data['m2'])
+        return stats
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1, like pandas' Series.var)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, like pandas' Series.std)"""
+        return math.sqrt(self.variance)
+
+
+def iter_csv_chunks(path, chunksize: int = DEFAULT_CHUNKSIZE, **read_csv_kwargs):
+    """
+    Read a CSV in chunks of at most chunksize rows
+
+    Args:
+        path: CSV path
+        chunksize: Rows per chunk
+        **read_csv_kwargs: Passed to pd.read_csv (e.g. usecols, dtype)
+
+    Yields:
+        DataFrame chunks
+    """
+    with pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs) as reader:
+        yield from reader
+
+
+def iter_partitions(chunks, keys: list):
+    """
+    Regroup chunks into complete partitions (e.g. one league-season each)
+
+    The input must be grouped by the key columns, as the pipeline writes
+    it: the rows of one partition are contiguous, though they may span
+    chunk boundaries. The trailing partition of each chunk is carried into
+    the next one, so memory holds one chunk plus one partition.
+
+    Args:
+        chunks: Iterable of DataFrames
+        keys: Partition columns (empty yields everything as one partition)
+
+    Yields:
+        Tuples of (key tuple, partition DataFrame)
+    """
+    keys = list(keys)
+    carry = None
+    finished = set()
+
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if not keys or chunk.empty:
+            carry = chunk
+            continue
+
+        key_values = chunk[keys]
+        changed = (key_values != key_values.shift()).any(axis=1).to_numpy()
+        starts = np.flatnonzero(changed).tolist() + [len(chunk)]
+
+        # Every partition but the last is complete
+        for start, end in zip(starts[:-2], starts[1:-1]):
+            key = tuple(key_values.iloc[start])
+            if key in finished:
+                raise ValueError(f"Input is not grouped by {keys}: {key} appears in separate runs")
+            finished.add(key)
+            yield key, chunk.iloc[start:end].reset_index(drop=True)
+
+        carry = chunk.iloc[starts[-2]:].reset_index(drop=True)
+
+    if carry is not None and not carry.empty:
+        key = tuple(carry[keys].iloc[0]) if keys else ()
+        if key in finished:
+            raise ValueError(f"Input is not grouped by {keys}: {key} appears in separate runs")
+        yield key, carry
+
+
+def batch_partitions(partitions, rows: int = DEFAULT_CHUNKSIZE):
+    """
+    Group consecutive partitions into batches of at least the given row count
+
+    Lets per-call work with a fixed overhead (such as validation) run once
+    per chunk-sized batch instead of once per small league-season.
+
+    Args:
+        partitions: Iterable of (key, DataFrame), as from iter_partitions()
+        rows: Minimum rows per batch (the last batch may be smaller)
+
+    Yields:
+        Lists of (key, DataFrame)
+    """
+    batch = []
+    batch_rows = 0
+    for key, partition in partitions:
+        batch.append((key, partition))
+        batch_rows += len(partition)
+        if batch_rows >= rows:
+            yield batch
+            batch = []
+            batch_rows = 0
+    if batch:
+        yield batch
+
+
+def partition_columns(path) -> list:
+    """
+    Get the partition columns present in a CSV
+
+    Args:
+        path: CSV path
+
+    Returns:
+        Subset of PARTITION_COLUMNS found in the header
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    return [col for col in PARTITION_COLUMNS if col in header]
+
+
+class CSVAppender:
+    """Write DataFrames to one CSV, header first, as they are produced"""
+
+    def __init__(self, path):
+        """
+        Initialize appender
+
+        Args:
+            path: Output CSV (replaced)
+        """
+        self.path = Path(path)
+        self.rows = 0
+        self._started = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Append a DataFrame
+
+        Args:
+            df: Rows to append (same columns as earlier writes)
+        """
+        df.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+        self.rows += len(df)
+
+
+def aggregate_matches(path, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """
+    Build league tables from a match archive without loading it whole
+
+    Each chunk is reduced to per-team partial sums, which are added to the
+    running totals; memory grows with the number of team-seasons, not with
+    the number of matches.
+
+    Args:
+        path: Match CSV with League, Season, Home, Away, Home_xG, Away_xG,
+            Home_Goals and Away_Goals (the schema of synthetic.matches())
+        chunksize: Matches per chunk
+
+    Returns:
+        DataFrame in raw_data.csv's schema with League and Season columns,
+        sorted by league, season and position
+    """
+    keys = ['League', 'Season', 'Team']
+    columns = ['League', 'Season', 'Home', 'Away', 'Home_xG', 'Away_xG', 'Home_Goals', 'Away_Goals']
+    totals = None
+    n_matches = 0
+
+    for chunk in iter_csv_chunks(path, chunksize, usecols=columns):
+        n_matches += len(chunk)
+        home_goals, away_goals = chunk['Home_Goals'], chunk['Away_Goals']
+        home_points = np.select([home_goals > away_goals, home_goals == away_goals], [3, 1], 0)
+        away_points = np.select([away_goals > home_goals, home_goals == away_goals], [3, 1], 0)
+
+        sides = pd.concat([
+            pd.DataFrame({'League': chunk['League'], 'Season': chunk['Season'], 'Team': chunk['Home'],
+                          'Matches': 1, 'Goals_For': home_goals, 'Goals_Against': away_goals,
+                          'Actual_Points': home_points, 'xG_For': chunk['Home_xG'],
+                          'xG_Against': chunk['Away_xG']}),
+            pd.DataFrame({'League': chunk['League'], 'Season': chunk['Season'], 'Team': chunk['Away'],
+                          'Matches': 1, 'Goals_For': away_goals, 'Goals_Against': home_goals,
+                          'Actual_Points': away_points, 'xG_For': chunk['Away_xG'],
+                          'xG_Against': chunk['Home_xG']}),
+        ], ignore_index=True)
+        partial = sides.groupby(keys, sort=False).sum()
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None:
+        raise ValueError(f"No matches in {path}")
+
+    table = totals.reset_index()
+    int_columns = ['Matches', 'Goals_For', 'Goals_Against', 'Actual_Points']
+    table[int_columns] = table[int_columns].astype(int)
+    table['xG_For'] = table['xG_For'].round(1)
+    table['xG_Against'] = table['xG_Against'].round(1)
+
+    # Rank within each league-season: points, then goal difference, then goals scored
+    table['_gd'] = table['Goals_For'] - table['Goals_Against']
+    table = table.sort_values(['League', 'Season', 'Actual_Points', '_gd', 'Goals_For'],
+                              ascending=[True, True, False, False, False])
+    table['Position'] = table.groupby(['League', 'Season']).cumcount() + 1
+    table = table.drop(columns='_gd').reset_index(drop=True)
+
+    logger.info(f"Aggregated {n_matches:,} matches into {len(table):,} team-seasons")
+
+    return table
+
+
+def aggregate_shots(path, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+    """
+    Sum a shot archive to per-match xG and goals without loading it whole
+
+    A match's shots may span chunks; their partial sums are added up.
+
+    Args:
+        path: Shot CSV with Match_ID, Side ('Home'/'Away'), xG and Goal
+            (the schema of synthetic.shots())
+        chunksize: Shots per chunk
+
+    Returns:
+        DataFrame indexed by Match_ID with Home_xG, Away_xG, Home_Goals and
+        Away_Goals (join onto the fixture list to get a match archive)
+    """
+    totals = None
+    n_shots = 0
+
+    for chunk in iter_csv_chunks(path, chunksize, usecols=['Match_ID', 'Side', 'xG', 'Goal']):
+        n_shots += len(chunk)
+        chunk['Goal'] = chunk['Goal'].astype(int)
+        # Shot xG has 3 decimals; summing integer thousandths keeps the totals exact
+        chunk['xG'] = (chunk['xG'] * 1000).round().astype('int64')
+        partial = chunk.groupby(['Match_ID', 'Side'])[['xG', 'Goal']].sum()
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None:
+        raise ValueError(f"No shots in {path}")
+
+    per_match = totals.unstack('Side', fill_value=0)
+    result = pd.DataFrame(index=per_match.index)
+    for side in ('Home', 'Away'):
+        result[f'{side}_xG'] = (per_match['xG'].get(side, 0) / 1000).round(2)
+        result[f'{side}_Goals'] = per_match['Goal'].get(side, 0).astype(int)
+
+    logger.info(f"Aggregated {n_shots:,} shots into {len(result):,} matches")
+
+    return result
+
+
+def main():
+    """Main function for building league tables from a match archive"""
+    import argparse
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Aggregate a match archive into league tables in chunks')
+    parser.add_argument('matches', help='Match archive CSV (League, Season, Home, Away, *_xG, *_Goals)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Matches per chunk')
+    parser.add_argument('--output', default='data/raw_data.csv', help='League table CSV to write')
+    args = parser.parse_args()
+
+    table = aggregate_matches(args.matches, args.chunksize)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(args.output, index=False)
+    print(f"Saved {len(table):,} team-seasons to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Watch Daemon Module
+Long-running process that keeps the pipeline warm and recomputes a league
+as soon as new raw data for it lands
+"""
+
+import os
+import json
+import time
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from calculator import match_probabilities
+from incremental import IncrementalPipeline
+from reporter import PerformanceReportGenerator
+from history import SnapshotStore
+from logging_setup import configure_logging, log_sampling_summary
+from schema import read_csv, slugify
+from validation import validate_stage
+
+logger = logging.getLogger(__name__)
+
+
+class WatchDaemon:
+    """
+    Incremental recompute loop over an incoming-data directory
+
+    Raw league tables (the scraper's raw_data.csv schema) are dropped into
+    ``incoming_dir`` as one CSV per league, e.g. ``premier-league.csv``, or as
+    a single CSV with a League column. Writers should write to a temporary
+    name and rename into place; files starting with '.' or not ending in
+    '.csv' are ignored. Every poll compares file mtimes and sizes, and only
+    the leagues in changed files are recomputed. The calculator, analyzer and
+    reporter stay loaded between updates, and the Poisson match probabilities
+    stay cached, so an update costs milliseconds rather than a cold start.
+    Within a league only the teams whose rows changed are recomputed, and
+    each update publishes a change set next to the league's JSON.
+    """
+
+    def __init__(self, data_dir: str = "data", incoming_dir: str = None,
+                 output_dir: str = "output/live", poll_interval: float = 1.0,
+                 record_history: bool = True):
+        """
+        Initialize daemon
+
+        Args:
+            data_dir: Directory for data files (and snapshot history)
+            incoming_dir: Directory to watch (defaults to <data_dir>/incoming)
+            output_dir: Directory to publish per-league JSON and the risk table to
+            poll_interval: Seconds between directory scans
+            record_history: Append every recomputed league to the snapshot history
+        """
+        self.data_dir = Path(data_dir)
+        self.incoming_dir = Path(incoming_dir) if incoming_dir else self.data_dir / "incoming"
+        self.output_dir = Path(output_dir)
+        self.incoming_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+
+        self.reporter = PerformanceReportGenerator(output_dir=str(self.output_dir))
+        self.history = SnapshotStore(data_dir) if record_history else None
+
+        # League name -> latest analysis DataFrame
+        self.leagues = {}
+        # League name -> IncrementalPipeline (calculator, analyzer and row hashes)
+        self.pipelines = {}
+        # Input path -> (mtime_ns, size) when last processed
+        self._seen = {}
+
+    def scan(self) -> list:
+        """
+        Find input files that are new or changed since the last poll
+
+        Returns:
+            List of changed file paths
+        """
+        changed = []
+        current = set()
+
+        for path in sorted(self.incoming_dir.glob('*.csv')):
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Removed between glob and stat
+                continue
+
+            current.add(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._seen.get(path) != signature:
+                self._seen[path] = signature
+                changed.append(path)
+
+        # Forget deleted files so a re-created file is picked up again
+        for path in set(self._seen) - current:
+            del self._seen[path]
+
+        return changed
+
+    def load_input(self, path: Path) -> dict:
+        """
+        Read one input file and split it by league
+
+        Args:
+            path: Raw data CSV
+
+        Returns:
+            Dictionary mapping league name to its raw DataFrame
+        """
+        df = read_csv(path)
+
+        if 'League' in df.columns:
+            return {league: group.drop(columns=['League']).reset_index(drop=True)
+                    for league, group in df.groupby('League', sort=False)}
+
+        return {path.stem: df}
+
+    def process_league(self, league: str, df_raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Recompute xPTS and risk analysis for the changed teams of one league and publish it
+
+        A file that was rewritten without any row changing publishes nothing.
+
+        Args:
+            league: League name
+            df_raw: Raw league table for the league
+
+        Returns:
+            DataFrame with the league's analysis, or None if no row changed
+        """
+        validate_stage(df_raw, 'raw')
+        if league not in self.pipelines:
+            self.pipelines[league] = IncrementalPipeline(str(self.data_dir))
+
+        df_analysis, changes = self.pipelines[league].update(df_raw)
+        if not (changes['full'] or changes['recomputed'] or changes['removed']):
+            logger.info(f"{league}: no rows changed, nothing to publish")
+            return None
+
+        df_analysis.insert(0, 'League', league)
+        self.leagues[league] = df_analysis
+        self.publish(league, changes)
+
+        return df_analysis
+
+    def record_snapshot(self, leagues: list) -> None:
+        """
+        Append one snapshot covering every league updated in a poll
+
+        The store takes one run per timestamp, so the leagues are recorded
+        together rather than one run each.
+
+        Args:
+            leagues: Names of the leagues that were recomputed
+        """
+        if self.history is None or not leagues:
+            return
+
+        snapshot = pd.concat([self.leagues[league] for league in leagues], ignore_index=True)
+        try:
+            self.history.append(snapshot)
+        except ValueError as e:
+            logger.error(f"Could not record snapshot for {', '.join(leagues)}: {e}")
+
+    def _write_atomic(self, path: Path, content: str) -> None:
+        """
+        Replace a published file without readers ever seeing a partial write
+
+        Args:
+            path: Destination path
+            content: File content
+        """
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def publish(self, league: str, changes: dict = None) -> None:
+        """
+        Write a league's JSON summary, its change set and the combined risk table
+
+        Args:
+            league: League whose outputs changed
+            changes: Change set from the league's incremental update
+        """
+        summary = self.reporter.render_json(self.leagues[league])
+        summary['league'] = league
+        self._write_atomic(self.output_dir / f"{slugify(league)}.json", json.dumps(summary, indent=2))
+
+        if changes is not None:
+            changes = {'league': league, **changes}
+            self._write_atomic(self.output_dir / f"{slugify(league)}.changes.json",
+                               json.dumps(changes, indent=2))
+
+        risk_table = pd.concat(self.leagues.values(), ignore_index=True)
+        self._write_atomic(self.output_dir / "risk_table.csv", risk_table.to_csv(index=False))
+
+    def poll_once(self) -> list:
+        """
+        Process every input that changed since the last poll
+
+        Returns:
+            Names of the leagues that were recomputed
+        """
+        updated = []
+
+        for path in self.scan():
+            detected = time.time()
+            try:
+                leagues = self.load_input(path)
+            except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+                logger.error(f"Could not read {path}: {e}")
+                continue
+
+            for league, df_raw in leagues.items():
+                started = time.perf_counter()
+                try:
+                    if self.process_league(league, df_raw) is None:
+                        continue
+                except (KeyError, ValueError, ZeroDivisionError) as e:
+                    logger.error(f"Could not process {league} from {path}: {e}")
+                    continue
+
+                landed = self._seen[path][0] / 1e9
+                logger.info(
+                    f"{league}: risk table updated in {(time.perf_counter() - started) * 1000:.0f} ms "
+                    f"({time.time() - landed:.2f}s since the file landed, "
+                    f"{detected - landed:.2f}s waiting for the poll)"
+                )
+                updated.append(league)
+
+        if updated:
+            self.record_snapshot(updated)
+            # Per-team log sampling restarts with every batch of updates
+            log_sampling_summary()
+
+        return updated
+
+    def run(self, max_polls: int = None) -> None:
+        """
+        Watch the incoming directory until interrupted
+
+        Args:
+            max_polls: Stop after this many polls (None runs forever)
+        """
+        logger.info(f"Watching {self.incoming_dir} every {self.poll_interval}s "
+                    f"(publishing to {self.output_dir})")
+
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                self.poll_once()
+                polls += 1
+                if max_polls is None or polls < max_polls:
+                    time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Stopping watch daemon")
+
+        cache = match_probabilities.cache_info()
+        logger.info(f"Match probability cache: {cache.hits} hits, {cache.misses} misses")
+
+
+def main():
+    """Main function for testing the watch daemon"""
+    import argparse
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Recompute league risk tables as raw data lands')
+    parser.add_argument('--incoming', help='Directory to watch (default: data/incoming)')
+    parser.add_argument('--output', default='output/live', help='Directory to publish to')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between scans')
+    parser.add_argument('--polls', type=int, help='Stop after this many scans')
+    parser.add_argument('--no-history', action='store_true', help='Do not record snapshot history')
+    args = parser.parse_args()
+
+    daemon = WatchDaemon(
+        incoming_dir=args.incoming,
+        output_dir=args.output,
+        poll_interval=args.interval,
+        record_history=not args.no_history
+    )
+    daemon.run(max_polls=args.polls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Analysis Database Module
+Optional SQLite backend with indexed queries over xPTS and risk analysis results
+"""
+
+import sqlite3
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from logging_setup import configure_logging
+from schema import export_frame, read_csv
+
+logger = logging.getLogger(__name__)
+
+
+def current_season(today: datetime = None) -> str:
+    """
+    Get the season label for a date (seasons start in August)
+
+    Args:
+        today: Reference date (defaults to now)
+
+    Returns:
+        Season label, e.g. '2025-2026'
+    """
+    today = today or datetime.now()
+    start_year = today.year if today.month >= 8 else today.year - 1
+    return f"{start_year}-{start_year + 1}"
+
+
+class AnalysisDatabase:
+    """SQLite store for calculator and analyzer outputs"""
+
+    # Column name -> SQLite type, in DataFrame column order
+    COLUMNS = {
+        'Loaded_At': 'TEXT NOT NULL',
+        'League': 'TEXT NOT NULL',
+        'Season': 'TEXT NOT NULL',
+        'Team': 'TEXT NOT NULL',
+        'Matches': 'INTEGER',
+        'Actual_Points': 'INTEGER',
+        'Goals_For': 'INTEGER',
+        'Goals_Against': 'INTEGER',
+        'xG_For': 'REAL',
+        'xG_Against': 'REAL',
+        'xPTS': 'REAL',
+        'Variance': 'REAL',
+        'Position_Actual': 'INTEGER',
+        'Position_Expected': 'INTEGER',
+        'Z_Score': 'REAL',
+        'P_Value': 'REAL',
+        'Significant': 'INTEGER',
+        'Risk_Score': 'INTEGER',
+        'Risk_Category': 'TEXT',
+        'Regression_Probability': 'REAL',
+        'Performance_Status': 'TEXT',
+    }
+
+    INDEXES = {
+        'idx_team_seasons_team': ['Team'],
+        'idx_team_seasons_league': ['League'],
+        'idx_team_seasons_season': ['Season'],
+        'idx_team_seasons_risk_category': ['Risk_Category'],
+        'idx_team_seasons_loaded_at': ['Loaded_At'],
+    }
+
+    def __init__(self, db_path: str = "data/analysis.db"):
+        """
+        Initialize database and create the schema if needed
+
+        Args:
+            db_path: Path to the SQLite database file (':memory:' for an in-memory database)
+        """
+        self.db_path = db_path
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Pipeline stages may run on worker threads; writes are still serialised per connection
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        """Create the results table, its indexes and the latest-snapshot view"""
+        column_defs = ',\n    '.join(f'{name} {sql_type}' for name, sql_type in self.COLUMNS.items())
+
+        with self.conn:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS team_seasons (
+                    {column_defs},
+                    PRIMARY KEY (League, Season, Team, Loaded_At)
+                )
+            """)
+
+            for index_name, columns in self.INDEXES.items():
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON team_seasons ({', '.join(columns)})"
+                )
+
+            # Most recent load of every team-season
+            self.conn.execute("""
+                CREATE VIEW IF NOT EXISTS latest_team_seasons AS
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY League, Season, Team ORDER BY Loaded_At DESC
+                    ) AS _rank
+                    FROM team_seasons
+                ) WHERE _rank = 1
+            """)
+
+    def load_results(self, df: pd.DataFrame, league: str = "Premier League",
+                     season: str = None, loaded_at: str = None) -> int:
+        """
+        Bulk-load calculator or analyzer output
+
+        League and Season columns in the DataFrame take precedence over the
+        league/season arguments. Reloading the same team-season with the same
+        timestamp replaces the earlier row.
+
+        Args:
+            df: DataFrame from ExpectedPointsCalculator or PerformanceAnalyzer
+            league: League name for rows without a League column
+            season: Season label for rows without a Season column (defaults to current season)
+            loaded_at: ISO 8601 UTC load timestamp (defaults to now)
+
+        Returns:
+            Number of rows loaded
+        """
+        # Plain float64 and string columns bind directly as SQLite values
+        df = export_frame(df)
+        if 'League' not in df.columns:
+            df['League'] = league
+        if 'Season' not in df.columns:
+            df['Season'] = season or current_season()
+        df['Loaded_At'] = loaded_at or datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        columns = [col for col in self.COLUMNS if col in df.columns]
+        records = df[columns].astype(object).where(df[columns].notna(), None)
+        if 'Significant' in columns:
+            records['Significant'] = records['Significant'].map(
+                lambda v: None if v is None else int(str(v) in ('True', '1'))
+            )
+
+        placeholders = ', '.join('?' * len(columns))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO team_seasons ({', '.join(columns)}) VALUES ({placeholders})",
+                records.itertuples(index=False, name=None)
+            )
+
+        logger.info(f"Loaded {len(df)} rows into {self.db_path}")
+
+        return len(df)
+
+    def load_csv(self, path: str, **kwargs) -> int:
+        """
+        Bulk-load a calculator or analyzer CSV
+
+        Args:
+            path: Path to xpts_data.csv or risk_analysis.csv
+            **kwargs: Passed through to load_results
+
+        Returns:
+            Number of rows loaded
+        """
+        return self.load_results(read_csv(path), **kwargs)
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        """
+        Run an arbitrary read query
+
+        Args:
+            sql: SQL query against team_seasons or latest_team_seasons
+            params: Query parameters
+
+        Returns:
+            DataFrame with query results
+        """
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        return df.drop(columns=['_rank'], errors='ignore')
+
+    def top_overperformers(self, n: int = 10, days: int = 7, league: str = None) -> pd.DataFrame:
+        """
+        Get the biggest overperformers among recently loaded team-seasons
+
+        Args:
+            n: Number of teams to return
+            days: Only consider team-seasons loaded within this many days
+            league: Restrict to one league (None for all leagues)
+
+        Returns:
+            DataFrame sorted by Variance descending
+        """
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        sql = "SELECT * FROM latest_team_seasons WHERE Loaded_At >= ?"
+        params = [since]
+        if league is not None:
+            sql += " AND League = ?"
+            params.append(league)
+        sql += " ORDER BY Variance DESC LIMIT ?"
+        params.append(n)
+
+        return self.query(sql, tuple(params))
+
+    def variance_above(self, threshold: float = 5.0, league: str = None,
+                       season: str = None) -> pd.DataFrame:
+        """
+        Get every team-season whose latest variance exceeds a threshold
+
+        Args:
+            threshold: Minimum variance (exclusive)
+            league: Restrict to one league (None for all leagues)
+            season: Restrict to one season (None for all seasons)
+
+        Returns:
+            DataFrame sorted by Variance descending
+        """
+        sql = "SELECT * FROM latest_team_seasons WHERE Variance > ?"
+        params = [threshold]
+        if league is not None:
+            sql += " AND League = ?"
+            params.append(league)
+        if season is not None:
+            sql += " AND Season = ?"
+            params.append(season)
+        sql += " ORDER BY Variance DESC"
+
+        return self.query(sql, tuple(params))
+
+    def teams_by_risk(self, risk_category: str, season: str = None) -> pd.DataFrame:
+        """
+        Get the latest team-seasons in a risk category
+
+        Args:
+            risk_category: Risk category label (Critical, High, Moderate, Low)
+            season: Restrict to one season (None for all seasons)
+
+        Returns:
+            DataFrame sorted by Risk_Score descending
+        """
+        sql = "SELECT * FROM latest_team_seasons WHERE Risk_Category = ?"
+        params = [risk_category]
+        if season is not None:
+            sql += " AND Season = ?"
+            params.append(season)
+        sql += " ORDER BY Risk_Score DESC"
+
+        return self.query(sql, tuple(params))
+
+    def team_history(self, team: str, league: str = None) -> pd.DataFrame:
+        """
+        Get every stored load for a team
+
+        Args:
+            team: Team name
+            league: Restrict to one league (None for all leagues)
+
+        Returns:
+            DataFrame sorted by Season and Loaded_At
+        """
+        sql = "SELECT * FROM team_seasons WHERE Team = ?"
+        params = [team]
+        if league is not None:
+            sql += " AND League = ?"
+            params.append(league)
+        sql += " ORDER BY Season, Loaded_At"
+
+        return self.query(sql, tuple(params))
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self.conn.close()
+
+
+def main():
+    """Main function for testing the database"""
+    configure_logging()
+
+    db = AnalysisDatabase()
+
+    try:
+        db.load_csv("data/risk_analysis.csv")
+
+        print("\n=== Top 5 Overperformers This Week ===")
+        print(db.top_overperformers(5)[['League', 'Season', 'Team', 'Variance', 'Risk_Category']])
+
+        print("\n=== Team-Seasons with Variance > +5 ===")
+        print(db.variance_above(5)[['League', 'Season', 'Team', 'Variance']])
+
+    except FileNotFoundError as e:
+        logger.error(f"Error: {e}")
+        logger.info("Please run the analyzer first.")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Snapshot History Module
+Append-only time-series store of per-run xPTS and risk snapshots
+"""
+
+import csv
+import io
+import json
+import os
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from database import current_season
+from logging_setup import configure_logging
+from schema import export_frame, read_csv
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    Append-only store of per-run team snapshots
+
+    Every run appends one row per team-season to ``snapshots.csv``, keyed by
+    (Timestamp, League, Season, Team). Rows are delta-encoded against the
+    team-season's previous snapshot: unchanged fields are written as empty
+    cells, missing values as ``NA``, and team-seasons with no changes at all
+    are skipped. The first row for a team-season is always a full keyframe, so
+    its history can be rebuilt by forward-filling its own rows. ``index.json``
+    maps each team-season to the byte offsets of its rows, which turns "team X
+    over the season" into a handful of seeks instead of a scan.
+    """
+
+    KEY_COLUMNS = ['League', 'Season', 'Team']
+
+    TRACKED_COLUMNS = [
+        'Matches', 'Actual_Points', 'xPTS', 'Variance',
+        'Risk_Score', 'Risk_Category', 'Regression_Probability'
+    ]
+
+    # Stored form of a missing value ('' already means "unchanged")
+    MISSING = 'NA'
+
+    def __init__(self, data_dir: str = "data", store_dir: str = "history"):
+        """
+        Initialize snapshot store
+
+        Args:
+            data_dir: Directory containing analysis data
+            store_dir: Subdirectory of data_dir holding the snapshot log and index
+        """
+        self.store_dir = Path(data_dir) / store_dir
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.store_dir / 'snapshots.csv'
+        self.index_path = self.store_dir / 'index.json'
+        self.columns = ['Timestamp'] + self.KEY_COLUMNS + self.TRACKED_COLUMNS
+        self._index = None
+
+    @staticmethod
+    def _key(league: str, season: str, team: str) -> str:
+        """
+        Build the index key of a team-season
+
+        Args:
+            league: League name
+            season: Season label
+            team: Team name
+
+        Returns:
+            JSON-encoded [league, season, team] (unambiguous whatever the names contain)
+        """
+        return json.dumps([league, season, team])
+
+    @classmethod
+    def _format_value(cls, value) -> str:
+        """
+        Normalise a cell value to its stored string form
+
+        Args:
+            value: Raw value from the analysis DataFrame
+
+        Returns:
+            String representation (MISSING for missing values)
+        """
+        if pd.isna(value):
+            return cls.MISSING
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    @staticmethod
+    def _encode_row(values: list) -> bytes:
+        """
+        Encode a list of cells as one CSV line
+
+        Args:
+            values: Cell values
+
+        Returns:
+            UTF-8 encoded CSV line including the line terminator
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(values)
+        return buffer.getvalue().encode('utf-8')
+
+    def _empty_index(self) -> dict:
+        """Return an empty index structure"""
+        return {'columns': self.columns, 'runs': [], 'teams': {}, 'last': {}}
+
+    def load_index(self) -> dict:
+        """
+        Load the team index, rebuilding it from the log if missing or stale
+
+        Returns:
+            Index dict with 'runs', 'teams' (team-season key -> [[timestamp, offset], ...])
+            and 'last' (team-season key -> last known full values)
+        """
+        if self._index is not None:
+            return self._index
+
+        if self.index_path.exists():
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            log_size = self.log_path.stat().st_size if self.log_path.exists() else 0
+            if index.get('log_size') == log_size and index.get('columns') == self.columns:
+                self._index = index
+                return index
+            logger.warning("Snapshot index is out of date, rebuilding from log")
+
+        self._index = self.rebuild_index()
+        return self._index
+
+    def rebuild_index(self) -> dict:
+        """
+        Rebuild the index by scanning the snapshot log
+
+        Returns:
+            Rebuilt index dict
+
+        Raises:
+            ValueError: If the log was written with a different column layout
+        """
+        index = self._empty_index()
+
+        if self.log_path.exists() and self.log_path.stat().st_size > 0:
+            with open(self.log_path, 'rb') as f:
+                header = next(csv.reader([f.readline().decode('utf-8')]))
+                if header != self.columns:
+                    raise ValueError(
+                        f"Snapshot log {self.log_path} has columns {header}, expected {self.columns}; "
+                        f"move it aside to start a new history"
+                    )
+                offset = f.tell()
+                for line in iter(f.readline, b''):
+                    row = next(csv.reader([line.decode('utf-8')]))
+                    timestamp, key = row[0], self._key(*row[1:4])
+                    if not index['runs'] or index['runs'][-1] != timestamp:
+                        index['runs'].append(timestamp)
+                    index['teams'].setdefault(key, []).append([timestamp, offset])
+                    last = index['last'].setdefault(key, {})
+                    for col, value in zip(self.TRACKED_COLUMNS, row[4:]):
+                        if value != '':
+                            last[col] = value
+                    offset = f.tell()
+
+        self._write_index(index)
+        logger.info(f"Rebuilt snapshot index ({len(index['teams'])} team-seasons, {len(index['runs'])} runs)")
+
+        return index
+
+    def _write_index(self, index: dict) -> None:
+        """
+        Atomically write the index next to the log
+
+        Args:
+            index: Index dict to persist
+        """
+        index['log_size'] = self.log_path.stat().st_size if self.log_path.exists() else 0
+        tmp_path = self.index_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def append(self, df: pd.DataFrame, timestamp: str = None,
+               league: str = "Premier League", season: str = None) -> int:
+        """
+        Append a snapshot of the analysis results
+
+        League and Season columns in the DataFrame take precedence over the
+        league/season arguments.
+
+        Args:
+            df: DataFrame with analysis data (Team plus tracked columns)
+            timestamp: ISO 8601 UTC timestamp for the run (defaults to now, with
+                microseconds so runs inside the same second stay ordered)
+            league: League name for rows without a League column
+            season: Season label for rows without a Season column (defaults to current season)
+
+        Returns:
+            Number of team-season rows written
+        """
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+        index = self.load_index()
+        if index['runs'] and timestamp <= index['runs'][-1]:
+            raise ValueError(
+                f"Snapshot timestamp {timestamp} must be later than last run {index['runs'][-1]}"
+            )
+
+        missing_cols = set(['Team'] + self.TRACKED_COLUMNS) - set(df.columns)
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {missing_cols}")
+
+        new_file = not self.log_path.exists() or self.log_path.stat().st_size == 0
+        rows_written = 0
+
+        with open(self.log_path, 'ab') as f:
+            if new_file:
+                f.write(self._encode_row(self.columns))
+
+            tracked = export_frame(df[[col for col in self.KEY_COLUMNS if col in df.columns]
+                                      + self.TRACKED_COLUMNS])
+            if 'League' not in tracked.columns:
+                tracked.insert(0, 'League', league)
+            if 'Season' not in tracked.columns:
+                tracked.insert(1, 'Season', season or current_season())
+            tracked = tracked[self.KEY_COLUMNS + self.TRACKED_COLUMNS]
+
+            for row in tracked.itertuples(index=False):
+                names = [str(name) for name in row[:3]]
+                key = self._key(*names)
+                current = {col: self._format_value(v) for col, v in zip(self.TRACKED_COLUMNS, row[3:])}
+                previous = index['last'].get(key)
+
+                if previous is None:
+                    delta = [current[col] for col in self.TRACKED_COLUMNS]
+                else:
+                    delta = [
+                        current[col] if current[col] != previous.get(col) else ''
+                        for col in self.TRACKED_COLUMNS
+                    ]
+                    if not any(delta):
+                        continue
+
+                offset = f.tell()
+                f.write(self._encode_row([timestamp] + names + delta))
+                index['teams'].setdefault(key, []).append([timestamp, offset])
+                index['last'][key] = current
+                rows_written += 1
+
+        # Runs that change nothing leave the store untouched
+        if rows_written == 0:
+            logger.info(f"No changes since last snapshot, skipping run {timestamp}")
+            return 0
+
+        index['runs'].append(timestamp)
+        self._write_index(index)
+
+        logger.info(f"Appended snapshot {timestamp} ({rows_written} of {len(df)} teams changed)")
+
+        return rows_written
+
+    def team_history(self, team: str, league: str = None, season: str = None,
+                     start: str = None, end: str = None) -> pd.DataFrame:
+        """
+        Read one team's snapshot history
+
+        Args:
+            team: Team name
+            league: League name (None for every league the team appears in)
+            season: Season label (None for every stored season)
+            start: Inclusive ISO 8601 lower bound (None for the first run)
+            end: Inclusive ISO 8601 upper bound (None for the latest run)
+
+        Returns:
+            DataFrame with one fully populated row per stored snapshot, ordered by
+            timestamp (empty if the team has no history)
+        """
+        frames = []
+        for key, entries in self.load_index()['teams'].items():
+            key_league, key_season, key_team = json.loads(key)
+            if key_team != team or league not in (None, key_league) or season not in (None, key_season):
+                continue
+
+            timestamps = [ts for ts, _ in entries]
+            # Earlier rows are still needed to forward-fill delta-encoded cells
+            stop = bisect_right(timestamps, end) if end is not None else len(entries)
+            first = bisect_left(timestamps, start) if start is not None else 0
+
+            rows = []
+            with open(self.log_path, 'rb') as f:
+                for _, offset in entries[:stop]:
+                    f.seek(offset)
+                    rows.append(next(csv.reader([f.readline().decode('utf-8')])))
+
+            # Forward-fill unchanged cells first, then decode values that went missing
+            frame = pd.DataFrame(rows, columns=self.columns).replace('', pd.NA).ffill()
+            frames.append(frame.iloc[first:])
+
+        if frames:
+            history = pd.concat(frames).sort_values('Timestamp', kind='stable').reset_index(drop=True)
+        else:
+            history = pd.DataFrame(columns=self.columns)
+        history[self.TRACKED_COLUMNS] = history[self.TRACKED_COLUMNS].replace(self.MISSING, pd.NA)
+
+        for col in self.TRACKED_COLUMNS:
+            if col != 'Risk_Category':
+                history[col] = pd.to_numeric(history[col])
+        history['Timestamp'] = pd.to_datetime(history['Timestamp'], format='ISO8601')
+
+        return history
+
+    def runs(self) -> list:
+        """
+        List the timestamps of all stored runs
+
+        Returns:
+            List of ISO 8601 timestamps in append order
+        """
+        return list(self.load_index()['runs'])
+
+    def teams(self) -> list:
+        """
+        List all team-seasons with stored history
+
+        Returns:
+            Sorted list of (league, season, team) tuples
+        """
+        return sorted(tuple(json.loads(key)) for key in self.load_index()['teams'])
+
+
+def main():
+    """Main function for testing the snapshot store"""
+    configure_logging()
+
+    store = SnapshotStore()
+
+    try:
+        df = read_csv(Path("data") / "risk_analysis.csv")
+        store.append(df)
+
+        print("\n=== Snapshot History ===")
+        print(f"Runs stored: {len(store.runs())}")
+        team = df.iloc[0]['Team']
+        print(f"\nHistory for {team}:")
+        print(store.team_history(team))
+
+    except FileNotFoundError as e:
+        logger.error(f"Error: {e}")
+        logger.info("Please run the analyzer first.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Incremental Recomputation Module
+Diff-aware xPTS and risk updates that recompute only the teams whose raw
+rows changed
+"""
+
+import os
+import json
+import time
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calculator import ExpectedPointsCalculator
+from analyzer import PerformanceAnalyzer
+from chunked import RunningStats
+from schema import apply_schema, exact, export_frame, read_csv, to_csv
+from validation import validate_stage
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Columns identifying a team row; the ones present in the raw table are used
+KEY_COLUMNS = ('League', 'Season', 'Team')
+
+# Columns the analyzer adds to the xPTS table
+ANALYSIS_COLUMNS = ['Z_Score', 'P_Value', 'Significant', 'Risk_Score', 'Risk_Category',
+                    'Regression_Probability', 'Performance_Status']
+
+# Per-team fields reported in the change set (z-scores and p-values move for
+# every team whenever the league-wide statistics change, so they are
+# reported once as variance_stats instead)
+TRACKED_COLUMNS = ['Matches', 'Actual_Points', 'xPTS', 'Variance', 'Position_Actual', 'Position_Expected',
+                   'Significant', 'Risk_Score', 'Risk_Category', 'Regression_Probability',
+                   'Performance_Status']
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash every row of a raw table
+
+    Rows are normalised to the schema's exact values first, so the same data
+    hashes the same whether it was read from a CSV or built in memory.
+
+    Args:
+        df: Raw league table
+
+    Returns:
+        uint64 array with one hash per row
+    """
+    normalised = export_frame(apply_schema(df))
+    return pd.util.hash_pandas_object(normalised, index=False).to_numpy()
+
+
+class IncrementalPipeline:
+    """
+    Diff-aware xPTS and risk analysis
+
+    Every raw row is hashed and compared with the hashes of the previous
+    update. Only added and changed teams go through the Poisson xPTS
+    calculation and the risk scoring; the league-wide Variance statistics
+    are patched (the old values removed, the new ones added) rather than
+    recomputed, and expected positions are patched by moving the changed
+    teams within each league-season's sorted xPTS order. Each update returns
+    a change set listing what moved, for downstream stages to act on.
+
+    Expected-position ties are broken by actual position, which is the
+    table order the scraper and synthetic.py write.
+    """
+
+    def __init__(self, data_dir: str = "data", state_file: str = "incremental_state.json"):
+        """
+        Initialize pipeline
+
+        Args:
+            data_dir: Directory with raw_data.csv and the outputs
+            state_file: Row hashes and statistics kept between runs, in data_dir
+        """
+        self.data_dir = Path(data_dir)
+        self.state_path = self.data_dir / state_file
+        self.calculator = ExpectedPointsCalculator(data_dir)
+        self.analyzer = PerformanceAnalyzer(data_dir)
+
+        self.key_columns = None
+        # Key tuple -> raw row hash
+        self.hashes = None
+        # Analysis table indexed by key
+        self.table = None
+        self.variance_stats = None
+        # League-season -> sorted [(-xPTS, Position_Actual, key), ...]
+        self._orders = None
+
+    def _index(self, df: pd.DataFrame) -> pd.MultiIndex:
+        """Key index (League, Season, Team as present) for a table"""
+        return pd.MultiIndex.from_arrays([df[col].astype(str).to_numpy() for col in self.key_columns])
+
+    def _order_entry(self, key: tuple, row) -> tuple:
+        """Sort key of a team within its league-season's expected-position order"""
+        return -round(float(row['xPTS']), 2), int(row['Position_Actual']), key
+
+    def _build_orders(self) -> None:
+        """Index every league-season's teams by xPTS, from the stored expected positions"""
+        self._orders = {}
+        ordered = self.table.sort_values('Position_Expected', kind='stable')
+        for key, row in zip(ordered.index, ordered[['xPTS', 'Position_Actual']].to_dict('records')):
+            self._orders.setdefault(key[:-1], []).append(self._order_entry(key, row))
+        for entries in self._orders.values():
+            entries.sort()
+
+    def _sorted(self, table: pd.DataFrame) -> pd.DataFrame:
+        """Put a table in the batch pipeline's row order"""
+        group_cols = [col for col in self.key_columns if col != 'Team']
+        return table.sort_values(group_cols + ['Position_Actual'], kind='stable')
+
+    def prime(self, df_raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute everything from scratch and remember it as the baseline
+
+        Args:
+            df_raw: Raw league table
+
+        Returns:
+            DataFrame with the analysis
+        """
+        self.key_columns = [col for col in KEY_COLUMNS if col in df_raw.columns]
+
+        df_xpts = self.calculator.calculate_season_xpts(df_raw)
+        df_analysis = self.analyzer.analyze_performance(df_xpts.copy())
+
+        self.hashes = pd.Series(hash_rows(df_raw), index=self._index(df_raw))
+        self.table = df_analysis.set_axis(self._index(df_analysis))
+        self.variance_stats = RunningStats()
+        self.variance_stats.update(exact(df_analysis['Variance']))
+        self._build_orders()
+
+        logger.info(f"Primed incremental state with {len(df_raw)} teams")
+
+        return df_analysis
+
+    def diff(self, df_raw: pd.DataFrame) -> dict:
+        """
+        Compare a raw table with the baseline by row hash
+
+        Args:
+            df_raw: New raw league table
+
+        Returns:
+            Dictionary with 'added', 'changed' and 'removed' key indexes
+        """
+        new_hashes = pd.Series(hash_rows(df_raw), index=self._index(df_raw))
+        common = new_hashes.index.intersection(self.hashes.index)
+        changed = common[new_hashes[common].to_numpy() != self.hashes[common].to_numpy()]
+
+        return {
+            'hashes': new_hashes,
+            'added': new_hashes.index.difference(self.hashes.index, sort=False),
+            'changed': changed,
+            'removed': self.hashes.index.difference(new_hashes.index, sort=False),
+        }
+
+    def update(self, df_raw: pd.DataFrame) -> tuple:
+        """
+        Bring the analysis up to date with a new raw table
+
+        The first call (or a call with different key columns) primes the
+        state with a full computation.
+
+        Args:
+            df_raw: Raw league table (all teams, changed or not)
+
+        Returns:
+            Tuple of (analysis DataFrame, change set dict)
+        """
+        started = time.perf_counter()
+        key_columns = [col for col in KEY_COLUMNS if col in df_raw.columns]
+
+        if self.table is None or key_columns != self.key_columns:
+            df_analysis = self.prime(df_raw)
+            changes = self._change_set(None, len(df_raw), full=True)
+            changes['seconds'] = round(time.perf_counter() - started, 4)
+            return df_analysis, changes
+
+        delta = self.diff(df_raw)
+        added, changed, removed = delta['added'], delta['changed'], delta['removed']
+        previous = self.table
+        old_stats = self.variance_stats.to_dict()
+
+        if len(added) == 0 and len(changed) == 0 and len(removed) == 0:
+            logger.info(f"No raw rows changed ({len(df_raw)} teams)")
+            changes = self._change_set(previous, len(df_raw))
+            changes['seconds'] = round(time.perf_counter() - started, 4)
+            return self._sorted(self.table).reset_index(drop=True), changes
+
+        # Patch the league-wide variance statistics: out with the old rows, in with the new
+        outgoing = changed.append(removed)
+        self.variance_stats.remove(exact(previous.loc[outgoing, 'Variance']))
+
+        recompute = changed.append(added)
+        table = previous.drop(index=outgoing)
+        if len(recompute):
+            raw_rows = df_raw.set_axis(self._index(df_raw)).loc[recompute].reset_index(drop=True)
+            df_xpts = self.calculator.calculate_season_xpts(raw_rows)
+            self.variance_stats.update(exact(df_xpts['Variance']))
+            df_new = self.analyzer.analyze_performance(df_xpts, self.variance_stats)
+            df_new = df_new.set_axis(self._index(df_new))
+            table = pd.concat([table, df_new[table.columns]]) if len(table) else df_new
+
+        # Every z-score moves with the league mean and std; the per-team
+        # Poisson and risk scoring above is what the diff saves
+        table = table.copy()
+        table['Variance'] = exact(table['Variance'])
+        table = self.analyzer.calculate_z_scores(table, self.variance_stats)
+        table['Regression_Probability'] = [
+            self.analyzer.calculate_regression_probability(variance, z_score)
+            for variance, z_score in zip(table['Variance'].to_numpy(), table['Z_Score'].to_numpy())
+        ]
+
+        self.table = table
+        self._patch_positions(previous, outgoing, recompute)
+        self.table = apply_schema(self._sorted(self.table))
+        self.hashes = delta['hashes']
+
+        changes = self._change_set(previous, len(df_raw), added=added, changed=changed,
+                                   removed=removed, old_stats=old_stats)
+        changes['seconds'] = round(time.perf_counter() - started, 4)
+        logger.info(f"Recomputed {len(recompute)} of {len(df_raw)} teams "
+                    f"({len(added)} added, {len(changed)} changed, {len(removed)} removed) "
+                    f"in {changes['seconds'] * 1000:.1f} ms")
+
+        return self.table.reset_index(drop=True), changes
+
+    def _patch_positions(self, previous: pd.DataFrame, outgoing: pd.Index, incoming: pd.Index) -> None:
+        """
+        Move changed teams within their league-season's xPTS order
+
+        Each changed team is taken out of and re-inserted into its group's
+        sorted order by bisection; only the groups that were touched get
+        their Position_Expected values rewritten.
+
+        Args:
+            previous: Analysis table before the update
+            outgoing: Keys whose old rows were removed or replaced
+            incoming: Keys whose new rows were added
+        """
+        touched = set()
+
+        for key, row in zip(outgoing, previous.loc[outgoing, ['xPTS', 'Position_Actual']].to_dict('records')):
+            entries = self._orders[key[:-1]]
+            del entries[bisect_left(entries, self._order_entry(key, row))]
+            touched.add(key[:-1])
+
+        for key, row in zip(incoming, self.table.loc[incoming, ['xPTS', 'Position_Actual']].to_dict('records')):
+            insort(self._orders.setdefault(key[:-1], []), self._order_entry(key, row))
+            touched.add(key[:-1])
+
+        keys, positions = [], []
+        for group in touched:
+            entries = self._orders[group]
+            if not entries:
+                del self._orders[group]
+                continue
+            keys.extend(entry[2] for entry in entries)
+            positions.extend(range(1, len(entries) + 1))
+
+        if keys:
+            self.table.loc[pd.MultiIndex.from_tuples(keys),
+                           'Position_Expected'] = np.array(positions, dtype='int16')
+
+    def _change_set(self, previous, rows: int, added=(), changed=(), removed=(),
+                    old_stats: dict = None, full: bool = False) -> dict:
+        """
+        Describe an update for downstream stages
+
+        Args:
+            previous: Analysis table before the update (None after a full recompute)
+            rows: Rows in the new raw table
+            added: Keys of new teams
+            changed: Keys of teams whose raw rows changed
+            removed: Keys of teams no longer in the raw table
+            old_stats: Variance statistics before the update
+            full: Whether everything was recomputed
+
+        Returns:
+            JSON-serialisable change set
+        """
+        def key_dict(key: tuple) -> dict:
+            return dict(zip(self.key_columns, key))
+
+        new_stats = self.variance_stats
+        changes = {
+            'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'full': full,
+            'rows': rows,
+            'recomputed': rows if full else len(added) + len(changed),
+            'added': [key_dict(key) for key in added],
+            'changed': [key_dict(key) for key in changed],
+            'removed': [key_dict(key) for key in removed],
+            'variance_stats': {'mean': round(float(new_stats.mean), 6), 'std': round(float(new_stats.std), 6)},
+            'teams': [],
+        }
+
+        if previous is None:
+            return changes
+
+        if old_stats is not None:
+            old = RunningStats.from_dict(old_stats)
+            changes['variance_stats']['previous'] = {'mean': round(float(old.mean), 6), 'std': round(float(old.std), 6)}
+
+        # Field-level differences for every team whose outputs moved
+        common = self.table.index.intersection(previous.index, sort=False)
+        before = export_frame(previous.loc[common, TRACKED_COLUMNS])
+        after = export_frame(self.table.loc[common, TRACKED_COLUMNS])
+        moved = before.ne(after) & ~(before.isna() & after.isna())
+
+        for key in common[moved.any(axis=1).to_numpy()]:
+            fields = moved.columns[moved.loc[key].to_numpy()]
+            changes['teams'].append({
+                **key_dict(key),
+                'changes': {col: [_plain(before.at[key, col]), _plain(after.at[key, col])] for col in fields},
+            })
+
+        return changes
+
+    def load_state(self) -> bool:
+        """
+        Restore the baseline saved by a previous run
+
+        The state is only used if risk_analysis.csv is still the file that
+        run wrote; anything else triggers a full recompute.
+
+        Returns:
+            Whether a usable baseline was loaded
+        """
+        risk_path = self.data_dir / "risk_analysis.csv"
+        if not self.state_path.exists() or not risk_path.exists():
+            return False
+
+        with open(self.state_path, 'r') as f:
+            state = json.load(f)
+
+        stat = risk_path.stat()
+        if state.get('signature') != [stat.st_mtime_ns, stat.st_size]:
+            logger.warning(f"{risk_path} changed since the last incremental run, recomputing everything")
+            return False
+
+        self.key_columns = state['key_columns']
+        keys = pd.MultiIndex.from_tuples([tuple(row[:-1]) for row in state["hashes"]])
+        self.hashes = pd.Series(np.array([int(row[-1], 16) for row in state['hashes']], dtype='uint64'),
+                                index=keys)
+        table = read_csv(risk_path)
+        self.table = table.set_axis(self._index(table))
+        self.variance_stats = RunningStats.from_dict(state['variance_stats'])
+        self._build_orders()
+
+        return True
+
+    def save_state(self) -> None:
+        """Atomically write the row hashes and statistics next to the outputs"""
+        stat = (self.data_dir / "risk_analysis.csv").stat()
+        state = {
+            'key_columns': self.key_columns,
+            'signature': [stat.st_mtime_ns, stat.st_size],
+            'variance_stats': self.variance_stats.to_dict(),
+            'hashes': [list(key) + [f"{value:016x}"] for key, value in self.hashes.items()],
+        }
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def run(self, input_file: str = "raw_data.csv", changes_file: str = "changes.json") -> dict:
+        """
+        Update xpts_data.csv and risk_analysis.csv from raw data, recomputing only changed teams
+
+        Args:
+            input_file: Raw data CSV in data_dir
+            changes_file: Change set JSON to write in data_dir
+
+        Returns:
+            Change set dict
+        """
+        input_path = self.data_dir / input_file
+        if not input_path.exists():
+            raise FileNotFoundError(f"Raw data file not found: {input_path}")
+
+        df_raw = read_csv(input_path)
+        validate_stage(df_raw, 'raw')
+
+        if self.table is None:
+            self.load_state()
+
+        df_analysis, changes = self.update(df_raw)
+
+        if changes['full'] or changes['recomputed'] or changes['removed']:
+            validate_stage(df_analysis, 'risk')
+            to_csv(df_analysis[[col for col in df_analysis.columns if col not in ANALYSIS_COLUMNS]],
+                   self.data_dir / "xpts_data.csv")
+            to_csv(df_analysis, self.data_dir / "risk_analysis.csv")
+            self.save_state()
+
+        changes_path = self.data_dir / changes_file
+        with open(changes_path, 'w') as f:
+            json.dump(changes, f, indent=2)
+        logger.info(f"Change set for {len(changes['teams'])} teams saved to {changes_path}")
+
+        return changes
+
+
+def _plain(value):
+    """Convert a numpy scalar to the matching Python type for JSON"""
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def main():
+    """Main function for running an incremental update"""
+    import argparse
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Recompute xPTS and risk only for teams whose raw rows changed')
+    parser.add_argument('--input', default='raw_data.csv', help='Raw data CSV in data/')
+    parser.add_argument('--changes', default='changes.json', help='Change set JSON to write in data/')
+    args = parser.parse_args()
+
+    try:
+        changes = IncrementalPipeline().run(args.input, args.changes)
+    except FileNotFoundError as e:
+        logger.error(f"Error: {e}")
+        logger.info("Please run the scraper first.")
+        return
+
+    print(f"\nRecomputed {changes['recomputed']} of {changes['rows']} teams "
+          f"({'full' if changes['full'] else 'incremental'}) in {changes['seconds'] * 1000:.1f} ms")
+    for team in changes['teams']:
+        fields = ', '.join(f"{col} {old} -> {new}" for col, (old, new) in team['changes'].items())
+        print(f"  {team['Team']}: {fields}")
+
+
+if __name__ == "__main__":
+    main()
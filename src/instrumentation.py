@@ -0,0 +1,290 @@
+"""
+Instrumentation Module
+Records wall time, CPU time, peak RSS and row counts per pipeline span and
+exports them as a Chrome/Perfetto trace and a JSON summary
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the process's peak resident set size
+
+    Returns:
+        Peak RSS in MiB (None where the platform does not report it)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Span:
+    """One timed section of work"""
+
+    def __init__(self, name: str, category: str, rows: int = None, args: dict = None):
+        """
+        Initialize span
+
+        Args:
+            name: Span name, e.g. 'calculate' or 'chart:league_table'
+            category: Span category, e.g. 'stage', 'scrape', 'chart'
+            rows: Number of rows processed (can be set while the span is open)
+            args: Extra key/value pairs shown in the trace viewer
+        """
+        self.name = name
+        self.category = category
+        self.rows = rows
+        self.args = dict(args or {})
+        self.thread_id = threading.get_ident()
+        self.start = None
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_mb = None
+        self.rss_growth_mb = None
+        self.error = None
+
+    def to_dict(self) -> dict:
+        """Get span measurements as a plain dictionary"""
+        return {
+            'name': self.name,
+            'category': self.category,
+            'start': round(self.start, 6),
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'peak_rss_mb': None if self.peak_rss_mb is None else round(self.peak_rss_mb, 1),
+            'rss_growth_mb': None if self.rss_growth_mb is None else round(self.rss_growth_mb, 1),
+            'rows': self.rows,
+            'error': self.error,
+        }
+
+
+class Tracer:
+    """
+    Collector for pipeline spans
+
+    CPU time is per thread (time.thread_time), so spans running concurrently
+    on the stage scheduler's workers do not count each other's work. Peak RSS
+    is the process-wide high-water mark when the span closed; rss_growth_mb is
+    how far this span pushed that mark, which points at the stage that drove
+    memory up.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize tracer
+
+        Args:
+            enabled: Record spans (when False, span() only yields a placeholder)
+        """
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Drop recorded spans and restart the trace clock"""
+        with self._lock:
+            self.spans = []
+            self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str = "pipeline", rows: int = None, **args):
+        """
+        Time a block of work
+
+        Args:
+            name: Span name
+            category: Span category
+            rows: Number of rows processed (or set span.rows inside the block)
+            **args: Extra values recorded with the span
+
+        Yields:
+            The open Span
+        """
+        current = Span(name, category, rows, args)
+        if not self.enabled:
+            yield current
+            return
+
+        rss_before = peak_rss_mb()
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        current.start = wall_start - self.origin
+
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.wall_seconds = time.perf_counter() - wall_start
+            current.cpu_seconds = time.thread_time() - cpu_start
+            current.peak_rss_mb = peak_rss_mb()
+            if rss_before is not None:
+                current.rss_growth_mb = current.peak_rss_mb - rss_before
+            with self._lock:
+                self.spans.append(current)
+
+    def chrome_trace(self) -> dict:
+        """
+        Build a Chrome trace-event document (loadable in chrome://tracing or ui.perfetto.dev)
+
+        Returns:
+            Dictionary in the Trace Event Format
+        """
+        pid = os.getpid()
+        thread_ids = {}
+        events = []
+
+        for span in sorted(self.spans, key=lambda s: s.start):
+            tid = thread_ids.setdefault(span.thread_id, len(thread_ids) + 1)
+            args = {
+                'cpu_ms': round(span.cpu_seconds * 1000, 3),
+                'peak_rss_mb': None if span.peak_rss_mb is None else round(span.peak_rss_mb, 1),
+                'rss_growth_mb': None if span.rss_growth_mb is None else round(span.rss_growth_mb, 1),
+                **span.args,
+            }
+            if span.rows is not None:
+                args['rows'] = span.rows
+            if span.error:
+                args['error'] = span.error
+
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': round(span.start * 1e6, 1),
+                'dur': round(span.wall_seconds * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+                'args': args,
+            })
+
+        for thread_id, tid in thread_ids.items():
+            events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                'args': {'name': 'main' if thread_id == threading.main_thread().ident else f'worker-{tid}'},
+            })
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self) -> dict:
+        """
+        Aggregate spans by name
+
+        Returns:
+            Dictionary with per-span totals (in first-seen order) and the overall peak RSS
+        """
+        totals = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            entry = totals.setdefault(span.name, {
+                'category': span.category,
+                'calls': 0,
+                'wall_seconds': 0.0,
+                'cpu_seconds': 0.0,
+                'peak_rss_mb': None,
+                'rows': None,
+            })
+            entry['calls'] += 1
+            entry['wall_seconds'] += span.wall_seconds
+            entry['cpu_seconds'] += span.cpu_seconds
+            if span.peak_rss_mb is not None:
+                entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0.0, span.peak_rss_mb)
+            if span.rows is not None:
+                entry['rows'] = (entry['rows'] or 0) + span.rows
+
+        for entry in totals.values():
+            entry['wall_seconds'] = round(entry['wall_seconds'], 6)
+            entry['cpu_seconds'] = round(entry['cpu_seconds'], 6)
+            if entry['peak_rss_mb'] is not None:
+                entry['peak_rss_mb'] = round(entry['peak_rss_mb'], 1)
+
+        return {
+            'pid': os.getpid(),
+            'peak_rss_mb': None if peak_rss_mb() is None else round(peak_rss_mb(), 1),
+            'spans': totals,
+        }
+
+    def export(self, trace_file: str) -> tuple:
+        """
+        Write the Chrome trace and the summary next to it
+
+        Args:
+            trace_file: Trace JSON path; the summary goes to '<stem>.summary.json'
+
+        Returns:
+            Tuple of (trace path, summary path)
+        """
+        trace_path = Path(trace_file)
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        summary_path = trace_path.with_name(f"{trace_path.stem}.summary.json")
+
+        with open(trace_path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        with open(summary_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+        logger.info(f"Trace saved to {trace_path} (summary: {summary_path})")
+
+        return str(trace_path), str(summary_path)
+
+    def log_summary(self) -> None:
+        """Log one line per span name"""
+        for name, entry in self.summary()['spans'].items():
+            rows = f", {entry['rows']} rows" if entry['rows'] is not None else ""
+            rss = f", peak {entry['peak_rss_mb']:.0f} MiB" if entry['peak_rss_mb'] is not None else ""
+            logger.info(
+                f"  {name:28} wall {entry['wall_seconds']:7.3f}s  cpu {entry['cpu_seconds']:7.3f}s{rss}{rows}"
+            )
+
+
+# Process-wide tracer shared by every module
+tracer = Tracer()
+span = tracer.span
+
+
+def main():
+    """Main function for inspecting a saved trace summary"""
+    import argparse
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Show a pipeline trace summary')
+    parser.add_argument('summary', nargs='?', default='output/trace.summary.json', help='Summary JSON written by --trace')
+    args = parser.parse_args()
+
+    try:
+        with open(args.summary) as f:
+            summary = json.load(f)
+
+        print(f"\n=== Trace Summary (peak RSS {summary['peak_rss_mb']} MiB) ===")
+        spans = sorted(summary['spans'].items(), key=lambda item: item[1]['wall_seconds'], reverse=True)
+        for name, entry in spans:
+            print(f"{name:28} {entry['category']:10} wall {entry['wall_seconds']:8.3f}s  cpu {entry['cpu_seconds']:8.3f}s")
+
+    except FileNotFoundError as e:
+        logger.error(f"Error: {e}")
+        logger.info("Please run the pipeline with --trace first.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Logging Setup Module
+Central, queue-based logging with optional JSON output and per-team sampling
+"""
+
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+_sampler = None
+_config = None
+_fork_hook_registered = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including extra={...} fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    Queue handler that keeps exceptions apart from the message
+
+    QueueHandler.prepare() formats the whole record, traceback included, into
+    the message. This keeps the message as just the merged log text and
+    carries the traceback in exc_text, so the JSON formatter can emit it as
+    its own field and the text formatter still appends it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            # Traceback objects are not safe to hand to another thread or process
+            record.exc_info = None
+        return record
+
+
+class TeamSampler(logging.Filter):
+    """
+    Sample per-team log records
+
+    Records logged with extra={'team': ...} below WARNING are per-team detail
+    lines. For each logger the first `first` of them pass, then every
+    `every`-th one (0 drops the rest); the dropped records are counted and
+    reported by summary(). Everything else always passes.
+    """
+
+    def __init__(self, first: int = 20, every: int = 0):
+        """
+        Initialize sampler
+
+        Args:
+            first: Per-team records kept per logger before sampling starts
+            every: Keep every n-th record after that (0 keeps none)
+        """
+        super().__init__()
+        self.first = first
+        self.every = every
+        self.seen = {}
+        self.dropped = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not hasattr(record, 'team'):
+            return True
+
+        with self._lock:
+            count = self.seen.get(record.name, 0) + 1
+            self.seen[record.name] = count
+            keep = count <= self.first or (self.every and (count - self.first) % self.every == 0)
+            if not keep:
+                self.dropped[record.name] = self.dropped.get(record.name, 0) + 1
+        return bool(keep)
+
+    def summary(self) -> dict:
+        """
+        Get and reset the number of dropped per-team records per logger
+
+        Returns:
+            Dictionary mapping logger name to (seen, dropped)
+        """
+        with self._lock:
+            result = {name: (self.seen[name], dropped) for name, dropped in self.dropped.items()}
+            self.seen = {}
+            self.dropped = {}
+        return result
+
+
+def configure_logging(level: int = logging.INFO, log_file: str = None, json_format: bool = False,
+                      team_sample_first: int = 20, team_sample_every: int = 0) -> None:
+    """
+    Route all logging through a queue to background file/console handlers
+
+    Callers only put records on an in-memory queue; formatting and the
+    writes to disk and stderr happen on the listener thread. Calling this
+    again replaces the previous setup.
+
+    Args:
+        level: Root log level
+        log_file: Also append to this file (e.g. 'analysis.log')
+        json_format: Emit one JSON object per line instead of plain text
+        team_sample_first: Per-team records kept per logger (None keeps all)
+        team_sample_every: Keep every n-th per-team record after the first ones
+    """
+    global _listener, _sampler, _config, _fork_hook_registered
+
+    shutdown_logging()
+
+    _config = {
+        'level': level,
+        'log_file': os.path.abspath(log_file) if log_file else None,
+        'json_format': json_format,
+        'team_sample_first': team_sample_first,
+        'team_sample_every': team_sample_every,
+    }
+    handlers = _build_handlers(log_file, json_format)
+
+    queue_handler = StructuredQueueHandler(queue.SimpleQueue())
+    if team_sample_first is not None:
+        _sampler = TeamSampler(team_sample_first, team_sample_every)
+        queue_handler.addFilter(_sampler)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    if not _fork_hook_registered:
+        atexit.register(shutdown_logging)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_log_directly_in_child)
+        _fork_hook_registered = True
+
+
+def _build_handlers(log_file: str, json_format: bool) -> list:
+    """Create the stderr (and file) handlers with the requested format"""
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def logging_config() -> dict:
+    """
+    Get the settings of the current configure_logging() call
+
+    Pass this to init_worker_logging() in a process pool's initializer.
+
+    Returns:
+        Dictionary of settings (None when logging was not configured)
+    """
+    return dict(_config) if _config is not None else None
+
+
+def init_worker_logging(config: dict) -> None:
+    """
+    Set up logging in a worker process started by a process pool
+
+    Forked workers inherit the parent's handlers (see
+    _log_directly_in_child) and are left alone. Spawned workers (the default
+    on macOS and Windows) start with no handlers, so they write straight to
+    stderr and the log file with the parent's settings.
+
+    Args:
+        config: Output of logging_config() in the parent (None does nothing)
+    """
+    global _sampler
+
+    root = logging.getLogger()
+    if config is None or root.handlers:
+        return
+
+    if config['team_sample_first'] is not None:
+        _sampler = TeamSampler(config['team_sample_first'], config['team_sample_every'])
+    for handler in _build_handlers(config['log_file'], config['json_format']):
+        if _sampler is not None:
+            handler.addFilter(_sampler)
+        root.addHandler(handler)
+    root.setLevel(config['level'])
+
+
+def _log_directly_in_child() -> None:
+    """
+    Write straight to the handlers in forked worker processes
+
+    The listener thread does not survive a fork, so records queued in a
+    child would never be written.
+    """
+    global _listener
+
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in _listener.handlers:
+        if _sampler is not None:
+            handler.addFilter(_sampler)
+        root.addHandler(handler)
+    _listener = None
+
+
+def log_sampling_summary() -> None:
+    """Log how many per-team records were sampled out since the last call"""
+    if _sampler is None:
+        return
+    for name, (seen, dropped) in _sampler.summary().items():
+        logging.getLogger(name).info(f"{dropped} of {seen} per-team log lines sampled out")
+
+
+def shutdown_logging() -> None:
+    """Report sampled-out records, then drain the queue and stop the listener"""
+    global _listener
+
+    if _listener is None:
+        return
+    log_sampling_summary()
+    _listener.stop()
+    _listener = None
+
+
+def main():
+    """Main function for testing the logging setup"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Emit sample log records')
+    parser.add_argument('--json', action='store_true', help='Emit JSON lines')
+    parser.add_argument('--teams', type=int, default=100, help='Per-team records to log')
+    args = parser.parse_args()
+
+    configure_logging(json_format=args.json)
+    logger = logging.getLogger('logging_setup')
+    for i in range(args.teams):
+        logger.info("Team %d processed", i, extra={'team': f"Team {i}"})
+    logger.warning("Warnings are never sampled", extra={'team': "Team 0"})
+    shutdown_logging()
+    print(f"Logged {args.teams} per-team records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
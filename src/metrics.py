@@ -0,0 +1,268 @@
+"""
+Metrics Module
+Exports pipeline run metrics in the Prometheus textfile format
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+from pathlib import Path
+
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "xpts_"
+
+# Output file suffix -> 'kind' label, so the number of output series stays
+# fixed however many teams, leagues or runs write files
+OUTPUT_KINDS = {
+    '.pdf': 'pdf',
+    '.html': 'html',
+    '.json': 'json',
+    '.csv': 'csv',
+    '.png': 'charts',
+    '.svg': 'charts',
+    '.jpg': 'charts',
+    '.jpeg': 'charts',
+    '.pstats': 'profiles',
+    '.collapsed': 'profiles',
+    '.txt': 'profiles',
+}
+
+
+def _escape(value) -> str:
+    """Escape a label value for the exposition format"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    """Format a sample value (integers without a trailing .0)"""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Collect metric samples and render them in the Prometheus text format
+
+    Each metric is declared once with its help text and type; samples are
+    keyed by their label set, so setting a sample again replaces it.
+    """
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        """
+        Initialize registry
+
+        Args:
+            prefix: Prefix added to every metric name
+        """
+        self.prefix = prefix
+        self.metrics = {}
+
+    def set(self, name: str, value, labels: dict = None, help_text: str = "",
+            metric_type: str = "gauge") -> None:
+        """
+        Record one sample
+
+        Args:
+            name: Metric name without the prefix
+            value: Sample value (None skips the sample)
+            labels: Label names and values
+            help_text: HELP line for the metric
+            metric_type: 'gauge' or 'counter'
+        """
+        if value is None:
+            return
+        metric = self.metrics.setdefault(self.prefix + name, {
+            'help': help_text,
+            'type': metric_type,
+            'samples': {},
+        })
+        key = tuple(sorted((labels or {}).items()))
+        metric['samples'][key] = value
+
+    def render(self) -> str:
+        """
+        Render every metric
+
+        Returns:
+            Text in the Prometheus exposition format
+        """
+        lines = []
+        for name, metric in self.metrics.items():
+            if metric['help']:
+                lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for labels, value in metric['samples'].items():
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{name}{label_text} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> Path:
+        """
+        Write the metrics atomically
+
+        The node exporter may read the file at any moment, so the text goes
+        to a temporary file in the same directory that is renamed over the
+        target; readers see the old or the new file, never half of one.
+
+        Args:
+            path: Output path (the node exporter reads '*.prom')
+
+        Returns:
+            Path of the written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.render())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        return path
+
+
+def _cache_metrics(registry: MetricsRegistry) -> None:
+    """
+    Record hit ratios of the process-wide caches
+
+    Only modules the run already imported are inspected, so exporting
+    metrics never loads a component the run did not need.
+
+    Args:
+        registry: Registry to add samples to
+    """
+    caches = {}
+
+    calculator = sys.modules.get('calculator')
+    if calculator is not None:
+        info = calculator.match_probabilities.cache_info()
+        caches['match_probabilities'] = (info.hits, info.misses, info.currsize)
+
+    reporter = sys.modules.get('reporter')
+    if reporter is not None:
+        stats = reporter.template_cache_stats()
+        caches['report_template'] = (stats['hits'], stats['misses'], stats['entries'])
+
+    for cache, (hits, misses, entries) in caches.items():
+        labels = {'cache': cache}
+        registry.set('cache_hits_total', hits, labels, "Cache hits since process start", 'counter')
+        registry.set('cache_misses_total', misses, labels, "Cache misses since process start", 'counter')
+        registry.set('cache_entries', entries, labels, "Entries currently cached")
+        if hits + misses:
+            registry.set('cache_hit_ratio', hits / (hits + misses), labels,
+                         "Share of cache lookups that were hits")
+
+
+def pipeline_metrics(tracer, timings: dict, success: bool, started: float,
+                     output_dirs: tuple = ("data", "output")) -> MetricsRegistry:
+    """
+    Build the metrics for one pipeline run
+
+    Args:
+        tracer: Tracer holding the run's spans
+        timings: Stage timings from StageScheduler (name -> (start, end) seconds)
+        success: Whether the run completed
+        started: Run start as a Unix timestamp; outputs modified since are reported
+        output_dirs: Directories scanned for output files
+
+    Returns:
+        Populated MetricsRegistry
+    """
+    registry = MetricsRegistry()
+
+    registry.set('pipeline_last_run_timestamp_seconds', time.time(), None,
+                 "Unix time the last pipeline run finished")
+    registry.set('pipeline_success', success, None, "1 if the last pipeline run completed, 0 if it failed")
+    if timings:
+        registry.set('pipeline_duration_seconds', max(end for _, end in timings.values()), None,
+                     "Wall-clock duration of the last pipeline run")
+
+    for name, (start, end) in timings.items():
+        registry.set('stage_duration_seconds', end - start, {'stage': name},
+                     "Wall-clock duration of each stage in the last run")
+
+    for span in tracer.spans:
+        labels = {'stage': span.name}
+        if span.category == 'stage':
+            registry.set('stage_cpu_seconds', span.cpu_seconds, labels, "CPU time of each stage in the last run")
+            registry.set('stage_rows', span.rows, labels, "Rows produced by each stage in the last run")
+            registry.set('stage_success', span.error is None, labels,
+                         "1 if the stage completed in the last run, 0 if it failed")
+        elif span.name == 'fetch':
+            registry.set('scrape_bytes_fetched', span.args.get('bytes'), None,
+                         "Bytes downloaded by the last scrape")
+            registry.set('scrape_http_status', span.args.get('status'), None,
+                         "HTTP status of the last scrape request")
+            registry.set('scrape_retries', span.args.get('retries'), None,
+                         "Retries the last scrape needed")
+            registry.set('scrape_success', span.error is None, None,
+                         "1 if the last scrape fetched the page, 0 if it failed")
+
+    peak_rss = tracer.summary()['peak_rss_mb']
+    if peak_rss is not None:
+        registry.set('process_peak_rss_bytes', int(peak_rss * 2**20), None, "Peak resident set size of the run")
+
+    _cache_metrics(registry)
+
+    output_bytes, output_files = {}, {}
+    for directory in output_dirs:
+        directory = Path(directory)
+        if not directory.is_dir():
+            continue
+        for path in directory.rglob('*'):
+            if path.name.startswith('.') or not path.is_file():
+                continue
+            stat = path.stat()
+            if stat.st_mtime >= started:
+                kind = OUTPUT_KINDS.get(path.suffix.lower(), 'other')
+                output_bytes[kind] = output_bytes.get(kind, 0) + stat.st_size
+                output_files[kind] = output_files.get(kind, 0) + 1
+
+    for kind in sorted(output_bytes):
+        registry.set('output_bytes', output_bytes[kind], {'kind': kind},
+                     "Total size of the files written by the last run, by kind")
+        registry.set('output_files', output_files[kind], {'kind': kind},
+                     "Number of files written by the last run, by kind")
+
+    return registry
+
+
+def main():
+    """Main function for printing the metrics of a traced run"""
+    import argparse
+    import json
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Print pipeline metrics from a saved trace summary')
+    parser.add_argument('summary_file', help="'<trace>.summary.json' written by --trace")
+    args = parser.parse_args()
+
+    with open(args.summary_file) as f:
+        summary = json.load(f)
+
+    registry = MetricsRegistry()
+    for name, entry in summary['spans'].items():
+        if entry['category'] == 'stage':
+            registry.set('stage_duration_seconds', entry['wall_seconds'], {'stage': name},
+                         "Wall-clock duration of each stage")
+            registry.set('stage_rows', entry['rows'], {'stage': name}, "Rows produced by each stage")
+    print(registry.render(), end='')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Profiling Module
+Opt-in cProfile, tracemalloc and stack-sampling hooks for pipeline stages
+"""
+
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler:
+    """
+    Sample one thread's Python stack at a fixed interval
+
+    cProfile only records caller/callee pairs, which cannot be turned into
+    exact stacks; sampling gives real stacks for flamegraphs
+    (flamegraph.pl, speedscope, inferno) in collapsed format.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        Initialize sampler
+
+        Args:
+            thread_id: Ident of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        """
+        Write collapsed stacks, one 'frame;frame;frame count' line per stack
+
+        Args:
+            path: Output file
+        """
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class StageProfiler:
+    """
+    Per-stage profiler writing pstats, allocation and collapsed-stack files
+
+    For every profiled stage <name> the output directory gets:
+      <name>.pstats      cProfile statistics (python -m pstats, snakeviz)
+      <name>.collapsed   sampled stacks for flamegraph tools
+      <name>.alloc.txt   top allocation sites (only with memory=True)
+
+    Profiled stages run one at a time: only one cProfile profiler may be
+    active per process on newer Pythons, and tracemalloc is process-wide.
+    Unprofiled stages still run concurrently, so allocation reports can
+    include their allocations; use --workers 1 when those must be exact.
+    """
+
+    def __init__(self, output_dir: str = "output/profiles", stages: list = None,
+                 memory: bool = False, sample_interval: float = 0.005, top: int = 25):
+        """
+        Initialize profiler
+
+        Args:
+            output_dir: Directory for profile files
+            stages: Stage names to profile (None or ['all'] profiles every stage)
+            memory: Also trace allocations with tracemalloc
+            sample_interval: Seconds between stack samples
+            top: Number of allocation sites to report
+        """
+        self.output_dir = Path(output_dir)
+        self.stages = None if not stages or 'all' in stages else set(stages)
+        self.memory = memory
+        self.sample_interval = sample_interval
+        self.top = top
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        """
+        Get a context manager profiling one stage
+
+        Args:
+            name: Stage name
+
+        Returns:
+            Profiling context manager, or a no-op one for unselected stages
+        """
+        if self.stages is not None and name not in self.stages:
+            return nullcontext()
+        return self._profile(name)
+
+    @contextmanager
+    def _profile(self, name: str):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        safe_name = name.replace(':', '_').replace('/', '_')
+
+        with self._lock:
+            if self.memory:
+                tracemalloc.start(10)
+                before = tracemalloc.take_snapshot()
+
+            sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            profile = cProfile.Profile()
+            sampler.start()
+            start = time.perf_counter()
+            profile.enable()
+
+            try:
+                yield
+            finally:
+                profile.disable()
+                elapsed = time.perf_counter() - start
+                sampler.stop()
+
+                pstats_path = self.output_dir / f"{safe_name}.pstats"
+                profile.dump_stats(pstats_path)
+                sampler.write(self.output_dir / f"{safe_name}.collapsed")
+
+                if self.memory:
+                    self._write_allocations(name, before, self.output_dir / f"{safe_name}.alloc.txt")
+                    tracemalloc.stop()
+
+                logger.info(f"Profiled {name} ({elapsed:.2f}s): {pstats_path}")
+
+    def _write_allocations(self, name: str, before, path: Path) -> None:
+        """
+        Write the allocation sites that grew most during a stage
+
+        Args:
+            name: Stage name
+            before: tracemalloc snapshot taken when the stage started
+            path: Output file
+        """
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = after.compare_to(before, 'traceback')
+
+        with open(path, 'w') as f:
+            f.write(f"Top {self.top} allocation sites in {name} "
+                    f"(traced now {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB)\n\n")
+            for rank, stat in enumerate(stats[:self.top], 1):
+                f.write(f"#{rank}: {stat.size_diff / 1024:+.1f} KiB in {stat.count_diff:+d} blocks "
+                        f"(now {stat.size / 1024:.1f} KiB)\n")
+                for line in stat.traceback.format(limit=6):
+                    f.write(f"    {line}\n")
+                f.write("\n")
+
+
+def add_profile_arguments(parser) -> None:
+    """
+    Add --profile options to a module's argument parser
+
+    Args:
+        parser: argparse parser
+    """
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile with cProfile and write pstats/collapsed stacks to --profile-dir')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='With --profile, also report top allocations (tracemalloc)')
+    parser.add_argument('--profile-dir', default='output/profiles', help='Directory for profile files')
+
+
+def profile_from_args(args, name: str):
+    """
+    Get the profiling context for a module's main() from parsed arguments
+
+    Args:
+        args: Namespace with the options from add_profile_arguments
+        name: Name for the profile files
+
+    Returns:
+        Profiling context manager, or a no-op one without --profile
+    """
+    if not args.profile:
+        return nullcontext()
+    return StageProfiler(args.profile_dir, memory=args.profile_memory).stage(name)
+
+
+def main():
+    """Main function for summarising a saved profile"""
+    import argparse
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Print the hottest functions of a saved profile')
+    parser.add_argument('pstats_file', help='Profile written by --profile')
+    parser.add_argument('--sort', default='cumulative', help='pstats sort key (cumulative, tottime, ...)')
+    parser.add_argument('--limit', type=int, default=25, help='Number of functions to show')
+    args = parser.parse_args()
+
+    pstats.Stats(args.pstats_file).strip_dirs().sort_stats(args.sort).print_stats(args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,42 +10,216 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import (
     SimpleDocTemplate, Table, TableStyle, Paragraph,
-    Spacer, PageBreak, Image
+    Spacer, PageBreak, Image, Flowable
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import base64
+import hashlib
+import html
+import io
+import json
 import logging
+import os
 from pathlib import Path
+from PIL import Image as PILImage
+
+from instrumentation import span
+from logging_setup import configure_logging, init_worker_logging, logging_config
+from schema import export_frame, read_csv, slugify, team_path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Embedded chart settings, trading PDF size against image quality.
+# dpi: resolution at printed size, format: PNG or JPEG, quality: JPEG quality,
+# palette: quantize PNGs to 256 colours (charts use few colours)
+IMAGE_PROFILES = {
+    'print': {'dpi': 300, 'format': 'PNG', 'quality': None, 'palette': True},
+    'email': {'dpi': 150, 'format': 'JPEG', 'quality': 85, 'palette': False},
+    'screen': {'dpi': 96, 'format': 'JPEG', 'quality': 75, 'palette': False},
+}
+
+# Chart sections of the HTML report: (chart name, heading)
+HTML_CHART_SECTIONS = [
+    ('league_table', 'League Overview'),
+    ('actual_vs_expected', 'Performance Analysis: Actual vs Expected Points'),
+    ('variance_by_team', 'Variance Analysis by Team'),
+    ('risk_distribution', 'Risk Distribution'),
+]
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; color: #1f2937; max-width: 960px; margin: 2rem auto; padding: 0 1rem; }}
+h1 {{ text-align: center; }}
+h2 {{ color: #374151; margin-top: 2rem; }}
+table {{ border-collapse: collapse; width: 100%; margin: 1rem 0; }}
+th {{ background: #1f2937; color: #fff; padding: 0.5rem; }}
+td {{ border: 1px solid #9ca3af; padding: 0.4rem; text-align: center; }}
+td:first-child {{ text-align: left; }}
+tr:nth-child(even) td {{ background: #f3f4f6; }}
+img {{ max-width: 100%; height: auto; }}
+.meta {{ color: #6b7280; text-align: center; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p class="meta">Expected Goals (xG) Regression Analysis &middot; Generated {generated}</p>
+{body}
+</body>
+</html>
+"""
+
+# Bump whenever static report text or styles change to invalidate cached sections
+TEMPLATE_VERSION = 1
+
+# Process-wide caches of stylesheets and pre-wrapped static sections, keyed on TEMPLATE_VERSION
+_STYLE_CACHE = {}
+_TEMPLATE_CACHE = {}
+_TEMPLATE_CACHE_STATS = {'hits': 0, 'misses': 0}
+
+# Report generator owned by each batch worker process (see _init_batch_worker)
+_BATCH_REPORTER = None
+
+
+def template_cache_stats() -> dict:
+    """
+    Get hit/miss counts for the static section cache
+
+    Returns:
+        Dictionary with 'hits', 'misses' and 'entries'
+    """
+    return {**_TEMPLATE_CACHE_STATS, 'entries': len(_TEMPLATE_CACHE)}
+
+
+class PrewrappedFlowable(Flowable):
+    """
+    Flowable wrapper that keeps the layout of its first wrap
+
+    Static sections are laid out at the same frame width in every report, so
+    line breaking only needs to happen once per process. Splitting and drawing
+    are delegated to the wrapped flowable.
+    """
+
+    def __init__(self, flowable: Flowable):
+        """
+        Initialize wrapper
+
+        Args:
+            flowable: Flowable to pre-wrap
+        """
+        super().__init__()
+        self.flowable = flowable
+        self._layout = None
+
+    def wrap(self, availWidth, availHeight):
+        if self._layout is None or self._layout[0] != availWidth:
+            self._layout = (availWidth, self.flowable.wrap(availWidth, availHeight))
+        self.width, self.height = self._layout[1]
+        return self._layout[1]
+
+    def split(self, availWidth, availHeight):
+        return self.flowable.split(availWidth, availHeight)
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.flowable.drawOn(canvas, x, y, _sW)
+
+    def getKeepWithNext(self):
+        return self.flowable.getKeepWithNext()
+
+    def getSpaceBefore(self):
+        return self.flowable.getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.flowable.getSpaceAfter()
+
+
+def _init_batch_worker(options: dict, log_config: dict = None) -> None:
+    """
+    Prepare one report generator per worker process
+
+    Styles and static sections are built here once and reused for every
+    report the worker renders.
+
+    Args:
+        options: PerformanceReportGenerator keyword arguments
+        log_config: Parent's logging_config(), for spawned workers
+    """
+    global _BATCH_REPORTER
+    init_worker_logging(log_config)
+    _BATCH_REPORTER = PerformanceReportGenerator(**options)
+    _BATCH_REPORTER.create_title_page()
+    _BATCH_REPORTER.create_methodology_section()
+
+
+def _build_batch_report(job: tuple) -> tuple:
+    """
+    Render one batch report in a worker process
+
+    Args:
+        job: Tuple of (kind, key, name, DataFrame, charts, output path) where kind
+            is 'team' or 'league' and key identifies the report in the results
+
+    Returns:
+        Tuple of (kind, key, path to generated report)
+    """
+    kind, key, name, df, charts, output_path = job
+    if kind == 'team':
+        story = _BATCH_REPORTER.build_team_story(name, df, charts)
+    else:
+        story = _BATCH_REPORTER.build_story(df, charts, title=f"{name} Performance Analysis Report")
+    _BATCH_REPORTER._build_pdf(output_path, story)
+    return kind, key, output_path
+
 
 class PerformanceReportGenerator:
     """Generator for PDF performance analysis reports"""
 
     def __init__(self, data_dir: str = "data", charts_dir: str = "output/charts",
-                 output_dir: str = "output/reports"):
+                 output_dir: str = "output/reports", image_profile: str = None,
+                 image_settings: dict = None, html_image_profile: str = 'screen'):
         """
         Initialize report generator
 
         Args:
             data_dir: Directory containing analysis data
             charts_dir: Directory containing chart images
-            output_dir: Directory to save reports
+            output_dir: Directory to save reports (created on first write)
+            image_profile: Key of IMAGE_PROFILES used to downsample and recompress
+                charts (None embeds the original images unchanged)
+            image_settings: Overrides for individual profile settings (dpi, format, quality, palette)
+            html_image_profile: Key of IMAGE_PROFILES used for charts inlined in the HTML
+                report (None inlines the original images unchanged)
         """
         self.data_dir = Path(data_dir)
         self.charts_dir = Path(charts_dir)
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Set up styles
-        self.styles = getSampleStyleSheet()
-        self._create_custom_styles()
+        if image_profile is not None and image_profile not in IMAGE_PROFILES:
+            raise ValueError(f"Unknown image profile: {image_profile} (expected one of {list(IMAGE_PROFILES)})")
+        if html_image_profile is not None and html_image_profile not in IMAGE_PROFILES:
+            raise ValueError(
+                f"Unknown image profile: {html_image_profile} (expected one of {list(IMAGE_PROFILES)})"
+            )
+        self.html_image_settings = IMAGE_PROFILES[html_image_profile] if html_image_profile else None
+        self.image_settings = None
+        if image_profile is not None or image_settings:
+            self.image_settings = {**IMAGE_PROFILES[image_profile or 'print'], **(image_settings or {})}
+
+        # Prepared images keyed by content hash and target size, so repeated
+        # assets are only downsampled once and share one PDF image object
+        self._image_cache = {}
+
+        # Set up styles (built once per process and template version)
+        self.styles = _STYLE_CACHE.get(TEMPLATE_VERSION)
+        if self.styles is None:
+            self.styles = getSampleStyleSheet()
+            self._create_custom_styles()
+            _STYLE_CACHE[TEMPLATE_VERSION] = self.styles
 
     def _create_custom_styles(self):
         """Create custom paragraph styles"""
@@ -79,23 +253,65 @@ class PerformanceReportGenerator:
             fontName='Helvetica'
         ))
 
-    def create_title_page(self) -> list:
+    def _cached_section(self, key: tuple, builder) -> list:
+        """
+        Get a static section from the template cache, building it on a miss
+
+        Args:
+            key: Section key (combined with TEMPLATE_VERSION)
+            builder: Callable returning the section's flowables
+
+        Returns:
+            List of ReportLab flowables (pre-wrapped where possible)
+        """
+        cache_key = (TEMPLATE_VERSION,) + key
+        if cache_key in _TEMPLATE_CACHE:
+            _TEMPLATE_CACHE_STATS['hits'] += 1
+        else:
+            _TEMPLATE_CACHE_STATS['misses'] += 1
+            _TEMPLATE_CACHE[cache_key] = [
+                flowable if isinstance(flowable, PageBreak) else PrewrappedFlowable(flowable)
+                for flowable in builder()
+            ]
+        return list(_TEMPLATE_CACHE[cache_key])
+
+    def create_title_page(self, title: str = "Premier League Performance Analysis Report") -> list:
         """
         Create title page elements
 
+        Only the title is built per report; the rest of the page is served
+        from the template cache.
+
+        Args:
+            title: Report title
+
         Returns:
             List of ReportLab flowables
         """
         story = []
 
         # Title
-        title = Paragraph(
-            "Premier League Performance Analysis Report",
-            self.styles['CustomTitle']
-        )
+        title = Paragraph(title, self.styles['CustomTitle'])
         story.append(title)
         story.append(Spacer(1, 0.5 * inch))
 
+        generated = datetime.now().strftime('%B %d, %Y')
+        story.extend(self._cached_section(('title_page', generated), lambda: self._build_title_body(generated)))
+
+        return story
+
+    def _build_title_body(self, generated: str) -> list:
+        """
+        Build the static part of the title page
+
+        Args:
+            generated: Formatted generation date
+
+        Returns:
+            List of ReportLab flowables
+        """
+        story = []
+
         # Subtitle
         subtitle = Paragraph(
             "Expected Goals (xG) Regression Analysis",
@@ -106,7 +322,7 @@ class PerformanceReportGenerator:
 
         # Date
         date_text = Paragraph(
-            f"Generated: {datetime.now().strftime('%B %d, %Y')}",
+            f"Generated: {generated}",
             self.styles['Normal']
         )
         story.append(date_text)
@@ -136,6 +352,15 @@ class PerformanceReportGenerator:
         """
         Create methodology section
 
+        Returns:
+            List of ReportLab flowables
+        """
+        return self._cached_section(('methodology',), self._build_methodology)
+
+    def _build_methodology(self) -> list:
+        """
+        Build the methodology section
+
         Returns:
             List of ReportLab flowables
         """
@@ -167,35 +392,98 @@ class PerformanceReportGenerator:
 
         return story
 
-    def create_high_risk_teams_table(self, df: pd.DataFrame) -> list:
+    def create_team_summary_table(self, row: pd.Series) -> list:
         """
-        Create table of high-risk teams
+        Create key-metrics table for a single team
 
         Args:
-            df: DataFrame with analysis data
+            row: Analysis row for the team
 
         Returns:
             List of ReportLab flowables
         """
         story = []
 
-        title = Paragraph("High-Risk Teams Analysis", self.styles['CustomHeading'])
+        title = Paragraph("Team Summary", self.styles['CustomHeading'])
         story.append(title)
 
-        # Filter high-risk teams (variance > +3)
-        high_risk = df[df['Variance'] > 3].sort_values('Risk_Score', ascending=False)
+        table_data = [
+            ['Metric', 'Value'],
+            ['Matches Played', f"{int(row['Matches'])}"],
+            ['Actual Points', f"{int(row['Actual_Points'])}"],
+            ['Expected Points (xPTS)', f"{row['xPTS']:.1f}"],
+            ['Variance', f"{row['Variance']:+.1f}"],
+            ['League Position (Actual / Expected)',
+             f"{int(row['Position_Actual'])} / {int(row['Position_Expected'])}"],
+            ['Risk Score', f"{int(row['Risk_Score'])} ({row['Risk_Category']})"],
+            ['Regression Probability', f"{row['Regression_Probability']:.1%}"],
+            ['Z-Score / P-Value', f"{row['Z_Score']:.2f} / {row['P_Value']:.3f}"],
+            ['Performance Status', row['Performance_Status']],
+        ]
+
+        table = Table(table_data, colWidths=[3.5 * inch, 2.5 * inch])
 
-        if len(high_risk) == 0:
-            story.append(Paragraph(
-                "No teams currently identified as high risk for regression.",
-                self.styles['CustomBody']
-            ))
-            return story
+        table.setStyle(TableStyle([
+            # Header
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+            # Body
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ]))
+
+        story.append(table)
+        story.append(Spacer(1, 0.3 * inch))
+
+        return story
+
+    @staticmethod
+    def select_high_risk_teams(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Select high-risk teams (variance > +3), highest risk first
 
-        # Prepare table data
+        Args:
+            df: DataFrame with analysis data
+
+        Returns:
+            Filtered and sorted DataFrame
+        """
+        return df[df['Variance'] > 3].sort_values('Risk_Score', ascending=False)
+
+    @staticmethod
+    def select_underperforming_teams(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Select underperforming teams (variance < -3), worst first
+
+        Args:
+            df: DataFrame with analysis data
+
+        Returns:
+            Filtered and sorted DataFrame
+        """
+        return df[df['Variance'] < -3].sort_values('Variance')
+
+    def high_risk_table_data(self, df: pd.DataFrame) -> list:
+        """
+        Format the high-risk teams table (shared by the PDF and HTML reports)
+
+        Args:
+            df: DataFrame with analysis data
+
+        Returns:
+            List of rows, header first
+        """
         table_data = [['Team', 'Actual Pts', 'xPTS', 'Variance', 'Risk Score', 'Regression Prob']]
 
-        for _, row in high_risk.iterrows():
+        for _, row in self.select_high_risk_teams(df).iterrows():
             table_data.append([
                 row['Team'],
                 f"{int(row['Actual_Points'])}",
@@ -205,6 +493,56 @@ class PerformanceReportGenerator:
                 f"{row['Regression_Probability']:.1%}"
             ])
 
+        return table_data
+
+    def underperforming_table_data(self, df: pd.DataFrame) -> list:
+        """
+        Format the underperforming teams table (shared by the PDF and HTML reports)
+
+        Args:
+            df: DataFrame with analysis data
+
+        Returns:
+            List of rows, header first
+        """
+        table_data = [['Team', 'Actual Pts', 'xPTS', 'Variance', 'Potential Pts Lost']]
+
+        for _, row in self.select_underperforming_teams(df).iterrows():
+            potential_lost = abs(row['Variance'])
+            table_data.append([
+                row['Team'],
+                f"{int(row['Actual_Points'])}",
+                f"{row['xPTS']:.1f}",
+                f"{row['Variance']:.1f}",
+                f"{potential_lost:.1f}"
+            ])
+
+        return table_data
+
+    def create_high_risk_teams_table(self, df: pd.DataFrame) -> list:
+        """
+        Create table of high-risk teams
+
+        Args:
+            df: DataFrame with analysis data
+
+        Returns:
+            List of ReportLab flowables
+        """
+        story = []
+
+        title = Paragraph("High-Risk Teams Analysis", self.styles['CustomHeading'])
+        story.append(title)
+
+        table_data = self.high_risk_table_data(df)
+
+        if len(table_data) == 1:
+            story.append(Paragraph(
+                "No teams currently identified as high risk for regression.",
+                self.styles['CustomBody']
+            ))
+            return story
+
         # Create table
         table = Table(table_data, colWidths=[2.5 * inch, 1 * inch, 1 * inch, 1 * inch, 1 * inch, 1.2 * inch])
 
@@ -248,29 +586,15 @@ class PerformanceReportGenerator:
         title = Paragraph("Underperforming Teams Analysis", self.styles['CustomHeading'])
         story.append(title)
 
-        # Filter underperforming teams (variance < -3)
-        underperforming = df[df['Variance'] < -3].sort_values('Variance')
+        table_data = self.underperforming_table_data(df)
 
-        if len(underperforming) == 0:
+        if len(table_data) == 1:
             story.append(Paragraph(
                 "No teams currently identified as significantly underperforming.",
                 self.styles['CustomBody']
             ))
             return story
 
-        # Prepare table data
-        table_data = [['Team', 'Actual Pts', 'xPTS', 'Variance', 'Potential Pts Lost']]
-
-        for _, row in underperforming.iterrows():
-            potential_lost = abs(row['Variance'])
-            table_data.append([
-                row['Team'],
-                f"{int(row['Actual_Points'])}",
-                f"{row['xPTS']:.1f}",
-                f"{row['Variance']:.1f}",
-                f"{potential_lost:.1f}"
-            ])
-
         # Create table
         table = Table(table_data, colWidths=[2.5 * inch, 1.2 * inch, 1.2 * inch, 1.2 * inch, 1.5 * inch])
 
@@ -299,12 +623,59 @@ class PerformanceReportGenerator:
 
         return story
 
-    def add_chart(self, chart_path: str, width: float = 6 * inch) -> list:
+    def _optimize_image(self, chart, width: float, settings: dict = None) -> io.BytesIO:
+        """
+        Downsample and recompress a chart for its printed size
+
+        Args:
+            chart: Path to chart image or in-memory image buffer
+            width: Width of image in report (points)
+            settings: Image profile settings (defaults to the PDF image settings)
+
+        Returns:
+            BytesIO with the prepared image
+        """
+        if isinstance(chart, (str, Path)):
+            data = Path(chart).read_bytes()
+        else:
+            chart.seek(0)
+            data = chart.read()
+
+        settings = settings or self.image_settings
+        key = (hashlib.sha1(data).hexdigest(), round(width, 2), tuple(sorted(settings.items())))
+        if key in self._image_cache:
+            return io.BytesIO(self._image_cache[key])
+
+        img = PILImage.open(io.BytesIO(data))
+        target_width = int(round(width / inch * settings['dpi']))
+        if img.width > target_width:
+            target_height = int(round(img.height * target_width / img.width))
+            img = img.resize((target_width, target_height), PILImage.LANCZOS)
+
+        output = io.BytesIO()
+        if settings['format'].upper() == 'JPEG':
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGBA')
+                background = PILImage.new('RGB', img.size, 'white')
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            img.save(output, format='JPEG', quality=settings['quality'], optimize=True)
+        else:
+            if settings.get('palette') and img.mode != 'P':
+                img = img.convert('RGB').quantize(colors=256)
+            img.save(output, format='PNG')
+
+        self._image_cache[key] = output.getvalue()
+        logger.info(f"Optimized chart image: {len(data)} -> {len(self._image_cache[key])} bytes")
+
+        return io.BytesIO(self._image_cache[key])
+
+    def add_chart(self, chart, width: float = 6 * inch) -> list:
         """
         Add chart image to report
 
         Args:
-            chart_path: Path to chart image
+            chart: Path to chart image, or an in-memory image buffer from PerformanceVisualizer
             width: Width of image in report
 
         Returns:
@@ -312,15 +683,21 @@ class PerformanceReportGenerator:
         """
         story = []
 
-        if Path(chart_path).exists():
-            img = Image(chart_path, width=width)
-            # Maintain aspect ratio
-            aspect = img.imageHeight / img.imageWidth
-            img.drawHeight = width * aspect
-            story.append(img)
-            story.append(Spacer(1, 0.2 * inch))
-        else:
-            logger.warning(f"Chart not found: {chart_path}")
+        if isinstance(chart, (str, Path)) and not Path(chart).exists():
+            logger.warning(f"Chart not found: {chart}")
+            return story
+
+        if self.image_settings is not None:
+            chart = self._optimize_image(chart, width)
+        elif isinstance(chart, io.BytesIO):
+            chart.seek(0)
+
+        img = Image(chart if not isinstance(chart, Path) else str(chart), width=width)
+        # Maintain aspect ratio (only the image header is read at this point)
+        aspect = img.imageHeight / img.imageWidth
+        img.drawHeight = width * aspect
+        story.append(img)
+        story.append(Spacer(1, 0.2 * inch))
 
         return story
 
@@ -339,42 +716,28 @@ class PerformanceReportGenerator:
         if not input_path.exists():
             raise FileNotFoundError(f"Analysis data file not found: {input_path}")
 
-        df = pd.read_csv(input_path)
+        df = read_csv(input_path)
         logger.info(f"Loaded analysis data from {input_path}")
 
         return df
 
-    def generate_report(self, df: pd.DataFrame, charts: dict, output_file: str = "premier_league_report.pdf") -> str:
+    def build_story(self, df: pd.DataFrame, charts: dict,
+                    title: str = "Premier League Performance Analysis Report") -> list:
         """
-        Generate complete PDF report
+        Build the full report content
 
         Args:
             df: DataFrame with analysis data
-            charts: Dictionary with chart paths
-            output_file: Output PDF filename
+            charts: Dictionary with chart paths or in-memory chart buffers
+            title: Report title
 
         Returns:
-            Path to generated report
+            List of ReportLab flowables
         """
-        logger.info("Generating PDF report...")
-
-        output_path = self.output_dir / output_file
-
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            str(output_path),
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
-
-        # Build story (content)
         story = []
 
         # Title page
-        story.extend(self.create_title_page())
+        story.extend(self.create_title_page(title))
 
         # Methodology
         story.extend(self.create_methodology_section())
@@ -411,13 +774,343 @@ class PerformanceReportGenerator:
         # Underperforming teams table
         story.extend(self.create_underperforming_teams_table(df))
 
-        # Build PDF
-        doc.build(story)
+        return story
+
+    def build_team_story(self, team: str, df: pd.DataFrame, charts: dict) -> list:
+        """
+        Build the content of a single-team report
+
+        Args:
+            team: Team name
+            df: DataFrame with analysis data for the team's league
+            charts: Dictionary with an optional 'team_card' chart path or buffer
+
+        Returns:
+            List of ReportLab flowables
+        """
+        row = df[df['Team'] == team].iloc[0]
+        story = []
+
+        # Title page
+        story.extend(self.create_title_page(f"{team} Performance Analysis Report"))
+
+        # Team metrics and card
+        story.extend(self.create_team_summary_table(row))
+        if 'team_card' in charts:
+            story.extend(self.add_chart(charts['team_card'], width=6.5 * inch))
+        story.append(PageBreak())
+
+        # League context
+        story.extend(self.create_high_risk_teams_table(df))
+        story.append(Spacer(1, 0.3 * inch))
+        story.extend(self.create_underperforming_teams_table(df))
+        story.append(PageBreak())
+
+        # Methodology
+        story.extend(self.create_methodology_section())
+
+        return story
+
+    def _build_pdf(self, target, story: list) -> None:
+        """
+        Lay out and write the PDF
+
+        Args:
+            target: Output filename or writable binary file object
+            story: List of ReportLab flowables
+        """
+        doc = SimpleDocTemplate(
+            target,
+            pagesize=letter,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18
+        )
+        with span('pdf_build', 'report', flowables=len(story)):
+            doc.build(story)
+
+    def generate_report(self, df: pd.DataFrame, charts: dict, output_file: str = "premier_league_report.pdf") -> str:
+        """
+        Generate complete PDF report
+
+        Args:
+            df: DataFrame with analysis data
+            charts: Dictionary with chart paths or in-memory chart buffers
+            output_file: Output PDF filename
+
+        Returns:
+            Path to generated report
+        """
+        logger.info("Generating PDF report...")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = self.output_dir / output_file
+        self._build_pdf(str(output_path), self.build_story(df, charts))
 
         logger.info(f"Report saved to {output_path}")
 
         return str(output_path)
 
+    def generate_report_bytes(self, df: pd.DataFrame, charts: dict) -> bytes:
+        """
+        Generate complete PDF report without touching the filesystem
+
+        Args:
+            df: DataFrame with analysis data
+            charts: Dictionary with chart paths or in-memory chart buffers
+
+        Returns:
+            PDF document as bytes
+        """
+        logger.info("Generating PDF report in memory...")
+
+        buffer = io.BytesIO()
+        self._build_pdf(buffer, self.build_story(df, charts))
+
+        logger.info(f"Report generated ({buffer.getbuffer().nbytes} bytes)")
+
+        return buffer.getvalue()
+
+    def generate_batch_reports(self, df: pd.DataFrame, team_charts: dict = None,
+                               league_charts: dict = None, charts: dict = None, teams: bool = True,
+                               leagues: bool = True, max_workers: int = None) -> dict:
+        """
+        Generate per-team and per-league reports in parallel worker processes
+
+        Each worker builds its own generator once (styles, static sections,
+        image cache) and reuses it for every report it renders, so the batch
+        scales with the number of cores.
+
+        Args:
+            df: DataFrame with analysis data (optionally with a League column)
+            team_charts: Team slug path (see schema.team_path) -> team card path or buffer
+            league_charts: League name -> charts dict as used by generate_report
+            charts: Charts dict for the league report when df has no League column
+            teams: Generate one report per team
+            leagues: Generate one report per league
+            max_workers: Number of worker processes (defaults to CPU count)
+
+        Returns:
+            Dictionary with 'teams' (team slug path -> report path) and
+            'leagues' (league name -> report path) mappings
+        """
+        team_charts = team_charts or {}
+        if 'League' in df.columns:
+            league_groups = list(df.groupby('League', sort=False))
+            league_charts = league_charts or {}
+        else:
+            league_groups = [("Premier League", df)]
+            league_charts = {"Premier League": charts or {}}
+
+        jobs = []
+        for league, league_df in league_groups:
+            if leagues:
+                output_path = self.output_dir / 'leagues' / f"{slugify(league)}.pdf"
+                jobs.append(('league', league, league, league_df, league_charts.get(league, {}),
+                             str(output_path)))
+            if teams:
+                # A team report's context is its own league-season
+                seasons = league_df.groupby('Season', sort=False) if 'Season' in df.columns else [(None, league_df)]
+                for _, season_df in seasons:
+                    for _, row in season_df.iterrows():
+                        key = team_path(row)
+                        card = {'team_card': team_charts[key]} if key in team_charts else {}
+                        output_path = self.output_dir / 'teams' / f"{key}.pdf"
+                        output_path.parent.mkdir(parents=True, exist_ok=True)
+                        jobs.append(('team', key, row['Team'], season_df, card, str(output_path)))
+
+        (self.output_dir / 'leagues').mkdir(parents=True, exist_ok=True)
+
+        max_workers = max_workers or os.cpu_count() or 1
+        options = {
+            'data_dir': str(self.data_dir),
+            'charts_dir': str(self.charts_dir),
+            'output_dir': str(self.output_dir),
+            'image_settings': self.image_settings,
+        }
+        logger.info(f"Generating {len(jobs)} batch reports with {max_workers} worker processes...")
+
+        results = {'teams': {}, 'leagues': {}}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker,
+                                 initargs=(options, logging_config())) as executor:
+            chunksize = max(1, len(jobs) // (max_workers * 4))
+            for kind, key, path in executor.map(_build_batch_report, jobs, chunksize=chunksize):
+                results[f"{kind}s"][key] = path
+
+        logger.info(f"Generated {len(results['teams'])} team and {len(results['leagues'])} league reports")
+
+        return results
+
+    def _html_table(self, heading: str, table_data: list, empty_message: str) -> str:
+        """
+        Render a formatted table as HTML
+
+        Args:
+            heading: Section heading
+            table_data: List of rows, header first
+            empty_message: Text shown when the table has no body rows
+
+        Returns:
+            HTML fragment
+        """
+        parts = [f"<h2>{html.escape(heading)}</h2>"]
+        if len(table_data) == 1:
+            parts.append(f"<p>{html.escape(empty_message)}</p>")
+            return '\n'.join(parts)
+
+        header = ''.join(f"<th>{html.escape(str(cell))}</th>" for cell in table_data[0])
+        rows = ''.join(
+            '<tr>' + ''.join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + '</tr>'
+            for row in table_data[1:]
+        )
+        parts.append(f"<table><thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>")
+        return '\n'.join(parts)
+
+    def _html_chart(self, chart, width: float = 6 * inch) -> str:
+        """
+        Inline a chart as a data URI image
+
+        The 300 dpi chart PNGs are downsampled with the HTML image profile
+        (screen resolution JPEG by default) so the page stays small.
+
+        Args:
+            chart: Path to chart image or in-memory image buffer
+            width: Displayed width the image profile downsamples the chart to
+
+        Returns:
+            HTML fragment ('' if the chart is missing)
+        """
+        if isinstance(chart, (str, Path)) and not Path(chart).exists():
+            logger.warning(f"Chart not found: {chart}")
+            return ''
+
+        if self.html_image_settings is not None:
+            data = self._optimize_image(chart, width, self.html_image_settings).getvalue()
+        elif isinstance(chart, (str, Path)):
+            data = Path(chart).read_bytes()
+        else:
+            chart.seek(0)
+            data = chart.read()
+
+        mime = 'image/jpeg' if data.startswith(b'\xff\xd8') else 'image/png'
+        return f'<img src="data:{mime};base64,{base64.b64encode(data).decode("ascii")}" alt="">'
+
+    def render_html(self, df: pd.DataFrame, charts: dict = None,
+                    title: str = "Premier League Performance Analysis Report") -> str:
+        """
+        Render the report as a self-contained HTML page
+
+        Args:
+            df: DataFrame with analysis data
+            charts: Dictionary with chart paths or in-memory chart buffers (None for tables only)
+            title: Report title
+
+        Returns:
+            HTML document
+        """
+        charts = charts or {}
+        body = []
+
+        for chart_name, heading in HTML_CHART_SECTIONS:
+            if chart_name in charts:
+                body.append(f"<h2>{html.escape(heading)}</h2>")
+                body.append(self._html_chart(charts[chart_name]))
+
+        body.append(self._html_table(
+            "High-Risk Teams Analysis", self.high_risk_table_data(df),
+            "No teams currently identified as high risk for regression."
+        ))
+        body.append(self._html_table(
+            "Underperforming Teams Analysis", self.underperforming_table_data(df),
+            "No teams currently identified as significantly underperforming."
+        ))
+
+        return HTML_TEMPLATE.format(
+            title=html.escape(title),
+            generated=datetime.now().strftime('%B %d, %Y %H:%M'),
+            body='\n'.join(body)
+        )
+
+    def render_json(self, df: pd.DataFrame) -> dict:
+        """
+        Build a machine-readable summary of the report
+
+        Args:
+            df: DataFrame with analysis data
+
+        Returns:
+            JSON-serialisable dictionary
+        """
+        def records(frame: pd.DataFrame) -> list:
+            return json.loads(frame.to_json(orient='records'))
+
+        # float32 columns would serialise as 82.8399963379
+        df = export_frame(df)
+
+        key_columns = ['Team', 'Actual_Points', 'xPTS', 'Variance', 'Risk_Score',
+                       'Risk_Category', 'Regression_Probability']
+        high_risk = self.select_high_risk_teams(df)
+        underperforming = self.select_underperforming_teams(df)
+
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'summary': {
+                'teams': int(len(df)),
+                'average_variance': round(float(df['Variance'].mean()), 2),
+                'variance_std': round(float(df['Variance'].std()), 2),
+                'high_risk': int(len(high_risk)),
+                'underperforming': int(len(underperforming)),
+                'risk_categories': {str(k): int(v) for k, v in df['Risk_Category'].value_counts().items()},
+            },
+            'high_risk': records(high_risk[key_columns]),
+            'underperforming': records(underperforming[key_columns]),
+            'teams': records(df),
+        }
+
+    def export(self, df: pd.DataFrame, charts: dict = None, formats: tuple = ('html', 'json'),
+               basename: str = "premier_league_report") -> dict:
+        """
+        Write the report in one or more formats
+
+        HTML and JSON are cheap enough to regenerate on every data refresh;
+        the PDF is only built when 'pdf' is requested.
+
+        Args:
+            df: DataFrame with analysis data
+            charts: Dictionary with chart paths or in-memory chart buffers
+            formats: Any of 'html', 'json' and 'pdf'
+            basename: Output filename without extension
+
+        Returns:
+            Dictionary mapping format to output path
+        """
+        unknown = set(formats) - {'html', 'json', 'pdf'}
+        if unknown:
+            raise ValueError(f"Unknown report formats: {unknown}")
+
+        charts = charts or {}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        outputs = {}
+
+        if 'html' in formats:
+            output_path = self.output_dir / f"{basename}.html"
+            output_path.write_text(self.render_html(df, charts), encoding='utf-8')
+            logger.info(f"HTML report saved to {output_path}")
+            outputs['html'] = str(output_path)
+
+        if 'json' in formats:
+            output_path = self.output_dir / f"{basename}.json"
+            with open(output_path, 'w') as f:
+                json.dump(self.render_json(df), f, indent=2)
+            logger.info(f"JSON report saved to {output_path}")
+            outputs['json'] = str(output_path)
+
+        if 'pdf' in formats:
+            outputs['pdf'] = self.generate_report(df, charts, f"{basename}.pdf")
+
+        return outputs
+
     def run(self, analysis_file: str = "risk_analysis.csv",
             charts: dict = None, output_file: str = "premier_league_report.pdf") -> str:
         """
@@ -425,7 +1118,7 @@ class PerformanceReportGenerator:
 
         Args:
             analysis_file: Input CSV file with analysis data
-            charts: Dictionary with chart paths (if None, will look for default charts)
+            charts: Dictionary with chart paths or buffers (if None, will look for default charts)
             output_file: Output PDF filename
 
         Returns:
@@ -455,16 +1148,44 @@ class PerformanceReportGenerator:
 
 def main():
     """Main function for testing the reporter"""
-    reporter = PerformanceReportGenerator()
-
-    try:
-        report_path = reporter.run()
-        print(f"\n=== PDF Report Generated ===")
-        print(f"Report saved to: {report_path}")
-
-    except FileNotFoundError as e:
-        logger.error(f"Error: {e}")
-        logger.info("Please run the scraper, calculator, analyzer, and visualizer first.")
+    import argparse
+    from profiling import add_profile_arguments, profile_from_args
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Generate performance analysis reports')
+    parser.add_argument(
+        '--format',
+        nargs='+',
+        default=['pdf'],
+        choices=['pdf', 'html', 'json'],
+        help='Report formats to write'
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args, 'report'):
+        reporter = PerformanceReportGenerator()
+
+        try:
+            if args.format == ['pdf']:
+                report_path = reporter.run()
+                print(f"\n=== PDF Report Generated ===")
+                print(f"Report saved to: {report_path}")
+            else:
+                df = reporter.load_analysis_data()
+                charts = {
+                    chart_name: str(reporter.charts_dir / f"{chart_name}.png")
+                    for chart_name, _ in HTML_CHART_SECTIONS
+                }
+                outputs = reporter.export(df, charts, formats=tuple(args.format))
+                print(f"\n=== Reports Generated ===")
+                for report_format, report_path in outputs.items():
+                    print(f"{report_format.upper()}: {report_path}")
+
+        except FileNotFoundError as e:
+            logger.error(f"Error: {e}")
+            logger.info("Please run the scraper, calculator, analyzer, and visualizer first.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+"""
+Stage Scheduler Module
+Runs pipeline stages as a dependency DAG on a worker pool
+"""
+
+import time
+import logging
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """A named unit of pipeline work with upstream dependencies"""
+
+    def __init__(self, name: str, func, depends_on: tuple = (), description: str = ""):
+        """
+        Initialize stage
+
+        Args:
+            name: Unique stage name
+            func: Callable taking the results dict of finished stages and returning this stage's result
+            depends_on: Names of stages that must finish first
+            description: Human-readable description for logs
+        """
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.description = description or name
+
+
+class StageScheduler:
+    """
+    Dependency-aware scheduler for pipeline stages
+
+    A stage starts as soon as every selected upstream stage has finished, so
+    independent stages overlap on the worker pool. Stages left out of a run
+    (via only/start/until) count as already satisfied; their consumers are
+    expected to fall back to the persisted outputs.
+    """
+
+    def __init__(self, max_workers: int = 4, profiler=None):
+        """
+        Initialize scheduler
+
+        Args:
+            max_workers: Maximum number of stages running at once
+            profiler: Optional StageProfiler wrapping each stage (see profiling.py)
+        """
+        self.max_workers = max_workers
+        self.profiler = profiler
+        self.stages = {}
+        self.timings = {}
+
+    def add_stage(self, name: str, func, depends_on: tuple = (), description: str = "") -> None:
+        """
+        Register a stage
+
+        Args:
+            name: Unique stage name
+            func: Callable taking the results dict and returning the stage result
+            depends_on: Names of upstream stages (must already be registered)
+            description: Human-readable description for logs
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        unknown = set(depends_on) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Stage {name} depends on unknown stages: {unknown}")
+
+        self.stages[name] = Stage(name, func, depends_on, description)
+
+    def _ancestors(self, name: str) -> set:
+        """Get a stage and everything upstream of it"""
+        found = {name}
+        for dep in self.stages[name].depends_on:
+            found |= self._ancestors(dep)
+        return found
+
+    def _descendants(self, name: str) -> set:
+        """Get a stage and everything downstream of it"""
+        found = {name}
+        for stage in self.stages.values():
+            if name in stage.depends_on:
+                found |= self._descendants(stage.name)
+        return found
+
+    def select(self, only: list = None, start: str = None, until: str = None,
+               exclude: list = None) -> list:
+        """
+        Resolve which stages to run
+
+        Args:
+            only: Run exactly these stages
+            start: Run this stage and everything downstream of it
+            until: Run this stage and everything upstream of it
+            exclude: Stages to leave out
+
+        Returns:
+            Selected stage names in registration (topological) order
+        """
+        for name in list(only or []) + [s for s in (start, until) if s] + list(exclude or []):
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name} (expected one of {list(self.stages)})")
+
+        selected = set(only) if only else set(self.stages)
+        if start:
+            selected &= self._descendants(start)
+        if until:
+            selected &= self._ancestors(until)
+        selected -= set(exclude or [])
+
+        return [name for name in self.stages if name in selected]
+
+    def run(self, stages: list = None) -> dict:
+        """
+        Execute the selected stages
+
+        Args:
+            stages: Stage names from select() (defaults to every stage)
+
+        Returns:
+            Dictionary mapping stage name to its result
+        """
+        stages = list(stages) if stages is not None else list(self.stages)
+        pending = set(stages)
+        results = {}
+        self.timings = {}
+        running = {}
+        origin = time.perf_counter()
+
+        def ready(name: str) -> bool:
+            return all(dep in results or dep not in stages for dep in self.stages[name].depends_on)
+
+        def execute(name: str):
+            started = time.perf_counter()
+            profile = self.profiler.stage(name) if self.profiler else nullcontext()
+            try:
+                with span(name, 'stage') as stage_span, profile:
+                    result = self.stages[name].func(results)
+                    # Record row counts for stages that return a DataFrame (or lead with one)
+                    frame = result[0] if isinstance(result, tuple) and result else result
+                    if hasattr(frame, 'shape'):
+                        stage_span.rows = len(frame)
+                return result
+            finally:
+                self.timings[name] = (started - origin, time.perf_counter() - origin)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name in [n for n in stages if n in pending and ready(n)]:
+                    logger.info(f"[{name}] {self.stages[name].description}...")
+                    running[executor.submit(execute, name)] = name
+                    pending.discard(name)
+
+                if not running:
+                    raise RuntimeError(f"Stages can never run (dependency cycle?): {sorted(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        logger.error(f"[{name}] failed: {error}")
+                        # Let stages already in flight finish, but start nothing new
+                        wait(running)
+                        raise error
+                    results[name] = future.result()
+                    start, end = self.timings[name]
+                    logger.info(f"[{name}] ✓ done in {end - start:.2f}s")
+
+        return results
+
+    def critical_path(self) -> tuple:
+        """
+        Find the chain of dependent stages that determined wall-clock time
+
+        Returns:
+            Tuple of (stage names along the path, summed duration in seconds)
+        """
+        longest = {}
+        for name in self.stages:
+            if name not in self.timings:
+                continue
+            start, end = self.timings[name]
+            upstream = [longest[dep] for dep in self.stages[name].depends_on if dep in longest]
+            best = max(upstream, key=lambda path: path[1], default=([], 0.0))
+            longest[name] = (best[0] + [name], best[1] + (end - start))
+
+        if not longest:
+            return [], 0.0
+        return max(longest.values(), key=lambda path: path[1])
+
+    def log_report(self) -> None:
+        """Log per-stage timings and the critical path"""
+        if not self.timings:
+            return
+
+        wall = max(end for _, end in self.timings.values())
+        logger.info("Stage timings (start → end, duration):")
+        for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0]):
+            logger.info(f"  {name:10} {start:7.2f}s → {end:7.2f}s  ({end - start:.2f}s)")
+
+        path, duration = self.critical_path()
+        logger.info(f"Critical path: {' → '.join(path)} ({duration:.2f}s of {wall:.2f}s wall time)")
@@ -0,0 +1,249 @@
+"""
+DataFrame Schema Module
+Compact column dtypes shared by every pipeline stage, applied when data is
+loaded and saved
+"""
+
+import logging
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+RISK_CATEGORIES = pd.CategoricalDtype(['Low', 'Moderate', 'High', 'Critical'], ordered=True)
+PERFORMANCE_STATUSES = pd.CategoricalDtype(['Underperforming', 'As Expected', 'Overperforming'])
+
+# Column -> compact dtype. Counts fit in int16 and the scores in int8; xG,
+# points and probabilities are stored with at most three decimals, well
+# within float32's seven significant digits. Z-scores and p-values keep
+# float64, since p-values for large z-scores go below float32's range.
+SCHEMA = {
+    'League': 'category',
+    'Season': 'category',
+    'Team': 'category',
+    'Matches': 'int16',
+    'Goals_For': 'int16',
+    'Goals_Against': 'int16',
+    'Actual_Points': 'int16',
+    'Wins': 'int16',
+    'Draws': 'int16',
+    'Losses': 'int16',
+    'Position': 'int16',
+    'Position_Actual': 'int16',
+    'Position_Expected': 'int16',
+    'xG_For': 'float32',
+    'xG_Against': 'float32',
+    'xPTS': 'float32',
+    'Variance': 'float32',
+    'Regression_Probability': 'float32',
+    'Risk_Score': 'int8',
+    'Risk_Category': RISK_CATEGORIES,
+    'Performance_Status': PERFORMANCE_STATUSES,
+}
+
+# Decimals each float32 column is rounded to by the stage that produces it;
+# widening back to float64 rounds again, so arithmetic sees the exact value
+DECIMALS = {
+    'xG_For': 2,
+    'xG_Against': 2,
+    'xPTS': 2,
+    'Variance': 2,
+    'Regression_Probability': 3,
+}
+
+
+def _fits(series: pd.Series, dtype) -> bool:
+    """Check that an integer column has no gaps and fits the target type"""
+    if series.isna().any():
+        return False
+    if series.empty:
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= series.min() and series.max() <= info.max
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast the schema's columns to their compact dtypes
+
+    Columns outside the schema are left alone, as are integer columns with
+    missing values or values out of range (those stay as read, for the
+    validation step to report).
+
+    Args:
+        df: DataFrame from any pipeline stage
+
+    Returns:
+        New DataFrame with compact dtypes
+    """
+    dtypes = {}
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype in ('int8', 'int16'):
+            if not pd.api.types.is_numeric_dtype(df[col]) or not _fits(df[col], dtype):
+                logger.debug(f"Keeping {col} as {df[col].dtype}: not representable as {dtype}")
+                continue
+        dtypes[col] = dtype
+
+    return df.astype(dtypes) if dtypes else df.copy()
+
+
+def exact(series: pd.Series) -> pd.Series:
+    """
+    Widen a compact float column back to float64 for arithmetic
+
+    float32 holds 82.84 as 82.8399963..., so the value is rounded back to
+    the column's stored decimals; results then match a float64 run exactly.
+
+    Args:
+        series: Column (returned unchanged unless it is float32)
+
+    Returns:
+        float64 Series
+    """
+    if series.dtype != np.float32:
+        return series
+    widened = series.astype('float64')
+    decimals = DECIMALS.get(series.name)
+    return widened.round(decimals) if decimals is not None else widened
+
+
+def export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert compact dtypes to plain ones for JSON, SQL and string formatting
+
+    Args:
+        df: DataFrame with schema dtypes
+
+    Returns:
+        New DataFrame with float64 floats and object (string) categoricals
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == np.float32:
+            df[col] = exact(df[col])
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+def read_csv(path, **kwargs) -> pd.DataFrame:
+    """
+    Read a pipeline CSV straight into the compact schema
+
+    Category and float32 columns are parsed directly into their dtypes;
+    integer columns are downcast after the read so a missing value does not
+    abort it.
+
+    Args:
+        path: CSV path
+        **kwargs: Passed to pd.read_csv
+
+    Returns:
+        DataFrame with compact dtypes
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = {col: SCHEMA[col] for col in header
+             if col in SCHEMA and str(SCHEMA[col]) not in ('int8', 'int16')}
+    dtype.update(kwargs.pop('dtype', {}))
+
+    try:
+        df = pd.read_csv(path, dtype=dtype, **kwargs)
+    except ValueError:
+        # Non-numeric junk in a float column: read loosely and cast what fits
+        df = pd.read_csv(path, **kwargs)
+
+    return apply_schema(df)
+
+
+def to_csv(df: pd.DataFrame, path) -> None:
+    """
+    Write a DataFrame in the compact schema
+
+    float32 values are written with their shortest representation, so the
+    file reads the same as one written from float64.
+
+    Args:
+        df: DataFrame to save
+        path: Output CSV path
+    """
+    apply_schema(df).to_csv(path, index=False)
+
+
+def slugify(name) -> str:
+    """
+    Convert a team or league name to the slug used in filenames and URLs
+
+    Args:
+        name: Team or league name
+
+    Returns:
+        Lowercase slug, e.g. 'Manchester City' -> 'manchester-city'
+    """
+    return re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-')
+
+
+def team_path(row) -> str:
+    """
+    Build the slug path identifying a team-season in filenames and result keys
+
+    Args:
+        row: Team row (Series or dict) with Team and optionally League and Season
+
+    Returns:
+        'league/season/team' as far as those fields exist, e.g. 'la-liga/arsenal'
+    """
+    parts = [row[col] for col in ('League', 'Season') if col in row] + [row['Team']]
+    return '/'.join(slugify(part) for part in parts)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare a DataFrame's memory use before and after applying the schema
+
+    Args:
+        df: DataFrame with default dtypes
+
+    Returns:
+        DataFrame with one row per column (dtypes and bytes) plus a total row
+    """
+    compact = apply_schema(df)
+    report = pd.DataFrame({
+        'Dtype': df.dtypes.astype(str),
+        'Bytes': df.memory_usage(deep=True, index=False),
+        'Compact_Dtype': compact.dtypes.astype(str),
+        'Compact_Bytes': compact.memory_usage(deep=True, index=False),
+    })
+    report.loc['Total'] = ['', report['Bytes'].sum(), '', report['Compact_Bytes'].sum()]
+    return report
+
+
+def main():
+    """Main function for reporting the memory saved on a pipeline CSV"""
+    import argparse
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Show the memory the compact schema saves on a CSV')
+    parser.add_argument('csv', nargs='?', default='data/risk_analysis.csv', help='Pipeline CSV to inspect')
+    args = parser.parse_args()
+
+    if not Path(args.csv).exists():
+        logger.error(f"File not found: {args.csv}")
+        return
+
+    report = memory_report(pd.read_csv(args.csv))
+    total = report.loc['Total']
+    print(report.to_string())
+    print(f"\n{total['Bytes'] / 1e6:.2f} MB -> {total['Compact_Bytes'] / 1e6:.2f} MB "
+          f"({total['Bytes'] / max(total['Compact_Bytes'], 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
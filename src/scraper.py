@@ -11,25 +11,61 @@ import time
 import logging
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from instrumentation import span
+from logging_setup import configure_logging
+from schema import to_csv
+from validation import DataValidator, validate_stage
+
 logger = logging.getLogger(__name__)
 
+# League name -> (FBRef competition id, URL slug)
+LEAGUES = {
+    'Premier League': (9, 'Premier-League'),
+    'La Liga': (12, 'La-Liga'),
+    'Serie A': (11, 'Serie-A'),
+    'Bundesliga': (20, 'Bundesliga'),
+    'Ligue 1': (13, 'Ligue-1'),
+}
+
+# League name -> matches per team in a full season (validation limit)
+SEASON_GAMES = {
+    'Premier League': 38,
+    'La Liga': 38,
+    'Serie A': 38,
+    'Bundesliga': 34,
+    'Ligue 1': 34,
+}
+
+
+def league_url(league: str) -> str:
+    """
+    Get the FBRef stats page of a league
+
+    Args:
+        league: League name (key of LEAGUES)
+
+    Returns:
+        URL of the league's stats page
+    """
+    comp_id, slug = LEAGUES[league]
+    return f"https://fbref.com/en/comps/{comp_id}/{slug}-Stats"
+
 
 class PremierLeagueScraper:
     """Scraper for Premier League xG data from FBRef.com"""
 
-    def __init__(self, output_dir: str = "data"):
+    def __init__(self, output_dir: str = "data", max_retries: int = 2, retry_backoff: float = 5.0):
         """
         Initialize scraper
 
         Args:
             output_dir: Directory to save scraped data
+            max_retries: Extra attempts after a timeout, connection error, 429 or 5xx
+            retry_backoff: Seconds to wait before the first retry (doubles each retry)
         """
-        self.base_url = "https://fbref.com/en/comps/9/Premier-League-Stats"
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.base_url = league_url('Premier League')
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.headers = {
@@ -50,31 +86,70 @@ class PremierLeagueScraper:
         else:
             logger.info("No proxy configured, using direct connection")
 
-    def scrape_league_table(self) -> pd.DataFrame:
+    def fetch_page(self, url: str = None) -> bytes:
         """
-        Scrape Premier League table with xG data
+        Download a league stats page
+
+        Args:
+            url: Page to fetch (defaults to the Premier League page)
 
         Returns:
-            DataFrame with team statistics including xG data
+            Raw HTML of the page
         """
-        logger.info(f"Fetching data from {self.base_url}")
+        url = url or self.base_url
+        logger.info(f"Fetching data from {url}")
+
+        # Add delay to respect rate limiting
+        time.sleep(3)
+
+        with span('fetch', 'scrape', url=url) as fetch_span:
+            for attempt in range(self.max_retries + 1):
+                fetch_span.args['retries'] = attempt
+                if attempt:
+                    delay = self.retry_backoff * 2 ** (attempt - 1)
+                    logger.warning(f"Retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries + 1})")
+                    time.sleep(delay)
+
+                try:
+                    response = requests.get(
+                        url,
+                        headers=self.headers,
+                        proxies=self.proxies,
+                        timeout=30  # Increased for residential proxy latency
+                    )
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    logger.warning(f"Request failed: {e}")
+                    if attempt == self.max_retries:
+                        raise
+                    continue
+
+                fetch_span.args['status'] = response.status_code
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable or attempt == self.max_retries:
+                    break
+                logger.warning(f"Server returned {response.status_code}")
 
-        try:
-            # Add delay to respect rate limiting
-            time.sleep(3)
-
-            response = requests.get(
-                self.base_url,
-                headers=self.headers,
-                proxies=self.proxies,
-                timeout=30  # Increased for residential proxy latency
-            )
             response.raise_for_status()
+            fetch_span.args['bytes'] = len(response.content)
+
+        logger.info(f"Successfully fetched data (Status: {response.status_code})")
 
-            logger.info(f"Successfully fetched data (Status: {response.status_code})")
+        return response.content
 
+    def parse_league_table(self, html: bytes, league: str = 'Premier League') -> pd.DataFrame:
+        """
+        Extract the league table with xG data from a stats page
+
+        Args:
+            html: Raw HTML of the league stats page
+            league: League the page belongs to (used to find the table by caption)
+
+        Returns:
+            DataFrame with team statistics including xG data
+        """
+        with span('parse', 'scrape') as parse_span:
             # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(html, 'html.parser')
 
             # Find the league standings table with xG data
             # Look for table with ID containing 'results' and 'overall'
@@ -84,7 +159,7 @@ class PremierLeagueScraper:
                 # Fallback: try to find by caption
                 for potential_table in soup.find_all('table'):
                     caption = potential_table.find('caption')
-                    if caption and 'Premier League Table' in caption.get_text():
+                    if caption and f"{league} Table" in caption.get_text():
                         table = potential_table
                         break
 
@@ -138,7 +213,7 @@ class PremierLeagueScraper:
                     xg_for = float(row_data.get('xg_for', '0'))
                     xg_against = float(row_data.get('xg_against', '0'))
 
-                    teams_data.append({
+                    team_data = {
                         'Team': team_name,
                         'Matches': matches_played,
                         'Goals_For': goals_for,
@@ -146,9 +221,17 @@ class PremierLeagueScraper:
                         'Actual_Points': points,
                         'xG_For': xg_for,
                         'xG_Against': xg_against
-                    })
+                    }
 
-                    logger.info(f"Extracted data for {team_name}")
+                    # Results breakdown, when the table has it, lets validation cross-check points
+                    if all(row_data.get(stat) for stat in ('wins', 'ties', 'losses')):
+                        team_data['Wins'] = int(row_data['wins'])
+                        team_data['Draws'] = int(row_data['ties'])
+                        team_data['Losses'] = int(row_data['losses'])
+
+                    teams_data.append(team_data)
+
+                    logger.info("Extracted data for %s", team_name, extra={'team': team_name})
 
                 except (IndexError, ValueError, KeyError) as e:
                     logger.warning(f"Could not extract data from row: {e}")
@@ -163,8 +246,22 @@ class PremierLeagueScraper:
             # Add position column
             df['Position'] = range(1, len(df) + 1)
 
+            parse_span.rows = len(df)
+
+        return df
+
+    def scrape_league_table(self) -> pd.DataFrame:
+        """
+        Scrape Premier League table with xG data
+
+        Returns:
+            DataFrame with team statistics including xG data
+        """
+        try:
+            df = self.parse_league_table(self.fetch_page())
+
             # Validate data
-            self._validate_data(df)
+            self._validate_data(df, 'Premier League')
 
             logger.info(f"Successfully scraped data for {len(df)} teams")
 
@@ -177,40 +274,50 @@ class PremierLeagueScraper:
             logger.error(f"Error scraping data: {e}")
             raise
 
-    def _validate_data(self, df: pd.DataFrame) -> None:
+    def iter_leagues(self, leagues: list = None):
         """
-        Validate scraped data for missing or invalid values
+        Scrape several leagues, yielding each table as soon as it is parsed
 
-        Args:
-            df: DataFrame to validate
-        """
-        required_columns = [
-            'Team', 'Matches', 'Goals_For', 'Goals_Against',
-            'Actual_Points', 'xG_For', 'xG_Against'
-        ]
+        A league that cannot be fetched or parsed is logged and skipped, so
+        one failing page does not stop the others.
 
-        # Check for missing columns
-        missing_cols = set(required_columns) - set(df.columns)
-        if missing_cols:
-            raise ValueError(f"Missing required columns: {missing_cols}")
+        Args:
+            leagues: League names (keys of LEAGUES; defaults to all of them)
 
-        # Check for null values
-        null_counts = df[required_columns].isnull().sum()
-        if null_counts.any():
-            logger.warning(f"Found null values:\n{null_counts[null_counts > 0]}")
-            raise ValueError("Data contains null values")
+        Yields:
+            Tuples of (league name, validated league table)
 
-        # Check for negative values (shouldn't happen for these stats)
-        numeric_cols = ['Matches', 'Goals_For', 'Goals_Against', 'Actual_Points', 'xG_For', 'xG_Against']
-        for col in numeric_cols:
-            if (df[col] < 0).any():
-                raise ValueError(f"Found negative values in {col}")
+        Raises:
+            ValueError: If a league name is not a key of LEAGUES
+        """
+        unknown = [league for league in leagues or [] if league not in LEAGUES]
+        if unknown:
+            raise ValueError(f"Unknown league(s): {', '.join(unknown)} (choose from {', '.join(LEAGUES)})")
+
+        for league in leagues or LEAGUES:
+            try:
+                df = self.parse_league_table(self.fetch_page(league_url(league)), league)
+                self._validate_data(df, league)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Skipping {league}: {e}")
+                continue
+
+            logger.info(f"Scraped {len(df)} teams for {league}")
+            yield league, df
+
+    def _validate_data(self, df: pd.DataFrame, league: str = None) -> None:
+        """
+        Validate scraped data, reporting every problem at once
 
-        # Check for reasonable ranges
-        if (df['Matches'] > 38).any():
-            logger.warning("Some teams have more than 38 matches (full season)")
+        Args:
+            df: DataFrame to validate
+            league: League the table belongs to; its season length from
+                SEASON_GAMES bounds the matches played
 
-        logger.info("Data validation passed")
+        Raises:
+            ValueError: If the table violates any error-level rule (see validation.py)
+        """
+        validate_stage(df, 'raw', validator=DataValidator(games_in_season=SEASON_GAMES.get(league)))
 
     def save_data(self, df: pd.DataFrame, filename: str = "raw_data.csv") -> None:
         """
@@ -221,7 +328,7 @@ class PremierLeagueScraper:
             filename: Output filename
         """
         output_path = self.output_dir / filename
-        df.to_csv(output_path, index=False)
+        to_csv(df, output_path)
         logger.info(f"Data saved to {output_path}")
 
     def run(self) -> pd.DataFrame:
@@ -242,11 +349,21 @@ class PremierLeagueScraper:
 
 def main():
     """Main function for testing the scraper"""
-    scraper = PremierLeagueScraper()
-    df = scraper.run()
-    print("\n=== Scraped Data Summary ===")
-    print(df.head())
-    print(f"\nTotal teams: {len(df)}")
+    import argparse
+    from profiling import add_profile_arguments, profile_from_args
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Scrape the Premier League table')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args, 'scrape'):
+        scraper = PremierLeagueScraper()
+        df = scraper.run()
+        print("\n=== Scraped Data Summary ===")
+        print(df.head())
+        print(f"\nTotal teams: {len(df)}")
 
 
 if __name__ == "__main__":
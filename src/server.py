@@ -0,0 +1,465 @@
+"""
+Results Server Module
+Small HTTP service serving xPTS and risk results from precomputed,
+in-memory responses
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+import http.client
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import numpy as np
+import pandas as pd
+
+from calculator import ExpectedPointsCalculator
+from analyzer import PerformanceAnalyzer
+from logging_setup import configure_logging
+from schema import export_frame, read_csv, slugify
+
+logger = logging.getLogger(__name__)
+
+# Cache-Control max-age per endpoint: analysis results change when the
+# pipeline reruns, xPTS for given inputs never changes
+LEAGUE_MAX_AGE = 60
+XPTS_MAX_AGE = 86400
+
+TEAM_COLUMNS = [
+    'Team', 'Position_Actual', 'Position_Expected', 'Matches', 'Actual_Points', 'xPTS',
+    'Variance', 'Z_Score', 'P_Value', 'Risk_Score', 'Risk_Category',
+    'Regression_Probability', 'Performance_Status'
+]
+
+
+class Response:
+    """Encoded response body with its validator"""
+
+    def __init__(self, payload, max_age: int):
+        """
+        Encode a payload once so every request can reuse the bytes
+
+        Args:
+            payload: JSON-serialisable response body
+            max_age: Cache-Control max-age in seconds
+        """
+        self.body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()[:16]}"'
+        self.cache_control = f"public, max-age={max_age}"
+
+
+class ResultsCache:
+    """
+    Precomputed responses for the league and team endpoints
+
+    Responses are rebuilt only when the analysis file changes on disk (checked
+    at most once per second), so the request path is a dictionary lookup.
+    Without an analysis file the results are computed from raw_data.csv.
+    """
+
+    def __init__(self, data_dir: str = "data", filename: str = "risk_analysis.csv",
+                 check_interval: float = 1.0):
+        """
+        Initialize cache
+
+        Args:
+            data_dir: Directory containing pipeline outputs
+            filename: Analysis CSV to serve (e.g. the watch daemon's risk_table.csv)
+            check_interval: Minimum seconds between checks for a newer file
+        """
+        self.data_dir = Path(data_dir)
+        self.path = Path(filename) if Path(filename).is_absolute() else self.data_dir / filename
+        self.check_interval = check_interval
+        self.calculator = ExpectedPointsCalculator(data_dir)
+        self.analyzer = PerformanceAnalyzer(data_dir)
+
+        self.league = None
+        self.teams = {}
+        self.ambiguous = {}
+        self.loaded_at = None
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def _load(self) -> pd.DataFrame:
+        """Load the analysis results, computing them from raw data if needed"""
+        if self.path.exists():
+            return read_csv(self.path)
+
+        logger.info(f"{self.path} not found, computing results from raw data")
+        df_xpts = self.calculator.calculate_season_xpts(self.calculator.load_raw_data())
+        return self.analyzer.analyze_performance(df_xpts)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Rebuild responses if the analysis file changed
+
+        Args:
+            force: Rebuild even if the file looks unchanged
+
+        Returns:
+            True if responses were rebuilt
+        """
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+
+        with self._lock:
+            if not force and now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+
+            try:
+                stat = self.path.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                signature = None
+            if not force and signature == self._signature:
+                return False
+
+            try:
+                df = self._load()
+            except (pd.errors.EmptyDataError, pd.errors.ParserError) as e:
+                # The pipeline rewrites the file in place; a read mid-write sees a
+                # truncated file. Keep serving the previous responses and retry at
+                # the next check (the signature is left as it was).
+                if self.league is None:
+                    raise
+                logger.warning(f"Could not read {self.path} ({e}), serving results from {self.loaded_at}")
+                return False
+            columns = [col for col in ['League', 'Season'] + TEAM_COLUMNS if col in df.columns]
+            records = json.loads(export_frame(df[columns]).to_json(orient='records'))
+
+            generated = pd.Timestamp.now().isoformat(timespec='seconds')
+            self.league = Response({'generated_at': generated, 'teams': records}, LEAGUE_MAX_AGE)
+            self.teams, self.ambiguous = self._team_responses(records, generated)
+            self._signature = signature
+            self.loaded_at = generated
+
+        logger.info(f"Loaded {len(records)} teams from {self.path if signature else 'raw data'}")
+
+        return True
+
+
+    @staticmethod
+    def _team_responses(records: list, generated: str) -> tuple:
+        """
+        Build the /teams responses keyed by every path that can reach them
+
+        A team is reachable as team, league/team and league/season/team (as far
+        as those columns exist). A path shared by several team-seasons, such as
+        a bare team name in a multi-season file, is not served; it maps to the
+        full paths of the candidates instead.
+
+        Args:
+            records: Team records from the analysis file
+            generated: Generation timestamp for the responses
+
+        Returns:
+            Tuple of (path -> Response, ambiguous path -> candidate paths)
+        """
+        candidates = {}
+        for record in records:
+            parts = [record[col] for col in ('League', 'Season') if col in record] + [record['Team']]
+            slugs = [slugify(part) for part in parts]
+            response = Response({'generated_at': generated, **record}, LEAGUE_MAX_AGE)
+            full_path = '/'.join(slugs)
+            paths = {full_path, slugs[-1]}
+            if len(slugs) == 3:
+                paths.add(f"{slugs[0]}/{slugs[2]}")
+            for path in paths:
+                candidates.setdefault(path, []).append((full_path, response))
+
+        teams, ambiguous = {}, {}
+        for path, matches in candidates.items():
+            if len(matches) == 1:
+                teams[path] = matches[0][1]
+            else:
+                ambiguous[path] = sorted(f"/teams/{full_path}" for full_path, _ in matches)
+
+        return teams, ambiguous
+
+
+@lru_cache(maxsize=65536)
+def xpts_response(xg_for: float, xg_against: float, matches: int = None) -> Response:
+    """
+    Build the /xpts response for one set of inputs
+
+    Mirrors ExpectedPointsCalculator.calculate_season_xpts: a season is
+    half home and half away matches at the given per-match xG.
+
+    Args:
+        xg_for: Expected goals for per match
+        xg_against: Expected goals against per match
+        matches: Optional number of matches for a season total
+
+    Returns:
+        Encoded response
+    """
+    calculator = ExpectedPointsCalculator()
+    home = calculator.calculate_xpts(xg_for, xg_against, is_home=True)
+    away = calculator.calculate_xpts(xg_for, xg_against, is_home=False)
+
+    payload = {
+        'xg_for': xg_for,
+        'xg_against': xg_against,
+        'xpts_home': home,
+        'xpts_away': away,
+    }
+    if matches is not None:
+        payload['matches'] = matches
+        payload['xpts_season'] = round(home * matches / 2 + away * matches / 2, 2)
+
+    return Response(payload, XPTS_MAX_AGE)
+
+
+class ResultsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the results endpoints
+
+    GET /league               League table with xPTS and risk
+    GET /teams/<team>         One team's risk detail (name or slug)
+    GET /teams/<league>/[<season>/]<team>
+                              The same, for files covering several leagues or
+                              seasons (409 with the candidates when ambiguous)
+    GET /xpts?xg_for=&xg_against=[&matches=]
+                              xPTS for arbitrary per-match xG
+    """
+
+    # Keep-alive, so clients do not pay a TCP handshake per request
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; without TCP_NODELAY the body waits
+    # on the client's delayed ACK (~40 ms per response)
+    disable_nagle_algorithm = True
+    cache = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if url.path == '/league':
+            self.cache.refresh()
+            self._send(self.cache.league)
+        elif url.path.startswith('/teams/'):
+            self.cache.refresh()
+            path = '/'.join(slugify(part) for part in unquote(url.path[len('/teams/'):]).split('/'))
+            response = self.cache.teams.get(path)
+            if response is not None:
+                self._send(response)
+            elif path in self.cache.ambiguous:
+                self._send_error(409, 'Ambiguous team, use one of the listed paths',
+                                 matches=self.cache.ambiguous[path])
+            else:
+                self._send_error(404, 'Unknown team')
+        elif url.path == '/xpts':
+            self._send_xpts(parse_qs(url.query))
+        else:
+            self._send_error(404, 'Not found')
+
+    def _send_xpts(self, query: dict):
+        try:
+            # Rounding keeps the response cache small without changing the 2dp results
+            xg_for = round(float(query['xg_for'][0]), 2)
+            xg_against = round(float(query['xg_against'][0]), 2)
+            matches = int(query['matches'][0]) if 'matches' in query else None
+        except (KeyError, ValueError):
+            self._send_error(400, 'xg_for and xg_against are required numbers')
+            return
+
+        if not (np.isfinite(xg_for) and np.isfinite(xg_against)) or min(xg_for, xg_against) < 0 \
+                or max(xg_for, xg_against) > 10 or (matches is not None and not 0 < matches <= 100):
+            self._send_error(400, 'xG must be between 0 and 10, matches between 1 and 100')
+            return
+
+        self._send(xpts_response(xg_for, xg_against, matches))
+
+    def _send(self, response: Response):
+        if self.headers.get('If-None-Match') == response.etag:
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', response.cache_control)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response.body)))
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', response.cache_control)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def _send_error(self, status: int, message: str, **details):
+        body = json.dumps({'error': message, **details}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request logging at INFO would dominate latency under load
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8000, data_dir: str = "data",
+                  filename: str = "risk_analysis.csv") -> ThreadingHTTPServer:
+    """
+    Create the results server (call serve_forever() to start it)
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        data_dir: Directory containing pipeline outputs
+        filename: Analysis CSV to serve
+
+    Returns:
+        Configured ThreadingHTTPServer
+    """
+    handler = type('BoundResultsRequestHandler', (ResultsRequestHandler,), {
+        'cache': ResultsCache(data_dir, filename),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def benchmark_server(host: str, port: int, paths: list, requests: int = 5000,
+                     concurrency: int = 8, revalidate: bool = False) -> dict:
+    """
+    Load-test a running server with keep-alive client threads
+
+    Args:
+        host: Server host
+        port: Server port
+        paths: Request paths, cycled through by every client
+        requests: Total number of requests
+        concurrency: Number of concurrent client connections
+        revalidate: Send If-None-Match with the last seen ETag (exercises 304s)
+
+    Returns:
+        Dictionary with throughput and latency percentiles in milliseconds
+    """
+    per_client = requests // concurrency
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection(host, port)
+        etags = {}
+        local_latencies = []
+        local_statuses = {}
+        for i in range(per_client):
+            path = paths[i % len(paths)]
+            headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+            start = time.perf_counter()
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+            if response.getheader('ETag'):
+                etags[path] = response.getheader('ETag')
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latency_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'revalidate': revalidate,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latency_ms, 50)), 3),
+        'p90_ms': round(float(np.percentile(latency_ms, 90)), 3),
+        'p99_ms': round(float(np.percentile(latency_ms, 99)), 3),
+        'max_ms': round(float(latency_ms.max()), 3),
+        'statuses': statuses,
+    }
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, data_dir: str = "data",
+          filename: str = "risk_analysis.csv") -> None:
+    """
+    Run the results server until interrupted
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        data_dir: Directory containing pipeline outputs
+        filename: Analysis CSV to serve
+    """
+    server = create_server(host, port, data_dir, filename)
+    logger.info(f"Serving results on http://{host}:{server.server_address[1]} "
+                f"(/league, /teams/<team>, /xpts?xg_for=&xg_against=)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping results server")
+    finally:
+        server.server_close()
+
+
+def main():
+    """Main function for testing the results server"""
+    import argparse
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Serve xPTS and risk results over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind')
+    parser.add_argument('--file', default='risk_analysis.csv', help='Analysis CSV in data/ to serve')
+    parser.add_argument('--benchmark', action='store_true', help='Start a server on a free port and load-test it')
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per benchmark scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent benchmark clients')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        serve(args.host, args.port, filename=args.file)
+        return
+
+    server = create_server(args.host, 0, filename=args.file)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    teams = list(server.RequestHandlerClass.cache.teams)
+    scenarios = {
+        'league': ['/league'],
+        'teams': [f'/teams/{team}' for team in teams],
+        'xpts': [f'/xpts?xg_for={1 + i / 100:.2f}&xg_against=1.2&matches=38' for i in range(200)],
+        'league (304)': ['/league'],
+    }
+
+    print(f"\n=== Results Server Benchmark ({args.requests} requests, {args.concurrency} clients) ===")
+    for name, paths in scenarios.items():
+        results = benchmark_server(args.host, port, paths, requests=args.requests,
+                                   concurrency=args.concurrency, revalidate='304' in name)
+        print(f"{name:14} {results['requests_per_second']:9.1f} req/s  "
+              f"p50 {results['p50_ms']:.2f} ms  p99 {results['p99_ms']:.2f} ms  {results['statuses']}")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
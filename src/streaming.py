@@ -0,0 +1,265 @@
+"""
+Streaming Pipeline Module
+Overlaps scraping with computation by passing each league through bounded
+queues as soon as it is available
+"""
+
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from calculator import ExpectedPointsCalculator
+from analyzer import PerformanceAnalyzer
+from instrumentation import span
+from logging_setup import configure_logging
+from schema import read_csv, to_csv
+from validation import validate_stage
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+
+class StreamingPipeline:
+    """
+    Producer/consumer pipeline over leagues
+
+    The producer (the scraper, or any iterable of (league, raw table)) feeds
+    a chain of worker threads, one per step (xPTS, then risk analysis),
+    connected by bounded queues. Each league is computed while the next one
+    is still downloading; when compute falls behind, the full queue blocks
+    the producer, so at most ``queue_size`` leagues wait in memory per step.
+    Total runtime approaches the longer of I/O and compute rather than their
+    sum.
+    """
+
+    def __init__(self, data_dir: str = "data", queue_size: int = 2):
+        """
+        Initialize pipeline
+
+        Args:
+            data_dir: Directory for data files
+            queue_size: Leagues buffered between two steps before the upstream step blocks
+        """
+        self.data_dir = Path(data_dir)
+        self.queue_size = queue_size
+        self.calculator = ExpectedPointsCalculator(data_dir)
+        self.analyzer = PerformanceAnalyzer(data_dir)
+
+        self._stop = threading.Event()
+        self._errors = []
+        # Step name -> seconds spent working (excluding queue waits)
+        self.busy = {}
+        # Step name -> league -> that step's output
+        self.outputs = {}
+
+    def _put(self, out_queue: queue.Queue, item) -> bool:
+        """Put an item, giving up when another step failed"""
+        while not self._stop.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, in_queue: queue.Queue):
+        """Get an item, returning _DONE when another step failed"""
+        while not self._stop.is_set():
+            try:
+                return in_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, step: str, error: BaseException) -> None:
+        """Record a step's error and stop every other step"""
+        logger.error(f"[{step}] failed: {error}")
+        self._errors.append(error)
+        self._stop.set()
+
+    def _produce(self, source, out_queue: queue.Queue) -> None:
+        """Feed (league, raw table) items from the source into the first queue"""
+        iterator = iter(source)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    league, df_raw = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    self.busy['source'] = self.busy.get('source', 0.0) + time.perf_counter() - started
+
+                if 'League' not in df_raw.columns:
+                    df_raw = df_raw.copy()
+                    df_raw.insert(0, 'League', league)
+                logger.info(f"[source] {league} ready ({len(df_raw)} teams)")
+                self.outputs['source'][league] = df_raw
+                if not self._put(out_queue, (league, df_raw)):
+                    return
+        except Exception as e:
+            self._fail('source', e)
+        finally:
+            self._put(out_queue, _DONE)
+
+    def _consume(self, step: str, func, in_queue: queue.Queue, out_queue: queue.Queue) -> None:
+        """Apply one step to every league until the end-of-stream marker"""
+        try:
+            while True:
+                item = self._get(in_queue)
+                if item is _DONE:
+                    break
+                league, df = item
+
+                started = time.perf_counter()
+                with span(f"stream:{step}", 'stream', rows=len(df), league=league):
+                    result = func(df)
+                self.busy[step] = self.busy.get(step, 0.0) + time.perf_counter() - started
+                self.outputs[step][league] = result
+
+                if not self._put(out_queue, (league, result)):
+                    return
+        except Exception as e:
+            self._fail(step, e)
+        finally:
+            self._put(out_queue, _DONE)
+
+    def stream(self, source):
+        """
+        Run the steps over a source, yielding each league's analysis as it completes
+
+        Args:
+            source: Iterable of (league name, raw league table)
+
+        Yields:
+            Tuples of (league name, analysis DataFrame)
+        """
+        self._stop.clear()
+        self._errors = []
+        self.busy = {}
+
+        steps = [
+            ('calculate', self.calculator.calculate_season_xpts),
+            # The analyzer adds columns in place; keep the xPTS table intact
+            ('analyze', lambda df: self.analyzer.analyze_performance(df.copy())),
+        ]
+        self.outputs = {name: {} for name in ['source'] + [step for step, _ in steps]}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(steps) + 1)]
+
+        threads = [threading.Thread(target=self._produce, args=(source, queues[0]),
+                                    name='stream-source', daemon=True)]
+        for i, (step, func) in enumerate(steps):
+            threads.append(threading.Thread(target=self._consume, args=(step, func, queues[i], queues[i + 1]),
+                                            name=f'stream-{step}', daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Also reached when the caller stops iterating early
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+    def run(self, source) -> pd.DataFrame:
+        """
+        Stream every league through the pipeline and save the combined outputs
+
+        Writes raw_data.csv, xpts_data.csv and risk_analysis.csv (each with a
+        League column), the same files the batch pipeline writes.
+
+        Args:
+            source: Iterable of (league name, raw league table), e.g. PremierLeagueScraper.iter_leagues()
+
+        Returns:
+            DataFrame with the analysis of every league
+        """
+        started = time.perf_counter()
+        leagues = {}
+
+        for league, df_analysis in self.stream(source):
+            leagues[league] = df_analysis
+            logger.info(f"✓ {league}: analyzed {len(df_analysis)} teams "
+                        f"({time.perf_counter() - started:.2f}s since start)")
+
+        if not leagues:
+            raise ValueError("No league produced any data")
+
+        for step, filename in (('source', 'raw_data.csv'), ('calculate', 'xpts_data.csv')):
+            frames = [self.outputs[step][league] for league in leagues]
+            to_csv(pd.concat(frames, ignore_index=True), self.data_dir / filename)
+        df_analysis = pd.concat(leagues.values(), ignore_index=True)
+        self.analyzer.save_data(df_analysis)
+
+        wall = time.perf_counter() - started
+        io_seconds = self.busy.get('source', 0.0)
+        compute = sum(seconds for step, seconds in self.busy.items() if step != 'source')
+        logger.info(
+            f"Streamed {len(leagues)} leagues in {wall:.2f}s "
+            f"(source {io_seconds:.2f}s, compute {compute:.2f}s, "
+            f"{io_seconds + compute:.2f}s if run one after the other)"
+        )
+
+        return df_analysis
+
+
+def file_source(path: str):
+    """
+    Read leagues from a raw data CSV (one league per League value)
+
+    Args:
+        path: Raw data CSV in the scraper's schema, optionally with a League column
+
+    Yields:
+        Tuples of (league name, raw league table)
+
+    Raises:
+        ValueError: If the file fails raw data validation
+    """
+    df = read_csv(path)
+    validate_stage(df, 'raw')
+    if 'League' not in df.columns:
+        yield Path(path).stem, df
+        return
+    for league, group in df.groupby('League', sort=False):
+        yield league, group.reset_index(drop=True)
+
+
+def main():
+    """Main function for testing the streaming pipeline"""
+    import argparse
+
+    from scraper import PremierLeagueScraper, LEAGUES
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Scrape and analyze several leagues as a stream')
+    parser.add_argument('--leagues', nargs='+', choices=list(LEAGUES), help='Leagues to scrape (default: all)')
+    parser.add_argument('--input', help='Stream leagues from this raw data CSV instead of scraping')
+    parser.add_argument('--queue-size', type=int, default=2, help='Leagues buffered between steps')
+    args = parser.parse_args()
+
+    pipeline = StreamingPipeline(queue_size=args.queue_size)
+    source = file_source(args.input) if args.input else PremierLeagueScraper().iter_leagues(args.leagues)
+    df = pipeline.run(source)
+
+    print("\n=== Streamed Leagues ===")
+    print(df.groupby('League', sort=False)['Team'].count().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Synthetic Data Module
+Vectorised generator of leagues, fixture lists, shot-level xG and match
+results for scale testing
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# Mean xG of a single shot; shot xG is Beta(SHOT_XG_ALPHA, SHOT_XG_BETA)
+SHOT_XG_ALPHA = 1.1
+SHOT_XG_BETA = 9.9
+MEAN_SHOT_XG = SHOT_XG_ALPHA / (SHOT_XG_ALPHA + SHOT_XG_BETA)
+
+
+def round_robin(n_teams: int) -> tuple:
+    """
+    Build a double round-robin schedule with the circle method
+
+    Args:
+        n_teams: Teams in the league
+
+    Returns:
+        Tuple of (home, away, matchday) integer arrays with n_teams * (n_teams - 1) matches
+    """
+    # An odd league gets a dummy team; matches against it are byes
+    m = n_teams + n_teams % 2
+    rounds = np.arange(m - 1)
+
+    # Team 0 stays fixed while the others rotate one place per round
+    rotating = (np.arange(m - 1)[None, :] + rounds[:, None]) % (m - 1) + 1
+    circle = np.hstack([np.zeros((m - 1, 1), dtype=int), rotating])
+    home = circle[:, :m // 2]
+    away = circle[:, ::-1][:, :m // 2]
+
+    # Alternate the fixed team's venue so nobody plays every first-half match at home
+    flip = (rounds % 2 == 1)[:, None] & (np.arange(m // 2) == 0)[None, :]
+    home, away = np.where(flip, away, home), np.where(flip, home, away)
+    matchday = np.repeat(rounds + 1, m // 2).reshape(m - 1, m // 2)
+
+    # Second half of the season is the first half with venues swapped
+    home_all = np.concatenate([home.ravel(), away.ravel()])
+    away_all = np.concatenate([away.ravel(), home.ravel()])
+    matchday_all = np.concatenate([matchday.ravel(), matchday.ravel() + (m - 1)])
+
+    playable = (home_all < n_teams) & (away_all < n_teams)
+    return home_all[playable], away_all[playable], matchday_all[playable]
+
+
+class SyntheticLeagueGenerator:
+    """
+    Generator of synthetic leagues, fixtures, shots and league tables
+
+    Every league has n_teams teams with log-scale attack and defence
+    strengths drawn from normal distributions; strengths drift between
+    seasons. Each league-season is a double round robin. The expected goals
+    of a side are base_goals * exp(attack - opposing defence), plus home
+    advantage for the home side. Goals are either Poisson draws from that
+    rate, or the sum of Bernoulli outcomes over individually simulated shots
+    whose xG adds up to the match xG. All steps work on whole arrays, so
+    millions of matches take seconds.
+    """
+
+    def __init__(self, n_teams: int = 20, n_leagues: int = 1, n_seasons: int = 1,
+                 seed: int = None, base_goals: float = 1.35, home_advantage: float = 0.2,
+                 attack_sd: float = 0.25, defence_sd: float = 0.25,
+                 season_drift_sd: float = 0.1, first_season: int = 2025, first_league: int = 1):
+        """
+        Initialize generator
+
+        Args:
+            n_teams: Teams per league
+            n_leagues: Number of independent leagues
+            n_seasons: Consecutive seasons per league
+            seed: Random seed (the same seed and parameters give the same data)
+            base_goals: Expected goals of an average side away from home
+            home_advantage: Log-scale boost to the home side's scoring rate
+            attack_sd: Spread of team attack strength (log scale)
+            defence_sd: Spread of team defence strength (log scale)
+            season_drift_sd: Season-to-season change in strengths (log scale)
+            first_season: Start year of the first season
+            first_league: Number of the first league (later ones count up from it)
+        """
+        if n_teams < 2:
+            raise ValueError("A league needs at least 2 teams")
+
+        self.n_teams = n_teams
+        self.n_leagues = n_leagues
+        self.n_seasons = n_seasons
+        self.base_goals = base_goals
+        self.home_advantage = home_advantage
+        self.first_season = first_season
+        self.rng = np.random.default_rng(seed)
+
+        # Strengths per (season, team); teams are numbered league by league
+        total_teams = n_leagues * n_teams
+        drift = self.rng.normal(0, season_drift_sd, (2, n_seasons, total_teams))
+        drift[:, 0] = 0
+        self.attack = self.rng.normal(0, attack_sd, total_teams) + np.cumsum(drift[0], axis=0)
+        self.defence = self.rng.normal(0, defence_sd, total_teams) + np.cumsum(drift[1], axis=0)
+
+        league_numbers = range(first_league, first_league + n_leagues)
+        self.league_names = np.array([f"League {number:03d}" for number in league_numbers])
+        self.season_names = np.array([f"{y}-{y + 1}" for y in range(first_season, first_season + n_seasons)])
+        self.team_names = np.array([
+            f"L{number:03d} Team {team + 1:02d}" if n_leagues > 1 or first_league > 1 else f"Team {team + 1:02d}"
+            for number in league_numbers for team in range(n_teams)
+        ])
+
+        self._fixtures = None
+        self._shots = None
+
+    def _fixture_arrays(self) -> dict:
+        """Fixture list of every league-season as integer arrays"""
+        if self._fixtures is None:
+            home, away, matchday = round_robin(self.n_teams)
+            per_season = len(home)
+            n_groups = self.n_leagues * self.n_seasons
+
+            # Tile the one-league template over (season, league) with team offsets
+            group = np.repeat(np.arange(n_groups), per_season)
+            season = group // self.n_leagues
+            league = group % self.n_leagues
+            offset = league * self.n_teams
+
+            self._fixtures = {
+                'league': league,
+                'season': season,
+                'matchday': np.tile(matchday, n_groups),
+                'home': np.tile(home, n_groups) + offset,
+                'away': np.tile(away, n_groups) + offset,
+            }
+        return self._fixtures
+
+    def teams(self) -> pd.DataFrame:
+        """
+        Get every team-season's true strengths
+
+        Returns:
+            DataFrame with League, Season, Team, Attack and Defence
+        """
+        team_idx = np.tile(np.arange(self.n_leagues * self.n_teams), self.n_seasons)
+        season_idx = np.repeat(np.arange(self.n_seasons), self.n_leagues * self.n_teams)
+
+        return pd.DataFrame({
+            'League': self.league_names[team_idx // self.n_teams],
+            'Season': self.season_names[season_idx],
+            'Team': self.team_names[team_idx],
+            'Attack': self.attack[season_idx, team_idx].round(3),
+            'Defence': self.defence[season_idx, team_idx].round(3),
+        })
+
+    def fixtures(self) -> pd.DataFrame:
+        """
+        Get the fixture list
+
+        Returns:
+            DataFrame with League, Season, Matchday, Home and Away
+        """
+        fx = self._fixture_arrays()
+        return pd.DataFrame({
+            'League': self.league_names[fx['league']],
+            'Season': self.season_names[fx['season']],
+            'Matchday': fx['matchday'],
+            'Home': self.team_names[fx['home']],
+            'Away': self.team_names[fx['away']],
+        })
+
+    def _scoring_rates(self) -> tuple:
+        """Expected goals of the home and away side in every fixture"""
+        fx = self._fixture_arrays()
+        season, home, away = fx['season'], fx['home'], fx['away']
+        home_rate = self.base_goals * np.exp(
+            self.attack[season, home] - self.defence[season, away] + self.home_advantage
+        )
+        away_rate = self.base_goals * np.exp(self.attack[season, away] - self.defence[season, home])
+        return home_rate, away_rate
+
+    def _simulate_shots(self) -> tuple:
+        """
+        Simulate individual shots for each side of every fixture
+
+        The shots are simulated once and cached, so matches(shots=True) and
+        shots() describe the same shots. Sides are numbered home sides first,
+        then away sides, in fixture order.
+
+        Returns:
+            Tuple of (side index per shot, shot xG in thousandths, goal flag per shot)
+        """
+        if self._shots is None:
+            rates = np.concatenate(self._scoring_rates())
+
+            # Scale shot volume so expected total xG equals the scoring rate
+            counts = self.rng.poisson(rates / MEAN_SHOT_XG)
+            side = np.repeat(np.arange(len(rates), dtype=np.int64), counts)
+            # Shot xG is stored to 3 decimals as integer thousandths, so sums are exact
+            xg_milli = np.rint(self.rng.beta(SHOT_XG_ALPHA, SHOT_XG_BETA, size=len(side)) * 1000).astype(np.int16)
+            goal = self.rng.random(len(side), dtype=np.float32) * 1000 < xg_milli
+            self._shots = (side, xg_milli, goal)
+        return self._shots
+
+    def matches(self, shots: bool = False) -> pd.DataFrame:
+        """
+        Simulate every fixture
+
+        Args:
+            shots: Derive xG and goals from simulated shots; otherwise xG is
+                the true scoring rate and goals are Poisson draws
+
+        Returns:
+            DataFrame with fixture columns plus Home_xG, Away_xG, Home_Goals and Away_Goals
+        """
+        home_rate, away_rate = self._scoring_rates()
+        n_matches = len(home_rate)
+
+        if shots:
+            side, xg_milli, goal = self._simulate_shots()
+            side_xg = np.bincount(side, weights=xg_milli, minlength=2 * n_matches) / 1000
+            side_goals = np.bincount(side, weights=goal, minlength=2 * n_matches).astype(int)
+            home_xg, away_xg = side_xg[:n_matches], side_xg[n_matches:]
+            home_goals, away_goals = side_goals[:n_matches], side_goals[n_matches:]
+        else:
+            home_xg, away_xg = home_rate, away_rate
+            home_goals = self.rng.poisson(home_rate)
+            away_goals = self.rng.poisson(away_rate)
+
+        df = self.fixtures()
+        df['Home_xG'] = home_xg.round(2)
+        df['Away_xG'] = away_xg.round(2)
+        df['Home_Goals'] = home_goals
+        df['Away_Goals'] = away_goals
+
+        logger.info(f"Simulated {n_matches:,} matches ({self.n_leagues} leagues x {self.n_seasons} seasons)")
+
+        return df
+
+    def shots(self) -> pd.DataFrame:
+        """
+        Simulate shot-level data for every fixture
+
+        These are the shots behind matches(shots=True): summing them per
+        match gives its xG and goals.
+
+        Returns:
+            DataFrame with Match_ID (row of fixtures()), Team, Side, xG and Goal
+        """
+        fx = self._fixture_arrays()
+        n_matches = len(fx['home'])
+        side, xg_milli, goal = self._simulate_shots()
+
+        match_id = side % n_matches
+        is_home = side < n_matches
+        team = np.where(is_home, fx['home'][match_id], fx['away'][match_id])
+
+        logger.info(f"Simulated {len(side):,} shots over {n_matches:,} matches")
+
+        return pd.DataFrame({
+            'Match_ID': match_id,
+            'Team': pd.Categorical.from_codes(team, self.team_names),
+            'Side': np.where(is_home, 'Home', 'Away'),
+            'xG': xg_milli / 1000,
+            'Goal': goal,
+        })
+
+    def league_table(self, matches: pd.DataFrame = None, shots: bool = False,
+                     include_groups: bool = True) -> pd.DataFrame:
+        """
+        Aggregate match results into league tables in the scraper's schema
+
+        Args:
+            matches: Output of matches() (simulated if not given)
+            shots: Simulate shots when matches are not given
+            include_groups: Keep League and Season columns (drop them for a
+                single league-season to get exactly raw_data.csv's columns)
+
+        Returns:
+            DataFrame with [League, Season,] Team, Matches, Goals_For,
+            Goals_Against, Actual_Points, xG_For, xG_Against, Position,
+            sorted by league, season and position
+        """
+        if matches is None:
+            matches = self.matches(shots=shots)
+
+        fx = self._fixture_arrays()
+        n_slots = self.n_seasons * self.n_leagues * self.n_teams
+        home_slot = fx['season'] * self.n_leagues * self.n_teams + fx['home']
+        away_slot = fx['season'] * self.n_leagues * self.n_teams + fx['away']
+
+        home_goals = matches['Home_Goals'].to_numpy()
+        away_goals = matches['Away_Goals'].to_numpy()
+        home_points = np.select([home_goals > away_goals, home_goals == away_goals], [3, 1], 0)
+        away_points = np.select([away_goals > home_goals, home_goals == away_goals], [3, 1], 0)
+
+        def total(home_values, away_values):
+            return (np.bincount(home_slot, weights=home_values, minlength=n_slots) +
+                    np.bincount(away_slot, weights=away_values, minlength=n_slots))
+
+        ones = np.ones(len(home_slot))
+        played = total(ones, ones).astype(int)
+        goals_for = total(home_goals, away_goals).astype(int)
+        goals_against = total(away_goals, home_goals).astype(int)
+        points = total(home_points, away_points).astype(int)
+        xg_for = total(matches['Home_xG'].to_numpy(), matches['Away_xG'].to_numpy())
+        xg_against = total(matches['Away_xG'].to_numpy(), matches['Home_xG'].to_numpy())
+
+        slot = np.arange(n_slots)
+        team = slot % (self.n_leagues * self.n_teams)
+        season = slot // (self.n_leagues * self.n_teams)
+        group = season * self.n_leagues + team // self.n_teams
+
+        # Rank within each league-season: points, then goal difference, then goals scored
+        order = np.lexsort((-goals_for, -(goals_for - goals_against), -points, group))
+        position = np.empty(n_slots, dtype=int)
+        position[order] = slot % self.n_teams + 1
+
+        df = pd.DataFrame({
+            'League': self.league_names[team // self.n_teams],
+            'Season': self.season_names[season],
+            'Team': self.team_names[team],
+            'Matches': played,
+            'Goals_For': goals_for,
+            'Goals_Against': goals_against,
+            'Actual_Points': points,
+            'xG_For': xg_for.round(1),
+            'xG_Against': xg_against.round(1),
+            'Position': position,
+            '_group': group,
+        })
+        df = df.sort_values(['_group', 'Position']).drop(columns='_group').reset_index(drop=True)
+
+        if not include_groups:
+            df = df.drop(columns=['League', 'Season'])
+
+        return df
+
+
+def generate_league_table(n_team_seasons: int = 20, teams_per_league: int = 20,
+                          seed: int = None, shots: bool = False) -> pd.DataFrame:
+    """
+    Generate a raw table with a given number of team-seasons
+
+    Large requests are split over several leagues. When n_team_seasons is
+    not a multiple of teams_per_league, the remainder plays as one smaller
+    league with its own (shorter) round robin.
+
+    Args:
+        n_team_seasons: Number of team rows wanted
+        teams_per_league: League size; larger requests are split over leagues
+        seed: Random seed
+        shots: Derive xG and goals from simulated shots
+
+    Returns:
+        DataFrame in the scraper's schema, with League and Season columns
+        when more than one league is needed
+
+    Raises:
+        ValueError: If the remainder would be a one-team league
+    """
+    n_teams = min(n_team_seasons, teams_per_league)
+    n_full, remainder = divmod(n_team_seasons, n_teams)
+    if remainder == 1:
+        raise ValueError(f"{n_team_seasons} team-seasons would leave a one-team league "
+                         f"(leagues of {teams_per_league})")
+
+    include_groups = n_full > 1 or remainder > 0
+    generator = SyntheticLeagueGenerator(n_teams=n_teams, n_leagues=n_full, seed=seed)
+    table = generator.league_table(shots=shots, include_groups=include_groups)
+    if not remainder:
+        return table
+
+    rest = SyntheticLeagueGenerator(n_teams=remainder, first_league=n_full + 1,
+                                    seed=None if seed is None else seed + n_full)
+    return pd.concat([table, rest.league_table(shots=shots)], ignore_index=True)
+
+
+def main():
+    """Main function for testing the synthetic data generator"""
+    import argparse
+    import time
+    from pathlib import Path
+
+    from profiling import add_profile_arguments, profile_from_args
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Generate synthetic league data')
+    parser.add_argument('--teams', type=int, default=20, help='Teams per league')
+    parser.add_argument('--leagues', type=int, default=1, help='Number of leagues')
+    parser.add_argument('--seasons', type=int, default=1, help='Seasons per league')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--shots', action='store_true', help='Simulate shot-level xG')
+    parser.add_argument('--output', help='Write the league table CSV here (e.g. data/raw_data.csv)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args, 'synthetic'):
+        start = time.perf_counter()
+        generator = SyntheticLeagueGenerator(n_teams=args.teams, n_leagues=args.leagues,
+                                             n_seasons=args.seasons, seed=args.seed)
+        matches = generator.matches(shots=args.shots)
+        table = generator.league_table(matches, include_groups=args.leagues * args.seasons > 1)
+        elapsed = time.perf_counter() - start
+
+        print(f"\n=== Synthetic Data ({elapsed:.2f}s) ===")
+        print(f"Matches: {len(matches):,}")
+        print(f"Team-seasons: {len(table):,}")
+        print(table.head(10))
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(args.output, index=False)
+        print(f"\nSaved league table to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
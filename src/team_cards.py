@@ -0,0 +1,309 @@
+"""
+Team Card Renderer Module
+Batch-renders per-team chart cards by reusing one figure and its artists
+"""
+
+import io
+import time
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+
+from visualizer import RISK_COLORS
+from logging_setup import configure_logging
+from schema import read_csv, team_path
+
+logger = logging.getLogger(__name__)
+
+# Risk gauge bands: (lower bound, upper bound, category), matching PerformanceAnalyzer.get_risk_category
+RISK_BANDS = [
+    (0, 40, 'Low'),
+    (40, 70, 'Moderate'),
+    (70, 90, 'High'),
+    (90, 100, 'Critical'),
+]
+
+
+class TeamCardRenderer:
+    """
+    Renderer for per-team chart cards
+
+    Each card has a variance trend, the team's xPTS-vs-actual marker against
+    the rest of its league, and a 0-100 risk gauge. The figure, axes and every
+    artist are created once; rendering a team only swaps artist data and
+    saves, which avoids rebuilding the layout hundreds of times per batch.
+    """
+
+    def __init__(self, output_dir: str = "output/charts/teams", dpi: int = 100,
+                 image_format: str = "png", in_memory: bool = False, save_to_disk: bool = True):
+        """
+        Initialize team card renderer
+
+        Args:
+            output_dir: Directory to save team cards
+            dpi: Raster resolution (ignored by vector formats)
+            image_format: Output format ('png', or 'svg'/'pdf' for vector output)
+            in_memory: Return cards as in-memory buffers instead of file paths
+            save_to_disk: Also write in-memory cards to output_dir (ignored unless in_memory)
+        """
+        self.output_dir = Path(output_dir)
+        self.in_memory = in_memory
+        self.save_to_disk = save_to_disk or not in_memory
+        if self.save_to_disk:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.dpi = dpi
+        self.image_format = image_format
+        self._build_layout()
+
+    def _build_layout(self) -> None:
+        """Create the figure, axes and all reusable artists"""
+        self.fig, (self.ax_trend, self.ax_scatter, self.ax_gauge) = plt.subplots(
+            1, 3, figsize=(12, 3.5), gridspec_kw={'width_ratios': [1.3, 1, 1]}
+        )
+        self.fig.subplots_adjust(left=0.06, right=0.98, bottom=0.18, top=0.8, wspace=0.3)
+        self.title = self.fig.suptitle('', fontsize=14, fontweight='bold')
+
+        # Variance trend
+        self.ax_trend.axhline(0, color='black', linewidth=1, alpha=0.3)
+        self.ax_trend.axhline(3, color='orange', linestyle='--', linewidth=1, alpha=0.5)
+        self.ax_trend.axhline(-3, color='orange', linestyle='--', linewidth=1, alpha=0.5)
+        self.trend_line, = self.ax_trend.plot([], [], marker='o', markersize=3, color='#1f2937')
+        self.ax_trend.set_title('Variance Trend', fontsize=10, fontweight='bold')
+        self.ax_trend.set_xlabel('Snapshot', fontsize=8)
+        self.ax_trend.set_ylabel('Actual - xPTS', fontsize=8)
+        self.ax_trend.tick_params(labelsize=7)
+
+        # xPTS vs actual, league in grey with the team highlighted
+        self.league_points = self.ax_scatter.scatter([], [], s=20, c='#9ca3af', alpha=0.5)
+        self.diagonal, = self.ax_scatter.plot([], [], 'k--', alpha=0.3)
+        self.team_point = self.ax_scatter.scatter([], [], s=90, edgecolors='black', linewidth=0.8, zorder=3)
+        self.ax_scatter.set_title('xPTS vs Actual', fontsize=10, fontweight='bold')
+        self.ax_scatter.set_xlabel('xPTS', fontsize=8)
+        self.ax_scatter.set_ylabel('Actual Points', fontsize=8)
+        self.ax_scatter.tick_params(labelsize=7)
+
+        # Risk gauge
+        for lower, upper, category in RISK_BANDS:
+            self.ax_gauge.barh(0, upper - lower, left=lower, height=0.6,
+                               color=RISK_COLORS[category], alpha=0.35)
+        self.gauge_marker = self.ax_gauge.axvline(0, color='black', linewidth=3)
+        self.gauge_text = self.ax_gauge.text(50, 0.55, '', ha='center', fontsize=12, fontweight='bold')
+        self.ax_gauge.set_xlim(0, 100)
+        self.ax_gauge.set_ylim(-0.5, 0.9)
+        self.ax_gauge.set_yticks([])
+        self.ax_gauge.set_title('Risk Score', fontsize=10, fontweight='bold')
+        self.ax_gauge.tick_params(labelsize=7)
+
+    def _set_league(self, df: pd.DataFrame) -> None:
+        """
+        Update the league-wide background of the scatter panel
+
+        Args:
+            df: DataFrame with analysis data for one league
+        """
+        self.league_points.set_offsets(df[['xPTS', 'Actual_Points']].to_numpy(dtype=float))
+
+        low = min(df['xPTS'].min(), df['Actual_Points'].min()) - 2
+        high = max(df['xPTS'].max(), df['Actual_Points'].max()) + 2
+        self.diagonal.set_data([low, high], [low, high])
+        self.ax_scatter.set_xlim(low, high)
+        self.ax_scatter.set_ylim(low, high)
+
+    def update(self, row: pd.Series, variance_history: list = None) -> None:
+        """
+        Point every artist at one team's data
+
+        Args:
+            row: Analysis row for the team
+            variance_history: Variance values from earlier snapshots (oldest first)
+        """
+        color = RISK_COLORS.get(row['Risk_Category'], '#6b7280')
+        self.title.set_text(f"{row['Team']}  |  {row['Risk_Category']} risk")
+
+        history = list(variance_history) if variance_history else [row['Variance']]
+        self.trend_line.set_data(np.arange(1, len(history) + 1), history)
+        self.trend_line.set_color(color)
+        self.ax_trend.set_xlim(0.5, max(len(history), 2) + 0.5)
+        limit = max(5.0, float(np.max(np.abs(history)))) * 1.2
+        self.ax_trend.set_ylim(-limit, limit)
+
+        self.team_point.set_offsets([[row['xPTS'], row['Actual_Points']]])
+        self.team_point.set_facecolors([color])
+
+        self.gauge_marker.set_xdata([row['Risk_Score'], row['Risk_Score']])
+        self.gauge_text.set_text(f"{int(row['Risk_Score'])}")
+        self.gauge_text.set_x(row['Risk_Score'])
+
+    def save(self, key: str):
+        """
+        Save the current card
+
+        Args:
+            key: Slug path of the team (see schema.team_path) used for the filename
+
+        Returns:
+            Path to saved card, or a BytesIO with the image data when in_memory is set
+        """
+        output_path = self.output_dir / f"{key}.{self.image_format}"
+        if self.save_to_disk:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if not self.in_memory:
+            self.fig.savefig(output_path, dpi=self.dpi, format=self.image_format)
+            return str(output_path)
+
+        buffer = io.BytesIO()
+        self.fig.savefig(buffer, dpi=self.dpi, format=self.image_format)
+        buffer.seek(0)
+        if self.save_to_disk:
+            output_path.write_bytes(buffer.getvalue())
+        return buffer
+
+    def render_all(self, df: pd.DataFrame, history_store=None) -> dict:
+        """
+        Render a card for every team
+
+        Args:
+            df: DataFrame with analysis data (optionally with League and Season columns)
+            history_store: Optional SnapshotStore used for variance trends
+
+        Returns:
+            Dictionary mapping team slug path (see schema.team_path) to card path
+            (or in-memory buffer)
+        """
+        logger.info(f"Rendering team cards for {len(df)} teams...")
+
+        cards = {}
+        group_cols = [col for col in ('League', 'Season') if col in df.columns]
+        leagues = df.groupby(group_cols, sort=False) if group_cols else [(None, df)]
+
+        for _, league_df in leagues:
+            self._set_league(league_df)
+            for _, row in league_df.iterrows():
+                history = None
+                if history_store is not None:
+                    history = history_store.team_history(
+                        row['Team'], league=row.get('League'), season=row.get('Season')
+                    )['Variance'].tolist()
+                self.update(row, history)
+                key = team_path(row)
+                cards[key] = self.save(key)
+
+        if self.save_to_disk:
+            logger.info(f"Saved {len(cards)} team cards to {self.output_dir}")
+        else:
+            logger.info(f"Rendered {len(cards)} team cards in memory")
+
+        return cards
+
+    def close(self) -> None:
+        """Release the shared figure"""
+        plt.close(self.fig)
+
+
+def render_team_card_naive(row: pd.Series, league_df: pd.DataFrame, output_dir: str,
+                           dpi: int = 100, image_format: str = "png") -> str:
+    """
+    Render one team card with a fresh figure (baseline for benchmarking)
+
+    Args:
+        row: Analysis row for the team
+        league_df: DataFrame with analysis data for the team's league
+        output_dir: Directory to save the card
+        dpi: Raster resolution
+        image_format: Output format
+
+    Returns:
+        Path to saved card
+    """
+    renderer = TeamCardRenderer(output_dir=output_dir, dpi=dpi, image_format=image_format)
+    renderer._set_league(league_df)
+    renderer.update(row)
+    path = renderer.save(team_path(row))
+    renderer.close()
+    return path
+
+
+def benchmark_team_cards(df: pd.DataFrame, output_dir: str = "output/charts/teams_benchmark",
+                         dpi: int = 100, image_format: str = "png") -> dict:
+    """
+    Compare per-team figure creation against artist reuse
+
+    Args:
+        df: DataFrame with analysis data
+        output_dir: Scratch directory for the rendered cards
+        dpi: Raster resolution
+        image_format: Output format
+
+    Returns:
+        Dictionary with naive/reuse timings in seconds and the speedup
+    """
+    start = time.perf_counter()
+    for _, row in df.iterrows():
+        render_team_card_naive(row, df, output_dir, dpi=dpi, image_format=image_format)
+    naive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    renderer = TeamCardRenderer(output_dir=output_dir, dpi=dpi, image_format=image_format)
+    renderer.render_all(df)
+    renderer.close()
+    reuse_seconds = time.perf_counter() - start
+
+    results = {
+        'teams': len(df),
+        'format': image_format,
+        'dpi': dpi,
+        'naive_seconds': round(naive_seconds, 3),
+        'reuse_seconds': round(reuse_seconds, 3),
+        'speedup': round(naive_seconds / reuse_seconds, 2) if reuse_seconds > 0 else None,
+    }
+    logger.info(
+        f"Team cards: naive {naive_seconds:.2f}s vs reuse {reuse_seconds:.2f}s "
+        f"({results['speedup']}x) for {len(df)} teams"
+    )
+
+    return results
+
+
+def main():
+    """Main function for testing the team card renderer"""
+    import argparse
+    from profiling import add_profile_arguments, profile_from_args
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Render per-team chart cards')
+    parser.add_argument('--format', default='png', choices=['png', 'svg', 'pdf'], help='Output format')
+    parser.add_argument('--dpi', type=int, default=100, help='Raster resolution for PNG output')
+    parser.add_argument('--benchmark', action='store_true', help='Compare against one figure per team')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    matplotlib.use('Agg')
+
+    with profile_from_args(args, 'team_cards'):
+        try:
+            df = read_csv(Path("data") / "risk_analysis.csv")
+
+            if args.benchmark:
+                results = benchmark_team_cards(df, dpi=args.dpi, image_format=args.format)
+                print("\n=== Team Card Benchmark ===")
+                for key, value in results.items():
+                    print(f"{key}: {value}")
+            else:
+                renderer = TeamCardRenderer(dpi=args.dpi, image_format=args.format)
+                cards = renderer.render_all(df)
+                renderer.close()
+                print(f"\nRendered {len(cards)} team cards to {renderer.output_dir}")
+
+        except FileNotFoundError as e:
+            logger.error(f"Error: {e}")
+            logger.info("Please run the analyzer first.")
+
+
+if __name__ == "__main__":
+    main()
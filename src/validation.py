@@ -0,0 +1,547 @@
+"""
+Data Validation Module
+Declarative, vectorised checks for the raw, xPTS and risk tables that report
+every violation at once
+"""
+
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Columns identifying a league-season; tables without them are one league-season
+GROUP_COLUMNS = ('League', 'Season')
+
+INTEGER_COLUMNS = ('Matches', 'Goals_For', 'Goals_Against', 'Actual_Points', 'Position',
+                   'Wins', 'Draws', 'Losses', 'Position_Actual', 'Position_Expected', 'Risk_Score')
+NUMERIC_COLUMNS = ('xG_For', 'xG_Against', 'xPTS', 'Variance', 'Z_Score', 'P_Value',
+                   'Regression_Probability')
+
+RISK_CATEGORY_LABELS = ('Low', 'Moderate', 'High', 'Critical')
+PERFORMANCE_STATUS_LABELS = ('Underperforming', 'As Expected', 'Overperforming')
+
+# Average xG per match above which a team's numbers are treated as suspect;
+# even the best attacks rarely average over 3
+MAX_XG_PER_MATCH = 4.0
+# Relative gap between a league-season's total xG for and against that
+# suggests missing or duplicated teams (both totals count the same shots)
+MAX_XG_IMBALANCE = 0.02
+# Rounding slack when re-deriving a column from other rounded columns
+TOLERANCE = 0.011
+
+
+class Rule:
+    """
+    One declarative check over a table
+
+    The check is a vectorised function of the table and a shared context
+    (league-season sizes and the like) that returns a boolean array flagging
+    the offending rows. Rules whose columns are missing or not numeric are
+    skipped; the column and dtype checks already report those.
+    """
+
+    def __init__(self, name: str, columns: tuple, check, message: str,
+                 severity: str = ERROR, table: bool = False):
+        """
+        Initialize rule
+
+        Args:
+            name: Short identifier used in reports
+            columns: Columns the check reads
+            check: Function (df, context) -> boolean array, True for violations
+            message: Human-readable description of a violation
+            severity: ERROR (the data cannot be used) or WARNING (suspect data)
+            table: Whether the check needs complete league-season tables
+                (skipped when validating an arbitrary chunk)
+        """
+        self.name = name
+        self.columns = tuple(columns)
+        self.check = check
+        self.message = message
+        self.severity = severity
+        self.table = table
+
+
+def _values(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Column as float64 (NaN for missing), safe from small-integer overflow"""
+    return df[col].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _per_match(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Column divided by matches played, NaN where no match was played"""
+    matches = _values(df, 'Matches')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(matches > 0, _values(df, col) / matches, np.nan)
+
+
+def _group_totals(df: pd.DataFrame, context: dict, col: str) -> np.ndarray:
+    """Sum of a column over each row's league-season, broadcast to the rows"""
+    codes = context['group_codes']
+    totals = np.bincount(codes, weights=np.nan_to_num(_values(df, col)), minlength=context['n_groups'])
+    return totals[codes]
+
+
+def _duplicate_teams(df: pd.DataFrame, context: dict) -> np.ndarray:
+    """Flag every row of a team listed more than once in its league-season"""
+    team_codes, teams = pd.factorize(df['Team'])
+    keys = context['group_codes'] * max(len(teams), 1) + team_codes
+    return pd.Series(keys).duplicated(keep=False).to_numpy()
+
+
+def _xg_imbalance(df: pd.DataFrame, context: dict) -> np.ndarray:
+    """Flag the rows of league-seasons whose total xG for and against disagree"""
+    xg_for = _group_totals(df, context, 'xG_For')
+    return np.abs(xg_for - _group_totals(df, context, 'xG_Against')) > MAX_XG_IMBALANCE * xg_for
+
+
+def _outside(values: np.ndarray, low=None, high=None) -> np.ndarray:
+    """Flag values outside [low, high]; missing values are left to the null check"""
+    mask = np.zeros(len(values), dtype=bool)
+    if low is not None:
+        mask |= values < low
+    if high is not None:
+        mask |= values > high
+    return mask
+
+
+def _position_rules(columns: tuple) -> list:
+    """
+    Position checks for the given columns
+
+    With a configured season length a position beyond the league's size is
+    an error; otherwise the size is taken from the rows present, and a
+    position beyond it is only a warning (a row may be missing).
+    """
+    def invalid(df, ctx):
+        mask = np.zeros(len(df), dtype=bool)
+        for col in columns:
+            values = _values(df, col)
+            mask |= _outside(values, 1, None if ctx['games_inferred'] else ctx['league_size'])
+        return mask
+
+    def beyond_rows(df, ctx):
+        mask = np.zeros(len(df), dtype=bool)
+        if ctx['games_inferred']:
+            for col in columns:
+                mask |= _outside(_values(df, col), None, ctx['group_size'])
+        return mask
+
+    return [
+        Rule('position_range', columns, invalid, "position outside 1..teams in the league", table=True),
+        Rule('position_beyond_teams', columns, beyond_rows,
+             "position beyond the number of teams present (missing teams?)", WARNING, table=True),
+    ]
+
+
+def _not_in(df: pd.DataFrame, col: str, labels: tuple) -> np.ndarray:
+    """Flag present values that are not one of the allowed labels"""
+    return (df[col].notna() & ~df[col].astype(object).isin(labels)).to_numpy()
+
+
+def _risk_category_mismatch(df: pd.DataFrame, context: dict) -> np.ndarray:
+    """Flag risk categories that disagree with the risk score's band"""
+    score = _values(df, 'Risk_Score')
+    expected = np.select([score >= 90, score >= 70, score >= 40], ['Critical', 'High', 'Moderate'], 'Low')
+    return (df['Risk_Category'].notna().to_numpy()
+            & ~np.isnan(score)
+            & (df['Risk_Category'].astype(object).to_numpy() != expected))
+
+
+def _performance_status_mismatch(df: pd.DataFrame, context: dict) -> np.ndarray:
+    """Flag performance labels that disagree with the variance"""
+    variance = _values(df, 'Variance')
+    expected = np.select([variance > 3, variance < -3], ['Overperforming', 'Underperforming'], 'As Expected')
+    return (df['Performance_Status'].notna().to_numpy()
+            & ~np.isnan(variance)
+            & (df['Performance_Status'].astype(object).to_numpy() != expected))
+
+
+# Checks on any table in the scraper's schema (raw, xPTS and risk alike)
+TEAM_RULES = [
+    *[Rule('negative_values', (col,),
+           lambda df, ctx, col=col: _values(df, col) < 0,
+           f"{col} cannot be negative")
+      for col in ('Matches', 'Goals_For', 'Goals_Against', 'Actual_Points', 'xG_For', 'xG_Against')],
+    Rule('no_matches', ('Matches',),
+         lambda df, ctx: _values(df, 'Matches') == 0,
+         "no matches played, so xPTS per match is undefined"),
+    Rule('points_exceed_maximum', ('Matches', 'Actual_Points'),
+         lambda df, ctx: _values(df, 'Actual_Points') > 3 * _values(df, 'Matches'),
+         "more points than 3 per match played"),
+    Rule('wdl_matches', ('Wins', 'Draws', 'Losses', 'Matches'),
+         lambda df, ctx: (_values(df, 'Wins') + _values(df, 'Draws') + _values(df, 'Losses')
+                          != _values(df, 'Matches')),
+         "wins + draws + losses differ from matches played"),
+    Rule('wdl_points', ('Wins', 'Draws', 'Actual_Points'),
+         lambda df, ctx: _values(df, 'Actual_Points') > 3 * _values(df, 'Wins') + _values(df, 'Draws'),
+         "more points than 3 x wins + draws"),
+    # Fewer points than W/D/L give is a points deduction, which FBRef shows as is
+    Rule('points_deduction', ('Wins', 'Draws', 'Actual_Points'),
+         lambda df, ctx: _values(df, 'Actual_Points') < 3 * _values(df, 'Wins') + _values(df, 'Draws'),
+         "fewer points than 3 x wins + draws (points deduction?)", WARNING),
+    Rule('xg_per_match', ('Matches', 'xG_For', 'xG_Against'),
+         lambda df, ctx: ((_per_match(df, 'xG_For') > MAX_XG_PER_MATCH)
+                          | (_per_match(df, 'xG_Against') > MAX_XG_PER_MATCH)),
+         f"implausible xG (over {MAX_XG_PER_MATCH} per match)", WARNING),
+    Rule('xg_missing', ('Matches', 'xG_For', 'xG_Against'),
+         lambda df, ctx: (_values(df, 'Matches') > 0) & ((_values(df, 'xG_For') == 0)
+                                                         | (_values(df, 'xG_Against') == 0)),
+         "zero xG after matches were played (xG feed missing?)", WARNING),
+]
+
+# Checks that need every team of a league-season
+TABLE_RULES = [
+    Rule('duplicate_team', ('Team',),
+         _duplicate_teams,
+         "team appears more than once in its league-season", table=True),
+    Rule('matches_exceed_season', ('Matches',),
+         lambda df, ctx: ~ctx['games_inferred'] & (_values(df, 'Matches') > ctx['games_in_season']),
+         "more matches than games in the season", table=True),
+    # Without a configured season length it is inferred from the rows present,
+    # which one missing or malformed row would shorten
+    Rule('matches_exceed_inferred_season', ('Matches',),
+         lambda df, ctx: ctx['games_inferred'] & (_values(df, 'Matches') > ctx['games_in_season']),
+         "more matches than a double round robin of the teams present (missing teams?)",
+         WARNING, table=True),
+    Rule('goal_balance', ('Goals_For', 'Goals_Against'),
+         lambda df, ctx: _group_totals(df, ctx, 'Goals_For') != _group_totals(df, ctx, 'Goals_Against'),
+         "league-season goals for and against do not balance (missing teams?)", WARNING, table=True),
+    Rule('xg_balance', ('xG_For', 'xG_Against'),
+         _xg_imbalance,
+         f"league-season xG for and against differ by over {MAX_XG_IMBALANCE:.0%} (missing teams?)",
+         WARNING, table=True),
+]
+
+RAW_RULES = TEAM_RULES + TABLE_RULES + _position_rules(('Position',))
+
+XPTS_RULES = TEAM_RULES + TABLE_RULES + [
+    Rule('xpts_range', ('Matches', 'xPTS'),
+         lambda df, ctx: _outside(_values(df, 'xPTS'), 0, 3 * _values(df, 'Matches')),
+         "xPTS outside 0..3 per match"),
+    Rule('variance_consistency', ('Actual_Points', 'xPTS', 'Variance'),
+         lambda df, ctx: np.abs(_values(df, 'Actual_Points') - _values(df, 'xPTS')
+                                - _values(df, 'Variance')) > TOLERANCE,
+         "variance differs from actual points - xPTS"),
+] + _position_rules(('Position_Actual', 'Position_Expected'))
+
+RISK_RULES = XPTS_RULES + [
+    Rule('p_value_range', ('P_Value',),
+         lambda df, ctx: _outside(_values(df, 'P_Value'), 0, 1),
+         "p-value outside 0..1"),
+    Rule('risk_score_range', ('Risk_Score',),
+         lambda df, ctx: _outside(_values(df, 'Risk_Score'), 0, 100),
+         "risk score outside 0..100"),
+    Rule('regression_probability_range', ('Regression_Probability',),
+         lambda df, ctx: _outside(_values(df, 'Regression_Probability'), 0, 1),
+         "regression probability outside 0..1"),
+    Rule('risk_category_label', ('Risk_Category',),
+         lambda df, ctx: _not_in(df, 'Risk_Category', RISK_CATEGORY_LABELS),
+         f"risk category not one of {', '.join(RISK_CATEGORY_LABELS)}"),
+    Rule('risk_category_band', ('Risk_Score', 'Risk_Category'),
+         _risk_category_mismatch,
+         "risk category does not match the risk score"),
+    Rule('performance_status_label', ('Performance_Status',),
+         lambda df, ctx: _not_in(df, 'Performance_Status', PERFORMANCE_STATUS_LABELS),
+         f"performance status not one of {', '.join(PERFORMANCE_STATUS_LABELS)}"),
+    Rule('performance_status_variance', ('Variance', 'Performance_Status'),
+         _performance_status_mismatch,
+         "performance status does not match the variance"),
+]
+
+RAW_COLUMNS = ['Team', 'Matches', 'Goals_For', 'Goals_Against', 'Actual_Points', 'xG_For', 'xG_Against']
+XPTS_COLUMNS = RAW_COLUMNS + ['xPTS', 'Variance', 'Position_Actual', 'Position_Expected']
+RISK_COLUMNS = XPTS_COLUMNS + ['Z_Score', 'P_Value', 'Significant', 'Risk_Score', 'Risk_Category',
+                               'Regression_Probability', 'Performance_Status']
+
+# Stage -> (required columns, rules)
+STAGES = {
+    'raw': (RAW_COLUMNS + ['Position'], RAW_RULES),
+    'xpts': (XPTS_COLUMNS, XPTS_RULES),
+    'risk': (RISK_COLUMNS, RISK_RULES),
+}
+
+
+class ValidationReport:
+    """Every violation found in one table, grouped by rule"""
+
+    def __init__(self, stage: str, rows: int):
+        """
+        Initialize empty report
+
+        Args:
+            stage: Stage the table belongs to ('raw', 'xpts' or 'risk')
+            rows: Number of rows validated
+        """
+        self.stage = stage
+        self.rows = rows
+        self.violations = []
+        self.seconds = 0.0
+
+    def add(self, rule: str, severity: str, message: str, columns=(), count: int = 0,
+            examples: list = None) -> None:
+        """
+        Record a violation
+
+        Args:
+            rule: Rule identifier
+            severity: ERROR or WARNING
+            message: Description of the violation
+            columns: Columns involved
+            count: Number of offending rows (0 for table-level problems)
+            examples: A few offending teams or row labels
+        """
+        self.violations.append({
+            'stage': self.stage,
+            'rule': rule,
+            'severity': severity,
+            'columns': list(columns),
+            'rows': int(count),
+            'examples': [str(example) for example in (examples or [])],
+            'message': message,
+        })
+
+    @property
+    def errors(self) -> list:
+        """Violations that make the table unusable"""
+        return [v for v in self.violations if v['severity'] == ERROR]
+
+    @property
+    def warnings(self) -> list:
+        """Violations that leave the table usable but suspect"""
+        return [v for v in self.violations if v['severity'] == WARNING]
+
+    @property
+    def ok(self) -> bool:
+        """Whether the table has no errors (warnings allowed)"""
+        return not self.errors
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get the violations as a table
+
+        Returns:
+            DataFrame with one row per violated rule
+        """
+        return pd.DataFrame(self.violations, columns=['stage', 'rule', 'severity', 'columns',
+                                                      'rows', 'examples', 'message'])
+
+    def format(self) -> str:
+        """
+        Describe every violation, one per line
+
+        Returns:
+            Multi-line summary
+        """
+        lines = [f"{self.stage} data: {len(self.errors)} errors, {len(self.warnings)} warnings "
+                 f"in {self.rows:,} rows"]
+        for v in self.violations:
+            where = f" ({v['rows']:,} rows, e.g. {', '.join(v['examples'])})" if v['rows'] else ""
+            lines.append(f"  [{v['severity']}] {v['rule']}: {v['message']}{where}")
+        return '\n'.join(lines)
+
+    def raise_for_errors(self) -> None:
+        """
+        Raise if the report contains errors
+
+        Raises:
+            ValueError: With the full report as the message
+        """
+        if self.errors:
+            raise ValueError(self.format())
+
+
+class DataValidator:
+    """
+    Validator for the tables passed between pipeline stages
+
+    Each stage's required columns and rules are declared in STAGES. All
+    rules run on whole columns, and validate() returns every violation
+    rather than stopping at the first, so one run shows everything wrong
+    with a file.
+    """
+
+    def __init__(self, games_in_season: int = None, examples: int = 3):
+        """
+        Initialize validator
+
+        Args:
+            games_in_season: Matches in a full season. Without it a double
+                round robin of the teams present (2 x (teams - 1)) is assumed,
+                and exceeding it is only a warning
+            examples: Offending teams listed per violated rule
+        """
+        self.games_in_season = games_in_season
+        self.examples = examples
+
+    def _context(self, df: pd.DataFrame) -> dict:
+        """
+        Precompute the league-season of every row, shared by the table rules
+
+        Rows get integer group codes once, so per-group totals and sizes are
+        single np.bincount passes instead of a groupby per rule.
+        """
+        codes = np.zeros(len(df), dtype='int64')
+        for col in GROUP_COLUMNS:
+            if col in df.columns:
+                col_codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+                codes = codes * len(uniques) + col_codes
+        codes, groups = pd.factorize(codes)
+        group_size = np.bincount(codes, minlength=len(groups))[codes]
+
+        inferred = self.games_in_season is None
+        games = 2 * (group_size - 1) if inferred else self.games_in_season
+        # Teams in a full league: a double round robin of n teams is 2 x (n - 1) games
+        league_size = group_size if inferred else games // 2 + 1
+        return {'group_codes': codes, 'n_groups': len(groups), 'group_size': group_size,
+                'games_in_season': games, 'games_inferred': inferred, 'league_size': league_size}
+
+    def _examples(self, df: pd.DataFrame, mask: np.ndarray) -> list:
+        """List a few offending teams with their league-season (row labels without a Team column)"""
+        rows = np.flatnonzero(mask)[:self.examples]
+        if 'Team' not in df.columns:
+            return df.index[rows].tolist()
+
+        keys = [col for col in GROUP_COLUMNS if col in df.columns]
+        examples = []
+        for row in rows:
+            label = str(df['Team'].iat[row])
+            if keys:
+                label += f" ({' '.join(str(df[col].iat[row]) for col in keys)})"
+            examples.append(label)
+        return examples
+
+    def validate(self, df: pd.DataFrame, stage: str = 'raw', partial: bool = False) -> ValidationReport:
+        """
+        Run every check for a stage
+
+        Args:
+            df: Table to validate
+            stage: 'raw', 'xpts' or 'risk'
+            partial: df is an arbitrary slice of a larger table (e.g. a chunk),
+                so checks needing whole league-seasons are skipped
+
+        Returns:
+            ValidationReport listing all violations
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage '{stage}', expected one of {list(STAGES)}")
+
+        started = time.perf_counter()
+        required, rules = STAGES[stage]
+        report = ValidationReport(stage, len(df))
+
+        missing = [col for col in required if col not in df.columns]
+        if missing:
+            report.add('required_columns', ERROR, f"missing required columns: {', '.join(missing)}", missing)
+        unusable = set(missing)
+
+        # Counts must be whole numbers and the rest numeric before any arithmetic
+        for col in INTEGER_COLUMNS + NUMERIC_COLUMNS:
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                report.add('dtype', ERROR, f"{col} is {series.dtype}, expected numbers", [col])
+                unusable.add(col)
+            elif col in INTEGER_COLUMNS and not pd.api.types.is_integer_dtype(series):
+                fractional = (series % 1 != 0).to_numpy() & series.notna().to_numpy()
+                if fractional.any():
+                    report.add('dtype', ERROR, f"{col} has fractional values, expected whole numbers", [col],
+                               np.count_nonzero(fractional), self._examples(df, fractional))
+
+        present = [col for col in required if col in df.columns]
+        nulls = df[present].isna().to_numpy()
+        if nulls.any():
+            for col, column_nulls in zip(present, nulls.T):
+                if column_nulls.any():
+                    report.add('nulls', ERROR, f"{col} has missing values", [col],
+                               np.count_nonzero(column_nulls), self._examples(df, column_nulls))
+
+        if 'Significant' in df.columns and not pd.api.types.is_bool_dtype(df['Significant']):
+            report.add('dtype', ERROR, f"Significant is {df['Significant'].dtype}, expected booleans",
+                       ['Significant'])
+
+        context = None
+        for rule in rules:
+            if (rule.table and partial) or unusable.intersection(rule.columns) \
+                    or not set(rule.columns) <= set(df.columns):
+                continue
+            if rule.table and context is None:
+                context = self._context(df)
+            mask = rule.check(df, context)
+            if mask.any():
+                report.add(rule.name, rule.severity, rule.message, rule.columns,
+                           np.count_nonzero(mask), self._examples(df, mask))
+
+        report.seconds = time.perf_counter() - started
+        return report
+
+
+def validate_stage(df: pd.DataFrame, stage: str, partial: bool = False,
+                   validator: DataValidator = None, quiet: bool = False) -> ValidationReport:
+    """
+    Validate a table at a stage boundary, logging warnings and raising on errors
+
+    Args:
+        df: Table to validate
+        stage: 'raw', 'xpts' or 'risk'
+        partial: df is a chunk of a larger table (skip whole-table checks)
+        validator: Validator to use (defaults to DataValidator())
+        quiet: Log clean results at DEBUG instead of INFO (for per-chunk calls)
+
+    Returns:
+        ValidationReport (warnings only; errors raise)
+
+    Raises:
+        ValueError: If any error-severity rule is violated, listing every violation
+    """
+    report = (validator or DataValidator()).validate(df, stage, partial)
+
+    if report.violations:
+        logger.log(logging.ERROR if report.errors else logging.WARNING, report.format())
+    report.raise_for_errors()
+
+    logger.log(logging.DEBUG if quiet else logging.INFO,
+               f"Validated {report.rows:,} rows of {stage} data in {report.seconds * 1000:.1f} ms "
+               f"({len(report.warnings)} warnings)")
+    return report
+
+
+def main():
+    """Main function for validating a pipeline CSV"""
+    import argparse
+    from schema import read_csv
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Validate a raw, xPTS or risk analysis CSV')
+    parser.add_argument('csv', nargs='?', default='data/raw_data.csv', help='CSV to validate')
+    parser.add_argument('--stage', choices=list(STAGES), help='Stage the file belongs to (default: from its name)')
+    parser.add_argument('--games', type=int, help='Games in a full season (default: 2 x (teams - 1))')
+    args = parser.parse_args()
+
+    stage = args.stage
+    if stage is None:
+        stage = 'risk' if 'risk' in args.csv else 'xpts' if 'xpts' in args.csv else 'raw'
+
+    try:
+        df = read_csv(args.csv)
+    except FileNotFoundError as e:
+        logger.error(f"Error: {e}")
+        return
+
+    report = DataValidator(games_in_season=args.games).validate(df, stage)
+    print(report.format())
+    print(f"\nChecked {report.rows:,} rows in {report.seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,42 +4,86 @@ Creates matplotlib charts for performance analysis
 """
 
 import pandas as pd
+import matplotlib
+# Charts are drawn off the main thread (pipeline stages) and in worker
+# processes, which interactive backends do not support
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
+import io
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from instrumentation import span
+from logging_setup import configure_logging, init_worker_logging, logging_config
+from schema import read_csv
+
 logger = logging.getLogger(__name__)
 
+# Color scheme for risk levels
+RISK_COLORS = {
+    'Critical': '#dc2626',  # Red
+    'High': '#ea580c',      # Orange
+    'Moderate': '#eab308',  # Yellow
+    'Low': '#16a34a'        # Green
+}
+
+# Chart name -> renderer method, in report order
+CHART_METHODS = {
+    'actual_vs_expected': 'create_actual_vs_expected_chart',
+    'variance_by_team': 'create_variance_bar_chart',
+    'league_table': 'create_league_table_chart',
+    'risk_distribution': 'create_risk_distribution_chart',
+}
+
+
+def _render_chart(data_dir: str, output_dir: str, chart_name: str, df: pd.DataFrame,
+                  **options) -> tuple:
+    """
+    Render a single chart in a worker process
+
+    Args:
+        data_dir: Directory containing analysis data
+        output_dir: Directory to save charts
+        chart_name: Key of CHART_METHODS to render
+        df: DataFrame with analysis data
+        **options: Extra PerformanceVisualizer keyword arguments
+
+    Returns:
+        Tuple of (chart name, path to saved chart or in-memory PNG buffer)
+    """
+    # Workers never display anything, so always use the non-interactive backend
+    plt.switch_backend('Agg')
+    visualizer = PerformanceVisualizer(data_dir=data_dir, output_dir=output_dir, **options)
+    return chart_name, getattr(visualizer, CHART_METHODS[chart_name])(df)
+
 
 class PerformanceVisualizer:
     """Generator for performance analysis visualizations"""
 
-    def __init__(self, data_dir: str = "data", output_dir: str = "output/charts"):
+    def __init__(self, data_dir: str = "data", output_dir: str = "output/charts",
+                 in_memory: bool = False, save_to_disk: bool = True):
         """
         Initialize visualizer
 
         Args:
             data_dir: Directory containing analysis data
             output_dir: Directory to save charts
+            in_memory: Return charts as in-memory PNG buffers instead of file paths
+            save_to_disk: Also write in-memory charts to output_dir (ignored unless in_memory)
         """
         self.data_dir = Path(data_dir)
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.in_memory = in_memory
+        self.save_to_disk = save_to_disk or not in_memory
+        if self.save_to_disk:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Color scheme for risk levels
-        self.colors = {
-            'Critical': '#dc2626',  # Red
-            'High': '#ea580c',      # Orange
-            'Moderate': '#eab308',  # Yellow
-            'Low': '#16a34a'        # Green
-        }
+        self.colors = dict(RISK_COLORS)
 
         # Set style
         plt.style.use('seaborn-v0_8-darkgrid')
@@ -56,6 +100,38 @@ class PerformanceVisualizer:
         """
         return self.colors.get(risk_category, '#6b7280')  # Gray as default
 
+    def _save_figure(self, fig, filename: str):
+        """
+        Save a finished figure to disk and/or an in-memory buffer
+
+        Args:
+            fig: Matplotlib figure to save
+            filename: Chart filename inside output_dir
+
+        Returns:
+            Path to saved chart, or a BytesIO with the PNG data when in_memory is set
+        """
+        output_path = self.output_dir / filename
+
+        if not self.in_memory:
+            fig.savefig(output_path, dpi=300, bbox_inches='tight')
+            plt.close(fig)
+            logger.info(f"Chart saved to {output_path}")
+            return str(output_path)
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+        plt.close(fig)
+        buffer.seek(0)
+
+        if self.save_to_disk:
+            output_path.write_bytes(buffer.getvalue())
+            logger.info(f"Chart saved to {output_path}")
+        else:
+            logger.info(f"Chart {filename} rendered in memory ({buffer.getbuffer().nbytes} bytes)")
+
+        return buffer
+
     def create_actual_vs_expected_chart(self, df: pd.DataFrame) -> str:
         """
         Create scatter plot: Actual Points vs Expected Points
@@ -64,7 +140,7 @@ class PerformanceVisualizer:
             df: DataFrame with analysis data
 
         Returns:
-            Path to saved chart
+            Path to saved chart (or an in-memory PNG buffer when in_memory is set)
         """
         logger.info("Creating Actual vs Expected Points chart...")
 
@@ -109,12 +185,7 @@ class PerformanceVisualizer:
         ax.grid(True, alpha=0.3)
 
         plt.tight_layout()
-        output_path = self.output_dir / 'actual_vs_expected.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Chart saved to {output_path}")
-        return str(output_path)
+        return self._save_figure(fig, 'actual_vs_expected.png')
 
     def create_variance_bar_chart(self, df: pd.DataFrame) -> str:
         """
@@ -124,7 +195,7 @@ class PerformanceVisualizer:
             df: DataFrame with analysis data
 
         Returns:
-            Path to saved chart
+            Path to saved chart (or an in-memory PNG buffer when in_memory is set)
         """
         logger.info("Creating Variance by Team chart...")
 
@@ -167,12 +238,7 @@ class PerformanceVisualizer:
         ax.grid(True, alpha=0.3, axis='x')
 
         plt.tight_layout()
-        output_path = self.output_dir / 'variance_by_team.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Chart saved to {output_path}")
-        return str(output_path)
+        return self._save_figure(fig, 'variance_by_team.png')
 
     def create_league_table_chart(self, df: pd.DataFrame) -> str:
         """
@@ -182,7 +248,7 @@ class PerformanceVisualizer:
             df: DataFrame with analysis data
 
         Returns:
-            Path to saved chart
+            Path to saved chart (or an in-memory PNG buffer when in_memory is set)
         """
         logger.info("Creating League Table chart...")
 
@@ -250,12 +316,7 @@ class PerformanceVisualizer:
                     fontsize=14, fontweight='bold', pad=20)
 
         plt.tight_layout()
-        output_path = self.output_dir / 'league_table.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Chart saved to {output_path}")
-        return str(output_path)
+        return self._save_figure(fig, 'league_table.png')
 
     def create_risk_distribution_chart(self, df: pd.DataFrame) -> str:
         """
@@ -265,7 +326,7 @@ class PerformanceVisualizer:
             df: DataFrame with analysis data
 
         Returns:
-            Path to saved chart
+            Path to saved chart (or an in-memory PNG buffer when in_memory is set)
         """
         logger.info("Creating Risk Distribution chart...")
 
@@ -273,6 +334,8 @@ class PerformanceVisualizer:
 
         # Count teams in each risk category
         risk_counts = df['Risk_Category'].value_counts()
+        # Categorical counts include empty categories; a pie has no use for them
+        risk_counts = risk_counts[risk_counts > 0]
 
         # Create pie chart
         colors = [self.get_risk_color(cat) for cat in risk_counts.index]
@@ -298,12 +361,7 @@ class PerformanceVisualizer:
         ax.set_title('Distribution of Teams by Risk Category', fontsize=14, fontweight='bold')
 
         plt.tight_layout()
-        output_path = self.output_dir / 'risk_distribution.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Chart saved to {output_path}")
-        return str(output_path)
+        return self._save_figure(fig, 'risk_distribution.png')
 
     def load_analysis_data(self, filename: str = "risk_analysis.csv") -> pd.DataFrame:
         """
@@ -320,33 +378,81 @@ class PerformanceVisualizer:
         if not input_path.exists():
             raise FileNotFoundError(f"Analysis data file not found: {input_path}")
 
-        df = pd.read_csv(input_path)
+        df = read_csv(input_path)
         logger.info(f"Loaded analysis data from {input_path}")
 
         return df
 
-    def run(self, input_file: str = "risk_analysis.csv") -> dict:
+    def render_parallel(self, df: pd.DataFrame, max_workers: int = None) -> dict:
+        """
+        Render all charts concurrently in a process pool on the Agg backend
+
+        Args:
+            df: DataFrame with analysis data
+            max_workers: Number of worker processes (defaults to one per chart, capped at CPU count)
+
+        Returns:
+            Dictionary with paths (or in-memory buffers) of generated charts, in CHART_METHODS order
+        """
+        max_workers = max_workers or min(len(CHART_METHODS), os.cpu_count() or 1)
+        logger.info(f"Rendering {len(CHART_METHODS)} charts with {max_workers} worker processes...")
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker_logging,
+                                 initargs=(logging_config(),)) as executor:
+            futures = [
+                executor.submit(
+                    _render_chart, str(self.data_dir), str(self.output_dir), chart_name, df,
+                    in_memory=self.in_memory, save_to_disk=self.save_to_disk
+                )
+                for chart_name in CHART_METHODS
+            ]
+            rendered = dict(future.result() for future in futures)
+
+        # Completion order varies between runs; the returned mapping must not
+        return {chart_name: rendered[chart_name] for chart_name in CHART_METHODS}
+
+    def run(self, input_file: str = "risk_analysis.csv", parallel: bool = False,
+            max_workers: int = None) -> dict:
         """
         Generate all visualizations
 
         Args:
             input_file: Input CSV file with analysis data
+            parallel: Render charts concurrently in worker processes
+            max_workers: Number of worker processes when parallel is True
 
         Returns:
-            Dictionary with paths to generated charts
+            Dictionary with paths (or in-memory buffers) of generated charts
         """
         logger.info("Starting visualization generation...")
 
         # Load data
         df = self.load_analysis_data(input_file)
 
-        # Generate all charts
-        charts = {
-            'actual_vs_expected': self.create_actual_vs_expected_chart(df),
-            'variance_by_team': self.create_variance_bar_chart(df),
-            'league_table': self.create_league_table_chart(df),
-            'risk_distribution': self.create_risk_distribution_chart(df)
-        }
+        return self.generate_charts(df, parallel=parallel, max_workers=max_workers)
+
+    def generate_charts(self, df: pd.DataFrame, parallel: bool = False,
+                        max_workers: int = None) -> dict:
+        """
+        Generate all visualizations from an analysis DataFrame
+
+        Args:
+            df: DataFrame with analysis data
+            parallel: Render charts concurrently in worker processes
+            max_workers: Number of worker processes when parallel is True
+
+        Returns:
+            Dictionary with paths (or in-memory buffers) of generated charts
+        """
+        if parallel:
+            # Worker processes have their own tracer, so only the whole batch is traced
+            with span('charts:parallel', 'chart', rows=len(df)):
+                charts = self.render_parallel(df, max_workers=max_workers)
+        else:
+            charts = {}
+            for chart_name, method_name in CHART_METHODS.items():
+                with span(f'chart:{chart_name}', 'chart', rows=len(df)):
+                    charts[chart_name] = getattr(self, method_name)(df)
 
         logger.info(f"Successfully generated {len(charts)} charts")
 
@@ -355,18 +461,28 @@ class PerformanceVisualizer:
 
 def main():
     """Main function for testing the visualizer"""
-    visualizer = PerformanceVisualizer()
+    import argparse
+    from profiling import add_profile_arguments, profile_from_args
+
+    configure_logging()
+
+    parser = argparse.ArgumentParser(description='Render the analysis charts')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args, 'charts'):
+        visualizer = PerformanceVisualizer()
 
-    try:
-        charts = visualizer.run()
+        try:
+            charts = visualizer.run()
 
-        print("\n=== Generated Visualizations ===")
-        for chart_name, chart_path in charts.items():
-            print(f"{chart_name}: {chart_path}")
+            print("\n=== Generated Visualizations ===")
+            for chart_name, chart_path in charts.items():
+                print(f"{chart_name}: {chart_path}")
 
-    except FileNotFoundError as e:
-        logger.error(f"Error: {e}")
-        logger.info("Please run the scraper, calculator, and analyzer first.")
+        except FileNotFoundError as e:
+            logger.error(f"Error: {e}")
+            logger.info("Please run the scraper, calculator, and analyzer first.")
 
 
 if __name__ == "__main__":